@@ -0,0 +1 @@
+# ai/benchmarks/__init__.py
\ No newline at end of file
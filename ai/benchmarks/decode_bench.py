@@ -0,0 +1,91 @@
+# Path: ai/benchmarks/decode_bench.py
+# Desc: 전체 디코딩 + Resize vs 공통 로더(JPEG DCT 축소 디코딩) 분류기 입력 준비 시간 비교
+
+# ✅ 실행 명령 (루트에서 실행, 휴대폰 원본 사진 폴더 권장)
+# python -m ai.benchmarks.decode_bench --image-dir <사진 폴더> --overlay-edge 1024
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+from PIL import Image
+from torchvision import transforms
+
+from ai.modules.image_io import open_for_classifier, open_image
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png")
+
+to_input = transforms.Compose([
+    transforms.Resize((224, 224)),
+    transforms.ToTensor(),
+])
+
+
+def baseline(path):
+    """기존 경로: 원본 해상도 전체 디코딩 후 Resize"""
+    return to_input(Image.open(path).convert("RGB"))
+
+
+def classifier(path):
+    return to_input(open_for_classifier(path))
+
+
+def overlay(path, edge):
+    """오버레이용 디코딩 (긴 변 edge 이상) + 분류기 입력"""
+    return to_input(open_image(path, edge))
+
+
+def time_each(fn, files, *args):
+    timings = []
+    for path in files:
+        start = time.perf_counter()
+        fn(path, *args)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings)), float(np.mean(timings))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="이미지 디코딩 경로 비교")
+    parser.add_argument("--image-dir", required=True)
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--overlay-edge", type=int, default=1024)
+    args = parser.parse_args()
+
+    files = sorted(
+        os.path.join(root, name)
+        for root, _, names in os.walk(args.image_dir)
+        for name in names if name.lower().endswith(IMAGE_EXTS)
+    )[:args.limit]
+    if not files:
+        print(f"❌ 이미지가 없습니다: {args.image_dir}")
+        sys.exit(1)
+
+    sizes = [Image.open(f).size for f in files]
+    megapixels = np.mean([w * h for w, h in sizes]) / 1e6
+    print(f"🖼️ {len(files)}장 (평균 {megapixels:.1f} MP)")
+
+    # 워밍업 (파일 캐시)
+    for path in files[:5]:
+        baseline(path)
+
+    results = {
+        "full decode + Resize": time_each(baseline, files),
+        "classifier (draft 224)": time_each(classifier, files),
+        f"overlay (draft {args.overlay_edge})": time_each(overlay, files, args.overlay_edge),
+    }
+
+    base_p50 = results["full decode + Resize"][0]
+    print(f"  {'path':>24} | {'p50':>9} | {'mean':>9} | {'speedup':>7}")
+    for name, (p50, mean) in results.items():
+        print(f"  {name:>24} | {p50:6.1f} ms | {mean:6.1f} ms | {base_p50 / p50:6.2f}x")
+
+    # 입력 차이 (DCT 축소 디코딩 vs 전체 디코딩, 0~1 스케일) — EXIF 회전 사진은 기존 경로가 회전을 무시하므로 제외
+    diffs = []
+    for path in files[:50]:
+        if Image.open(path).getexif().get(0x0112, 1) != 1:  # EXIF Orientation
+            continue
+        diffs.append((baseline(path) - classifier(path)).abs().mean().item())
+    if diffs:
+        print(f"📏 분류기 입력 평균 절대 차이: {np.mean(diffs):.4f} (최대 {np.max(diffs):.4f})")
@@ -0,0 +1,154 @@
+# Path: ai/benchmarks/gradcam_soak.py
+# Desc: Grad-CAM 엔진 장기 실행(soak) 검증 — 공유 모델 + 멀티스레드 10k 호출 동안 메모리/지연/hook 수가 일정한지 확인
+
+# ✅ 실행 명령 (루트에서 실행)
+# python -m ai.benchmarks.gradcam_soak --calls 10000 --threads 4
+
+import os
+import sys
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import torch
+from torchvision import models
+
+from ai.modules.gradcam import GradCAM
+from ai.modules.model_registry import MODEL_PATHS, build_model
+
+
+# ==========================================================
+# 1️⃣ 유틸
+# ==========================================================
+def current_rss_mb():
+    """현재 RSS (MB) — Linux는 /proc, 그 외는 최대 RSS로 대체"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def load_model():
+    path = MODEL_PATHS["korean"]
+    if path.exists():
+        return build_model(path)
+
+    # 체크포인트가 없는 환경에서는 동일 구조의 임의 가중치 모델로 검증
+    print(f"⚠️ 체크포인트 없음 ({path}) → 임의 가중치 모델 사용")
+    model = models.mobilenet_v3_small(weights=None)
+    model.classifier[3] = torch.nn.Linear(model.classifier[3].in_features, 2)
+    return model.eval()
+
+
+# ==========================================================
+# 2️⃣ soak 실행
+# ==========================================================
+def run(args):
+    torch.manual_seed(0)
+    torch.set_num_threads(max(1, (os.cpu_count() or 1) // args.threads))
+
+    model = load_model()
+    target_layer = model.features[-1]
+    engines = {
+        "fast": GradCAM(model),                    # hook 없는 고속 경로
+        "hook": GradCAM(model, target_layer),      # 요청 단위 hook 경로
+    }
+
+    # 요청별 결과가 섞이지 않는지 확인하기 위한 입력/기준 CAM (순차 계산)
+    inputs = [torch.rand(1, 3, 224, 224) for _ in range(args.inputs)]
+    reference = {
+        name: [engine.explain(x)[1][0] for x in inputs]
+        for name, engine in engines.items()
+    }
+
+    lock = threading.Lock()
+    latencies = []
+    mismatches = [0]
+
+    def call(i):
+        name = "fast" if i % 2 == 0 else "hook"
+        x = inputs[i % len(inputs)]
+        start = time.perf_counter()
+        _, cams = engines[name].explain(x)
+        elapsed = (time.perf_counter() - start) * 1000
+        ok = np.allclose(cams[0], reference[name][i % len(inputs)], atol=1e-4)
+        with lock:
+            latencies.append(elapsed)
+            if not ok:
+                mismatches[0] += 1
+
+    windows = []
+    print(f"🚀 soak 시작: calls={args.calls}, threads={args.threads}, window={args.window}")
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        for start in range(0, args.calls, args.window):
+            list(pool.map(call, range(start, min(start + args.window, args.calls))))
+            window_lat = latencies[start:start + args.window]
+            windows.append({
+                "calls": start + len(window_lat),
+                "p50_ms": float(np.percentile(window_lat, 50)),
+                "p95_ms": float(np.percentile(window_lat, 95)),
+                "rss_mb": current_rss_mb(),
+                "hooks": len(target_layer._forward_hooks) + len(target_layer._backward_hooks),
+            })
+            w = windows[-1]
+            print(f"  {w['calls']:>6} calls | p50 {w['p50_ms']:7.2f} ms | p95 {w['p95_ms']:7.2f} ms "
+                  f"| RSS {w['rss_mb']:8.1f} MB | hooks {w['hooks']}")
+
+    return windows, mismatches[0], model
+
+
+# ==========================================================
+# 3️⃣ 판정
+# ==========================================================
+def check(windows, mismatches, model, args):
+    failures = []
+    # 첫 window는 워밍업(할당자 초기화)으로 보고 두 번째 window를 기준으로 비교
+    base = windows[1] if len(windows) > 1 else windows[0]
+    last = windows[-1]
+
+    rss_growth = last["rss_mb"] - base["rss_mb"]
+    latency_ratio = last["p50_ms"] / base["p50_ms"] if base["p50_ms"] else 1.0
+    leftover_hooks = max(w["hooks"] for w in windows)
+    param_grads = sum(p.grad is not None for p in model.parameters())
+
+    print("\n📊 결과")
+    print(f"  RSS 증가: {rss_growth:+.1f} MB (허용 {args.max_rss_growth_mb} MB)")
+    print(f"  p50 지연 비율(마지막/기준): {latency_ratio:.2f} (허용 {args.max_latency_ratio})")
+    print(f"  잔존 hook 수: {leftover_hooks}")
+    print(f"  결과 불일치(동시성): {mismatches}")
+    print(f"  파라미터 .grad 누적: {param_grads}")
+
+    if rss_growth > args.max_rss_growth_mb:
+        failures.append("메모리 증가")
+    if latency_ratio > args.max_latency_ratio:
+        failures.append("지연 증가")
+    if leftover_hooks:
+        failures.append("hook 누수")
+    if mismatches:
+        failures.append("동시 요청 간 결과 섞임")
+    if param_grads:
+        failures.append("파라미터 grad 누적")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Grad-CAM 엔진 soak 테스트")
+    parser.add_argument("--calls", type=int, default=10000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--window", type=int, default=1000)
+    parser.add_argument("--inputs", type=int, default=8, help="서로 다른 입력 이미지 수")
+    parser.add_argument("--max-rss-growth-mb", type=float, default=50.0)
+    parser.add_argument("--max-latency-ratio", type=float, default=1.5)
+    args = parser.parse_args()
+
+    windows, mismatches, model = run(args)
+    failures = check(windows, mismatches, model, args)
+    if failures:
+        print(f"\n❌ soak 실패: {', '.join(failures)}")
+        sys.exit(1)
+    print("\n✅ soak 통과: 메모리/지연/hook 수가 일정하게 유지됨")
@@ -0,0 +1,103 @@
+# Path: ai/benchmarks/onnx_parity.py
+# Desc: PyTorch vs onnxruntime 탐지 모델 출력 일치(parity) 검증 + 지연시간 비교
+
+# ✅ 실행 명령 (루트에서 실행)
+# python -m ai.benchmarks.onnx_parity --model-type korean --image-dir backend/data/test_images/detect
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+from PIL import Image
+
+from ai.modules.gradcam import GradCAM
+from ai.modules.model_registry import MODEL_PATHS, load_detector, resolve_model_type
+from ai.modules.Deepfake_Evaluation_MobileNet_v3_final_application_number_option import transform
+
+
+# ==========================================================
+# 1️⃣ 입력 준비
+# ==========================================================
+def load_inputs(image_dir, count):
+    """이미지 폴더가 있으면 실제 이미지, 없으면 난수 입력 사용"""
+    tensors = []
+    if image_dir and os.path.isdir(image_dir):
+        files = sorted(f for f in os.listdir(image_dir) if f.lower().endswith((".jpg", ".jpeg", ".png")))
+        for fname in files[:count]:
+            image = Image.open(os.path.join(image_dir, fname)).convert("RGB")
+            tensors.append(transform(image))
+    while len(tensors) < count:
+        tensors.append(torch.rand(3, 224, 224))
+    return torch.stack(tensors)
+
+
+# ==========================================================
+# 2️⃣ parity 검증
+# ==========================================================
+def check_parity(torch_model, onnx_model, inputs, atol):
+    with torch.no_grad():
+        torch_probs = F.softmax(torch_model(inputs), dim=1)
+        onnx_probs = F.softmax(onnx_model(inputs), dim=1)
+
+    _, torch_cams = GradCAM(torch_model).explain(inputs)
+    _, onnx_cams = GradCAM(onnx_model).explain(inputs)
+
+    prob_diff = (torch_probs - onnx_probs).abs().max().item()
+    cam_diff = float(np.abs(torch_cams - onnx_cams).max())
+    label_match = (torch_probs.argmax(1) == onnx_probs.argmax(1)).float().mean().item() * 100
+
+    print("\n📊 Parity (PyTorch vs ONNX)")
+    print(f"  softmax 최대 오차: {prob_diff:.2e} (허용 {atol:.0e})")
+    print(f"  Grad-CAM 최대 오차: {cam_diff:.2e}")
+    print(f"  예측 라벨 일치율: {label_match:.2f}%")
+    return prob_diff <= atol and label_match == 100.0
+
+
+# ==========================================================
+# 3️⃣ 지연시간 비교
+# ==========================================================
+def measure_latency(model, inputs, batch_size, repeats):
+    batch = inputs[:batch_size]
+    with torch.no_grad():
+        for _ in range(3):  # 워밍업
+            model(batch)
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            model(batch)
+            timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings)), float(np.percentile(timings, 95))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ONNX 백엔드 parity / latency 비교")
+    parser.add_argument("--model-type", default="korean")
+    parser.add_argument("--image-dir", default=None)
+    parser.add_argument("--batch-sizes", default="1,8")
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--atol", type=float, default=1e-4)
+    args = parser.parse_args()
+
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",")]
+    model_path = MODEL_PATHS[resolve_model_type(args.model_type)]
+    torch_model = load_detector(model_path, backend="torch")
+    onnx_model = load_detector(model_path, backend="onnx")
+    inputs = load_inputs(args.image_dir, max(batch_sizes + [8]))
+
+    passed = check_parity(torch_model, onnx_model, inputs, args.atol)
+
+    print(f"\n⏱️ Latency ({args.model_type}, torch threads={torch.get_num_threads()})")
+    print(f"  {'batch':>5} | {'torch p50':>10} | {'onnx p50':>10} | {'speedup':>7}")
+    for batch_size in batch_sizes:
+        torch_p50, _ = measure_latency(torch_model, inputs, batch_size, args.repeats)
+        onnx_p50, _ = measure_latency(onnx_model, inputs, batch_size, args.repeats)
+        print(f"  {batch_size:>5} | {torch_p50:8.2f}ms | {onnx_p50:8.2f}ms | {torch_p50 / onnx_p50:6.2f}x")
+
+    if not passed:
+        print("\n❌ parity 실패")
+        sys.exit(1)
+    print("\n✅ parity 통과")
@@ -0,0 +1,55 @@
+# Path: ai/benchmarks/overlay_memory.py
+# Desc: Grad-CAM 오버레이 합성의 최대 메모리 / 시간 비교 (원본 해상도 vs 최대 변 제한)
+
+# ✅ 실행 명령 (루트에서 실행)
+# python -m ai.benchmarks.overlay_memory --width 6000 --height 4000 --max-edge 1024
+
+import time
+import argparse
+import tracemalloc
+
+import numpy as np
+from PIL import Image
+
+from ai.modules.Deepfake_Evaluation_MobileNet_v3_final_application_number_option import encode_png, render_overlay
+
+
+def measure(image, cam, max_edge, repeats):
+    """render_overlay + PNG 인코딩 1회의 최대 추가 할당량(MB)과 중앙값 시간(ms)"""
+    timings = []
+    peak_mb = 0.0
+    shape = None
+    for _ in range(repeats):
+        tracemalloc.start()
+        start = time.perf_counter()
+        overlay, _ = render_overlay(image, cam, max_edge=max_edge)
+        encode_png(overlay)
+        timings.append((time.perf_counter() - start) * 1000)
+        peak_mb = max(peak_mb, tracemalloc.get_traced_memory()[1] / 2**20)
+        tracemalloc.stop()
+        shape = overlay.shape
+        del overlay
+    return peak_mb, float(np.median(timings)), shape
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Grad-CAM 오버레이 메모리 / 시간 비교")
+    parser.add_argument("--width", type=int, default=6000)
+    parser.add_argument("--height", type=int, default=4000)
+    parser.add_argument("--max-edge", type=int, default=1024)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    image = Image.fromarray(rng.integers(0, 256, (args.height, args.width, 3), dtype=np.uint8))
+    cam = rng.random((7, 7), dtype=np.float32)  # features[-1] 해상도 (224 입력 기준 7x7)
+
+    print(f"🖼️ 입력 {args.width}x{args.height} (원본 RGB {args.width * args.height * 3 / 2**20:.0f} MB)")
+    full_mb, full_ms, full_shape = measure(image, cam, None, args.repeats)
+    bounded_mb, bounded_ms, bounded_shape = measure(image, cam, args.max_edge, args.repeats)
+
+    print(f"  {'mode':>12} | {'overlay':>11} | {'peak alloc':>10} | {'time':>9}")
+    print(f"  {'full':>12} | {full_shape[1]:>5}x{full_shape[0]:<5} | {full_mb:7.1f} MB | {full_ms:6.1f} ms")
+    print(f"  {f'max {args.max_edge}':>12} | {bounded_shape[1]:>5}x{bounded_shape[0]:<5} | "
+          f"{bounded_mb:7.1f} MB | {bounded_ms:6.1f} ms")
+    print(f"📉 최대 메모리 {full_mb / bounded_mb:.1f}배 감소, 시간 {full_ms / bounded_ms:.1f}배 단축")
@@ -12,12 +12,10 @@
 """
 
 import os
+import sys
 import torch
 import torch.nn as nn
 from torchvision import datasets, transforms, models
-from torch.utils.data import DataLoader
-from sklearn.metrics import classification_report, confusion_matrix
-from tqdm import tqdm
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -26,6 +24,11 @@ from PIL import Image
 import random
 import matplotlib.font_manager as fm
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))  # 프로젝트 루트
+from ai.modules.image_io import classifier_loader, open_for_classifier
+from ai.modules.image_shards import IMAGENET_MEAN, IMAGENET_STD, ShardedImageDataset, ShardTransform
+from ai.modules.eval_runner import evaluate, format_report, make_loader, save_result
+
 # ==============================================================  
 # 1️⃣ 기본 설정  
 # ==============================================================
@@ -34,7 +37,11 @@ MODEL_PATH = "C:/AI/project/AdvancedProject/Deepfake_test/ai/modelling_jrheo/eva
 
 DEVICE = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 IMG_SIZE = 224
-BATCH_SIZE = 8
+BATCH_SIZE = 128
+NUM_WORKERS = 4
+# 사전 디코딩 샤드 폴더 (python -m ai.modules.image_shards --image-dir <test 폴더> --out-dir <샤드 폴더>)
+# 지정하면 JPEG 디코딩 없이 memmap에서 바로 평가, None이면 test 폴더 이미지를 디코딩
+SHARD_DIR = None
 
 print(f"📁 데이터 경로: {BASE_DIR}")
 print(f"💾 모델 경로: {MODEL_PATH}")
@@ -51,8 +58,11 @@ transform = transforms.Compose([
 ])
 
 test_dir = os.path.join(BASE_DIR, "test")
-test_ds = datasets.ImageFolder(test_dir, transform=transform)
-test_loader = DataLoader(test_ds, batch_size=1, shuffle=False)
+if SHARD_DIR:
+    test_ds = ShardedImageDataset(SHARD_DIR, transform=ShardTransform(IMAGENET_MEAN, IMAGENET_STD))
+else:
+    test_ds = datasets.ImageFolder(test_dir, transform=transform, loader=classifier_loader)  # EXIF 보정 + 축소 디코딩
+test_loader = make_loader(test_ds, BATCH_SIZE, NUM_WORKERS, DEVICE)  # 배치 + 멀티 워커
 # ⚠️ 중요: ImageFolder는 알파벳순으로 클래스 정렬함
 # 즉, ['Fake', 'Real'] 순서일 가능성이 높음
 print(f"✅ 클래스 매핑: {test_ds.class_to_idx}")
@@ -76,27 +86,17 @@ print(f"✅ 모델 로드 완료: {MODEL_PATH}")
 # ==============================================================
 print("\n📈 테스트 세트 평가 시작...")
 
-y_true, y_pred = [], []
-with torch.no_grad():
-    for imgs, labels in tqdm(test_loader, desc="Evaluating"):
-        imgs, labels = imgs.to(DEVICE), labels.to(DEVICE)
-        outputs = model(imgs)
-        preds = outputs.argmax(1)
-        y_true.extend(labels.cpu().numpy())
-        y_pred.extend(preds.cpu().numpy())
-
 # 클래스 이름 자동 매칭
 class_names = test_ds.classes
 
-# 리포트 및 혼동행렬
-import pandas as pd
-pd.Series(y_true).value_counts()
-report = classification_report(y_true, y_pred, target_names=class_names)
-cm = confusion_matrix(y_true, y_pred)
-acc = np.mean(np.array(y_true) == np.array(y_pred)) * 100
+# inference_mode + 배치마다 혼동행렬 누적 (예측 리스트를 만들지 않음)
+matrix, throughput = evaluate(model, test_loader, len(class_names), DEVICE)
+result = matrix.result(class_names)
+cm = matrix.counts
+acc = result["accuracy"]
 
-print("\n📊 Classification Report:\n", report)
-print(f"🎯 Test Accuracy: {acc:.2f}%")
+print("\n📊 Classification Report:\n", format_report(result["report"], class_names))
+print(f"🎯 Test Accuracy: {acc:.2f}% ({throughput:.1f} img/s)")
 
 plt.figure(figsize=(5, 4))
 sns.heatmap(cm, annot=True, fmt="d", cmap="Blues",
@@ -159,7 +159,7 @@ if os.path.exists(test_fake_dir) and len(os.listdir(test_fake_dir)) > 0:
     print("="*50)
     print(f"🎞️ 테스트 이미지: {test_image_path}")
 
-    img = Image.open(test_image_path).convert("RGB")
+    img = open_for_classifier(test_image_path)
     input_tensor = transform(img).unsqueeze(0).to(DEVICE)
 
     outputs = model(input_tensor)
@@ -202,5 +202,4 @@ else:
 # ==============================================================
 
 os.chdir("C:/AI/project/AdvancedProject/Deepfake_test/ai/modelling_jrheo/evaluation")
-from evaluation_summary import save_evaluation_results
-save_evaluation_results(y_true, y_pred, class_names)
+save_result(result)  # evaluation_summary.save_evaluation_results와 같은 evaluation_result.json
@@ -0,0 +1,135 @@
+# Step 4. FP32 vs INT8 양자화 모델 비교 리포트
+
+"""
+1) 먼저 INT8 모델 생성 (루트에서 실행)
+   - python -m ai.modules.quantize --model-type korean --calib-dir <얼굴 crop 폴더>
+
+2) 테스트 세트(ImageFolder 구조: test/Fake, test/Real)로 비교 실행
+   - python ai/evaluation/quantization_report.py --model-type korean --test-dir <test 폴더>
+
+3) 결과
+   - evaluation_result_<model_type>_fp32.json / _int8.json  (save_evaluation_results 형식)
+   - quantization_report_<model_type>.json                 (정확도 / 혼동행렬 / 이미지당 지연시간 비교)
+   - 정확도 하락이 --max-accuracy-drop(기본 1.0%p)을 넘으면 종료 코드 1 (정확도 게이트)
+
+※ 입력 전처리는 서빙 경로(/api/predict)와 동일 (Resize 224 + ToTensor)
+"""
+
+import os
+import sys
+import time
+import json
+import argparse
+from pathlib import Path
+
+import numpy as np
+import torch
+from torchvision import datasets
+from torch.utils.data import DataLoader
+from tqdm import tqdm
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from ai.modules.model_registry import MODEL_PATHS, build_model, resolve_model_type
+from ai.modules.quantize import load_quantized
+from ai.modules.image_io import classifier_loader
+from ai.modules.Deepfake_Evaluation_MobileNet_v3_final_application_number_option import transform
+from evaluation_summary import save_evaluation_results
+
+
+def evaluate(model, loader):
+    y_true, y_pred = [], []
+    with torch.inference_mode():
+        for imgs, labels in tqdm(loader, desc="Evaluating"):
+            preds = model(imgs).argmax(1)
+            y_true.extend(labels.numpy())
+            y_pred.extend(preds.numpy())
+    return y_true, y_pred
+
+
+def per_image_latency(model, dataset, num_images):
+    """배치 크기 1 기준 이미지당 추론 지연시간 (ms, 전처리 제외)"""
+    n = min(num_images, len(dataset))
+    if n < 1:
+        raise ValueError("지연시간 측정에 사용할 이미지가 없습니다.")
+    warmup = min(5, n - 1)  # 이미지가 적어도 최소 1장은 측정
+    timings = []
+    with torch.inference_mode():
+        for i in range(n):
+            x = dataset[i][0].unsqueeze(0)
+            if i < warmup:  # 워밍업
+                model(x)
+                continue
+            start = time.perf_counter()
+            model(x)
+            timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "p50_ms": float(np.percentile(timings, 50)),
+        "p95_ms": float(np.percentile(timings, 95)),
+        "mean_ms": float(np.mean(timings)),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="FP32 vs INT8 정확도/지연시간 비교")
+    parser.add_argument("--model-type", default="korean")
+    parser.add_argument("--test-dir", required=True)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--num-workers", type=int, default=2)
+    parser.add_argument("--latency-images", type=int, default=200)
+    parser.add_argument("--max-accuracy-drop", type=float, default=1.0, help="허용 정확도 하락 (%%p)")
+    parser.add_argument("--output-dir", default=os.path.dirname(os.path.abspath(__file__)))
+    args = parser.parse_args()
+
+    model_type = resolve_model_type(args.model_type)
+    model_path = MODEL_PATHS[model_type]
+    test_ds = datasets.ImageFolder(args.test_dir, transform=transform, loader=classifier_loader)
+    test_loader = DataLoader(test_ds, batch_size=args.batch_size, shuffle=False, num_workers=args.num_workers)
+    class_names = test_ds.classes
+    print(f"✅ 클래스 매핑: {test_ds.class_to_idx}")
+
+    models_to_compare = {
+        "fp32": build_model(model_path),
+        "int8": load_quantized(model_path, require_gradcam=False),
+    }
+
+    summary = {"model_type": model_type, "classes": class_names, "variants": {}}
+    for variant, model in models_to_compare.items():
+        print(f"\n📈 [{variant}] 평가 시작...")
+        y_true, y_pred = evaluate(model, test_loader)
+        result = save_evaluation_results(
+            y_true, y_pred, class_names,
+            output_path=os.path.join(args.output_dir, f"evaluation_result_{model_type}_{variant}.json"),
+        )
+        summary["variants"][variant] = {
+            "accuracy": result["accuracy"],
+            "confusion_matrix": result["confusion_matrix"],
+            "latency": per_image_latency(model, test_ds, args.latency_images),
+        }
+
+    fp32, int8 = summary["variants"]["fp32"], summary["variants"]["int8"]
+    summary["accuracy_delta"] = int8["accuracy"] - fp32["accuracy"]
+    summary["speedup_p50"] = fp32["latency"]["p50_ms"] / int8["latency"]["p50_ms"]
+    summary["accuracy_gate"] = {
+        "max_drop": args.max_accuracy_drop,
+        "passed": summary["accuracy_delta"] >= -args.max_accuracy_drop,
+    }
+
+    report_path = os.path.join(args.output_dir, f"quantization_report_{model_type}.json")
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=4, ensure_ascii=False)
+
+    print("\n📊 FP32 vs INT8")
+    for variant, v in summary["variants"].items():
+        print(f"  {variant}: 정확도 {v['accuracy']:.2f}% | p50 {v['latency']['p50_ms']:.2f} ms "
+              f"| 혼동행렬 {v['confusion_matrix']}")
+    print(f"  정확도 변화: {summary['accuracy_delta']:+.2f}%p | 속도 향상: {summary['speedup_p50']:.2f}x")
+    print(f"💾 리포트 저장: {report_path}")
+
+    # ✅ 정확도 게이트: 허용치 이상 하락하면 INT8 모델을 서빙에 쓰지 않도록 실패 처리
+    if not summary["accuracy_gate"]["passed"]:
+        print(f"❌ 정확도 게이트 실패: {summary['accuracy_delta']:+.2f}%p (허용 -{args.max_accuracy_drop}%p)")
+        sys.exit(1)
+    print("✅ 정확도 게이트 통과")
@@ -3,28 +3,40 @@
 🎯 MobileNetV3-Small 기반 딥페이크 판별 통합 파이프라인
 ---------------------------------------------------------------
 ✅ 주요 기능:
-1. 데이터 자동 전처리 (train/val/test 분리)
+1. 데이터 인덱스 (내용 해시 기반 train/val/test 결정적 분할, 파일 복사 없음)
 2. MobileNetV3-Small 파인튜닝
 3. Early Stopping 적용 (patience=10)
 4. 학습곡선(loss/accuracy) 시각화
+   (USE_FEATURE_CACHE=True: 고정 백본 특징을 1회 캐시하고 classifier만 학습)
 5. 테스트 세트 평가 + Grad-CAM 시각화
 ===============================================================
 """
 
-import os, random, shutil
+import os, random
 import torch
 import torch.nn as nn
-from torchvision import datasets, transforms, models
+from torchvision import transforms, models
 from torch.utils.data import DataLoader
 from torch.optim import AdamW
 from torch.optim.lr_scheduler import StepLR
-from sklearn.metrics import classification_report, confusion_matrix
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from tqdm import tqdm
 from PIL import Image
 import cv2
+try:  # ai/에서 실행 (modules 패키지)
+    from modules.feature_cache import build_feature_cache, evaluate_head, load_split, train_head
+    from modules.dataset_index import DatasetIndex, IndexedImageDataset
+    from modules.image_shards import IMAGENET_MEAN, IMAGENET_STD, ShardedImageDataset, ShardTransform, write_shards
+    from modules.eval_runner import ConfusionMatrix, evaluate, format_report, make_loader
+    from modules.model_registry import CLASS_NAMES
+except ImportError:  # ai/modules/에서 실행
+    from feature_cache import build_feature_cache, evaluate_head, load_split, train_head
+    from dataset_index import DatasetIndex, IndexedImageDataset
+    from image_shards import IMAGENET_MEAN, IMAGENET_STD, ShardedImageDataset, ShardTransform, write_shards
+    from eval_runner import ConfusionMatrix, evaluate, format_report, make_loader
+    from model_registry import CLASS_NAMES
 %matplotlib auto
 
 # ==============================================================
@@ -33,6 +45,7 @@ import cv2
 BASE_DIR = "D:/AI_DEV_Course/Work_space/PROJECT/Advanced_Project_Team2/Model(MobileNet)"
 FAKE_SRC = os.path.join(BASE_DIR, "E:/Deepfake_Image_AIhub/Dataset_deepfake_cropped/fake_images")
 REAL_SRC = os.path.join(BASE_DIR, "E:/Deepfake_Image_AIhub/Dataset_deepfake_cropped/real_images")
+INDEX_PATH = os.path.join(BASE_DIR, "dataset_index.sqlite3")
 MODEL_PATH = os.path.join(BASE_DIR, "D:/AI_DEV_Course/Work_space/PROJECT/Advanced_Project_Team2/Model(MobileNet)/mobilenetv3_deepfake_final.pth")
 
 DEVICE = torch.device("cuda" if torch.cuda.is_available() else "cpu")
@@ -42,58 +55,31 @@ EPOCHS = 100
 LR = 1e-4
 PATIENCE = 10
 
+# 특징 캐시 모드: model.features는 고정이므로 train/val/test에 백본을 1회만 실행해
+# 576차원 pooled 특징을 float16 memmap으로 저장하고 model.classifier만 학습 (에폭당 디코딩 / 백본 연산 없음)
+# 기본은 기존 전체 파인튜닝 — 켜려면 True
+USE_FEATURE_CACHE = False
+FEATURE_CACHE_DIR = os.path.join(BASE_DIR, "feature_cache")
+HEAD_BATCH_SIZE = 256
+EVAL_BATCH_SIZE = 128
+
+# 샤드 모드: split별 이미지를 224x224 uint8로 1회만 디코딩해 .npy 샤드에 저장하고 memmap으로 읽음 (에폭마다 JPEG 디코딩 없음)
+# 기본은 원본 이미지를 그대로 읽음 — 켜려면 True
+USE_SHARDS = False
+SHARD_DIR = os.path.join(BASE_DIR, "shards")
+
 print(f"📁 데이터 경로: {BASE_DIR}")
 print(f"💾 모델 저장: {MODEL_PATH}")
 print(f"💻 디바이스: {DEVICE}")
 
 # ==============================================================
-# 2️⃣ 데이터 전처리: train/val/test 자동 생성
+# 2️⃣ 데이터 인덱스: train/val/test 결정적 분할 (원본 위치에서 바로 읽음)
 # ==============================================================
-def prepare_dataset(base_dir):
-    print("🚀 데이터 전처리 시작...")
-
-    dest_dirs = {
-        "train": {"Fake": os.path.join(base_dir, "train", "Fake"),
-                  "Real": os.path.join(base_dir, "train", "Real")},
-        "val": {"Fake": os.path.join(base_dir, "val", "Fake"),
-                "Real": os.path.join(base_dir, "val", "Real")},
-        "test": {"Fake": os.path.join(base_dir, "test", "Fake"),
-                 "Real": os.path.join(base_dir, "test", "Real")},
-    }
-
-    for split, paths in dest_dirs.items():
-        for path in paths.values():
-            os.makedirs(path, exist_ok=True)
-
-    def split_and_copy(src_dir, label):
-        files = [f for f in os.listdir(src_dir) if f.lower().endswith((".jpg", ".jpeg", ".png"))]
-        random.shuffle(files)
-        n_total = len(files)
-        n_train = int(n_total * 0.8)
-        n_val = int(n_total * 0.1)
-        n_test = n_total - n_train - n_val
-
-        splits = {
-            "train": files[:n_train],
-            "val": files[n_train:n_train + n_val],
-            "test": files[n_train + n_val:]
-        }
-
-        print(f"\n📊 [{label}] 총 {n_total}장 → train:{n_train}, val:{n_val}, test:{n_test}")
-        for split, file_list in splits.items():
-            dest_dir = dest_dirs[split][label]
-            for fname in tqdm(file_list, desc=f"{label} → {split}", unit="img"):
-                src_path = os.path.join(src_dir, fname)
-                dst_path = os.path.join(dest_dir, fname)
-                if not os.path.exists(dst_path):
-                    shutil.copy2(src_path, dst_path)
-
-    split_and_copy(FAKE_SRC, "Fake")
-    split_and_copy(REAL_SRC, "Real")
-
-    print("\n🎉 데이터 전처리 완료!")
-
-prepare_dataset(BASE_DIR)
+# 내용 해시로 split을 정하므로 실행마다 같은 분할, 다시 실행하면 새 파일 / 바뀐 파일만 해시
+dataset_index = DatasetIndex(INDEX_PATH, ratios=(0.8, 0.1, 0.1), seed=0)
+print(f"📊 인덱스 스캔: {dataset_index.scan({'Fake': FAKE_SRC, 'Real': REAL_SRC})}")
+for split, counts in dataset_index.counts().items():
+    print(f"  {split}: {counts}")
 
 # ==============================================================
 # 3️⃣ 데이터 로더 구성
@@ -105,13 +91,27 @@ transform = transforms.Compose([
                          std=[0.229, 0.224, 0.225])
 ])
 
-train_ds = datasets.ImageFolder(os.path.join(BASE_DIR, "train"), transform=transform)
-val_ds = datasets.ImageFolder(os.path.join(BASE_DIR, "val"), transform=transform)
-test_ds = datasets.ImageFolder(os.path.join(BASE_DIR, "test"), transform=transform)
+if USE_SHARDS:
+    # Resize는 샤드 생성 시 적용 → 로드 시에는 ToTensor + Normalize만 (배치 텐서 연산)
+    input_transform = ShardTransform(IMAGENET_MEAN, IMAGENET_STD)
+    split_ds = {}
+    for split in ("train", "val", "test"):
+        indexed = IndexedImageDataset(dataset_index, split)
+        write_shards(indexed.samples, indexed.classes, os.path.join(SHARD_DIR, split), size=IMG_SIZE, num_workers=4)
+        split_ds[split] = ShardedImageDataset(os.path.join(SHARD_DIR, split), transform=input_transform)
+    train_ds, val_ds, test_ds = split_ds["train"], split_ds["val"], split_ds["test"]
+    test_samples = indexed.samples  # (원본 경로, 클래스) — Grad-CAM 샘플용
+else:
+    input_transform = transform
+    train_ds = IndexedImageDataset(dataset_index, "train", transform=transform)
+    val_ds = IndexedImageDataset(dataset_index, "val", transform=transform)
+    test_ds = IndexedImageDataset(dataset_index, "test", transform=transform)
+    test_samples = test_ds.samples
+dataset_index.close()
 
 train_loader = DataLoader(train_ds, batch_size=BATCH_SIZE, shuffle=True, num_workers=2)
 val_loader = DataLoader(val_ds, batch_size=BATCH_SIZE, shuffle=False, num_workers=2)
-test_loader = DataLoader(test_ds, batch_size=1, shuffle=False)
+test_loader = make_loader(test_ds, EVAL_BATCH_SIZE, num_workers=2, device=DEVICE)
 
 label_map = {v: k for k, v in train_ds.class_to_idx.items()}
 print(f"✅ 클래스 매핑: {label_map}")
@@ -143,64 +143,74 @@ scheduler = StepLR(optimizer, step_size=10, gamma=0.7)
 # ==============================================================
 # 6️⃣ 학습 루프 + Early Stopping + 학습곡선
 # ==============================================================
-train_losses, val_losses, train_accs, val_accs = [], [], [], []
-best_val_acc = 0
-patience_counter = 0
-
-for epoch in range(EPOCHS):
-    model.train()
-    running_loss, correct, total = 0, 0, 0
-
-    for imgs, labels in tqdm(train_loader, desc=f"🟢 Epoch {epoch+1}/{EPOCHS}"):
-        imgs, labels = imgs.to(DEVICE), labels.to(DEVICE)
-        optimizer.zero_grad()
-        outputs = model(imgs)
-        loss = criterion(outputs, labels)
-        loss.backward()
-        optimizer.step()
-
-        running_loss += loss.item()
-        preds = outputs.argmax(1)
-        correct += (preds == labels).sum().item()
-        total += labels.size(0)
-
-    train_loss = running_loss / len(train_loader)
-    train_acc = correct / total
-    train_losses.append(train_loss)
-    train_accs.append(train_acc)
-
-    # Validation
-    model.eval()
-    val_loss, val_correct, val_total = 0, 0, 0
-    with torch.no_grad():
-        for imgs, labels in val_loader:
+if USE_FEATURE_CACHE:
+    split_datasets = {"train": train_ds, "val": val_ds, "test": test_ds}
+    build_feature_cache(split_datasets, FEATURE_CACHE_DIR, model, input_transform, batch_size=64, num_workers=2, device=DEVICE)
+    history = train_head(
+        model, FEATURE_CACHE_DIR, criterion, optimizer, scheduler,
+        epochs=EPOCHS, patience=PATIENCE, batch_size=HEAD_BATCH_SIZE, device=DEVICE, model_path=MODEL_PATH,
+    )
+    train_losses, val_losses = history["train_loss"], history["val_loss"]
+    train_accs, val_accs = history["train_acc"], history["val_acc"]
+else:
+    train_losses, val_losses, train_accs, val_accs = [], [], [], []
+    best_val_acc = 0
+    patience_counter = 0
+
+    for epoch in range(EPOCHS):
+        model.train()
+        running_loss, correct, total = 0, 0, 0
+
+        for imgs, labels in tqdm(train_loader, desc=f"🟢 Epoch {epoch+1}/{EPOCHS}"):
             imgs, labels = imgs.to(DEVICE), labels.to(DEVICE)
+            optimizer.zero_grad()
             outputs = model(imgs)
             loss = criterion(outputs, labels)
-            val_loss += loss.item()
-            preds = outputs.argmax(1)
-            val_correct += (preds == labels).sum().item()
-            val_total += labels.size(0)
+            loss.backward()
+            optimizer.step()
 
-    val_loss /= len(val_loader)
-    val_acc = val_correct / val_total
-    val_losses.append(val_loss)
-    val_accs.append(val_acc)
-
-    print(f"📉 Loss: {train_loss:.4f}/{val_loss:.4f} | 🎯 Acc: {train_acc*100:.2f}%/{val_acc*100:.2f}%")
-
-    # Early Stopping
-    if val_acc > best_val_acc:
-        best_val_acc = val_acc
-        patience_counter = 0
-        torch.save(model.state_dict(), MODEL_PATH)
-    else:
-        patience_counter += 1
-        if patience_counter >= PATIENCE:
-            print("⏹️ Early stopping triggered!")
-            break
-
-    scheduler.step()
+            running_loss += loss.item()
+            preds = outputs.argmax(1)
+            correct += (preds == labels).sum().item()
+            total += labels.size(0)
+
+        train_loss = running_loss / len(train_loader)
+        train_acc = correct / total
+        train_losses.append(train_loss)
+        train_accs.append(train_acc)
+
+        # Validation
+        model.eval()
+        val_loss, val_correct, val_total = 0, 0, 0
+        with torch.no_grad():
+            for imgs, labels in val_loader:
+                imgs, labels = imgs.to(DEVICE), labels.to(DEVICE)
+                outputs = model(imgs)
+                loss = criterion(outputs, labels)
+                val_loss += loss.item()
+                preds = outputs.argmax(1)
+                val_correct += (preds == labels).sum().item()
+                val_total += labels.size(0)
+
+        val_loss /= len(val_loader)
+        val_acc = val_correct / val_total
+        val_losses.append(val_loss)
+        val_accs.append(val_acc)
+
+        print(f"📉 Loss: {train_loss:.4f}/{val_loss:.4f} | 🎯 Acc: {train_acc*100:.2f}%/{val_acc*100:.2f}%")
+
+        # Early Stopping
+        if val_acc > best_val_acc:
+            best_val_acc = val_acc
+            patience_counter = 0
+            torch.save(model.state_dict(), MODEL_PATH)
+        else:
+            patience_counter += 1
+            if patience_counter >= PATIENCE:
+                print("⏹️ Early stopping triggered!")
+                break
+
+        scheduler.step()
 
 # 학습곡선 시각화
 plt.figure(figsize=(10, 4))
@@ -220,20 +230,22 @@ plt.show()
 # ==============================================================
 model.load_state_dict(torch.load(MODEL_PATH, map_location=DEVICE))
 model.eval()
-y_true, y_pred = [], []
-with torch.no_grad():
-    for imgs, labels in tqdm(test_loader, desc="Evaluating"):
-        imgs, labels = imgs.to(DEVICE), labels.to(DEVICE)
-        outputs = model(imgs)
-        preds = outputs.argmax(1)
-        y_true.extend(labels.cpu().numpy())
-        y_pred.extend(preds.cpu().numpy())
-
-report = classification_report(y_true, y_pred, target_names=list(label_map.values()))
-cm = confusion_matrix(y_true, y_pred)
-acc = np.mean(np.array(y_true) == np.array(y_pred)) * 100
-
-print("\n📊 Classification Report:\n", report)
+if USE_FEATURE_CACHE:
+    # 백본이 고정이므로 캐시된 test 특징으로 평가 (전체 모델 평가와 float16 반올림 차이만 있음)
+    test_x, test_y, _ = load_split(FEATURE_CACHE_DIR, "test")
+    _, _, y_true, y_pred = evaluate_head(model.classifier, test_x, test_y, criterion, HEAD_BATCH_SIZE, DEVICE)
+    matrix = ConfusionMatrix(len(label_map))
+    matrix.update(y_true, y_pred)
+else:
+    # 배치 + 멀티 워커, 혼동행렬 누적
+    matrix, _ = evaluate(model, test_loader, len(label_map), DEVICE)
+
+class_names = list(label_map.values())
+report = matrix.report(class_names)
+cm = matrix.counts
+acc = matrix.accuracy * 100
+
+print("\n📊 Classification Report:\n", format_report(report, class_names))
 print(f"🎯 Test Accuracy: {acc:.2f}%")
 
 plt.figure(figsize=(5, 4))
@@ -276,11 +288,10 @@ class GradCAM:
         cam = (cam - cam.min()) / (cam.max() - cam.min() + 1e-8)
         return cam
 
-# 샘플 이미지 Grad-CAM
-test_fake_dir = os.path.join(BASE_DIR, "test", "Fake")
-if os.path.exists(test_fake_dir) and len(os.listdir(test_fake_dir)) > 0:
-    img_name = random.choice(os.listdir(test_fake_dir))
-    img_path = os.path.join(test_fake_dir, img_name)
+# 샘플 이미지 Grad-CAM (인덱스의 test split에서 Fake 원본 1장 — 복사된 test 폴더 없음)
+test_fake_paths = [path for path, target in test_samples if target == CLASS_NAMES.index("Fake")]
+if test_fake_paths:
+    img_path = random.choice(test_fake_paths)
     img = Image.open(img_path).convert("RGB")
     input_tensor = transform(img).unsqueeze(0).to(DEVICE)
     outputs = model(input_tensor)
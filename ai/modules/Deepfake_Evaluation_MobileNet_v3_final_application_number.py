@@ -7,42 +7,21 @@ import cv2
 import matplotlib.pyplot as plt
 import os
 
+from .gradcam import GradCAM
+
 
 # =====================================================
-# 1️⃣ Grad-CAM 클래스
+# 1️⃣ Grad-CAM
 # =====================================================
-class GradCAM:
-    def __init__(self, model, target_layer):
-        self.model = model
-        self.target_layer = target_layer
-        self.gradients = None
-        self.activations = None
-        self._register_hooks()
-
-    def _register_hooks(self):
-        def forward_hook(module, input, output):
-            self.activations = output.detach()
-
-        def backward_hook(module, grad_in, grad_out):
-            self.gradients = grad_out[0].detach()
-
-        self.target_layer.register_forward_hook(forward_hook)
-        self.target_layer.register_backward_hook(backward_hook)
-
-    def generate(self, input_tensor, class_idx):
-        output = self.model(input_tensor)
-        self.model.zero_grad()
-        target = output[0, class_idx]
-        target.backward()
-
-        gradients = self.gradients.cpu().numpy()[0]
-        activations = self.activations.cpu().numpy()[0]
-
-        weights = np.mean(gradients, axis=(1, 2))
-        cam = np.sum(weights[:, np.newaxis, np.newaxis] * activations, axis=0)
-        cam = np.maximum(cam, 0)
-        cam = cam / (np.max(cam) + 1e-8)
-        return cam
+def generate_gradcam_batch(model, batch_tensor, target_classes=None):
+    """
+    여러 이미지의 Grad-CAM을 forward 1회 + 역전파 1회로 생성 (대량 분석용)
+    target_classes=None이면 샘플별 예측 클래스 기준, 반환 shape: (N, H, W)
+    """
+    cam_generator = GradCAM(model)
+    if target_classes is None:
+        return cam_generator.explain(batch_tensor)[1]
+    return cam_generator.generate_batch(batch_tensor, target_classes)
 
 
 # =====================================================
@@ -150,19 +129,14 @@ def analyze_image_with_model_type(image_path, model_type="korean", visualize=Tru
     model.load_state_dict(torch.load(model_path, map_location="cpu"), strict=False)
     model.eval()
 
-    # 이미지 처리 및 예측
+    # 이미지 처리 + 예측 + Grad-CAM (features[-1] 기준, forward 1회)
     image, input_tensor = load_image(image_path)
-    with torch.no_grad():
-        output = model(input_tensor)
-        probs = torch.softmax(output, dim=1)[0]
-        pred_idx = torch.argmax(probs).item()
-        confidence = probs[pred_idx].item() * 100
-        pred_label = ["Fake", "Real"][pred_idx]
-
-    # Grad-CAM
-    target_layer = model.features[-1]
-    cam_generator = GradCAM(model, target_layer)
-    cam = cam_generator.generate(input_tensor, pred_idx)
+    cam_generator = GradCAM(model)
+    probs, cams = cam_generator.explain(input_tensor)
+    probs, cam = probs[0], cams[0]
+    pred_idx = torch.argmax(probs).item()
+    confidence = probs[pred_idx].item() * 100
+    pred_label = ["Fake", "Real"][pred_idx]
 
     overlay = overlay_cam_on_image(image, cam)
     number_layer = generate_number_layer(cam, np.array(image).shape)
@@ -176,6 +150,7 @@ def analyze_image_with_model_type(image_path, model_type="korean", visualize=Tru
 # =====================================================
 # 8️⃣ 실행 예시
 # =====================================================
+# ✅ 실행 명령 (루트에서 실행): python -m ai.modules.Deepfake_Evaluation_MobileNet_v3_final_application_number
 if __name__ == "__main__":
     image_path = "C:/AI/project/AdvancedProject/DeepfakeHunters/frontend/public/test_images/detect/test1.jpg"
 
@@ -3,125 +3,201 @@
 
 import torch
 import torch.nn.functional as F
-from torchvision import transforms, models
+from torchvision import transforms
 from PIL import Image
 import numpy as np
-import matplotlib.pyplot as plt
 import cv2
 import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from .model_registry import CLASS_NAMES, FAKE_INDEX, get_model
+from .gradcam import GradCAM
+from .image_io import CLASSIFIER_SIZE, IMG_SIZE, open_image
 
-# ==========================================================
-# ✅ Grad-CAM 생성 함수
-# ==========================================================
-def generate_gradcam(model, image_tensor, target_layer, image):
-    grads = []
-    activations = []
+transform = transforms.Compose([
+    transforms.Resize((224, 224)),
+    transforms.ToTensor(),
+])
 
-    def backward_hook(module, grad_in, grad_out):
-        grads.append(grad_out[0])
+# 원본 | Grad-CAM 비교 그림 저장 여부 (기본 끔 — 켜면 요청 처리 후 별도 스레드에서 생성)
+GRADCAM_COMPARISON = os.getenv("GRADCAM_COMPARISON", "0") == "1"
+COMPARISON_HEIGHT = 400
 
-    def forward_hook(module, input, output):
-        activations.append(output)
+# Grad-CAM 오버레이 최대 변 길이(px) — 큰 사진도 이 크기로 줄여 합성 (0이면 원본 해상도)
+OVERLAY_MAX_EDGE = int(os.getenv("OVERLAY_MAX_EDGE", "1024"))
+# 원본 해상도 오버레이를 별도 파일(gradcam_full_*.png)로도 저장할지 여부 (경로 모드, 별도 스레드)
+GRADCAM_FULLRES_EXPORT = os.getenv("GRADCAM_FULLRES_EXPORT", "0") == "1"
 
-    target_layer.register_forward_hook(forward_hook)
-    target_layer.register_backward_hook(backward_hook)
+_artifact_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gradcam-artifact")
 
-    output = model(image_tensor)
-    pred_class = output.argmax(dim=1)
-    model.zero_grad()
-    class_loss = output[0, pred_class]
-    class_loss.backward()
 
-    grad = grads[0].cpu().data.numpy()[0]
-    activation = activations[0].cpu().data.numpy()[0]
-    weights = np.mean(grad, axis=(1, 2))
+# ==========================================================
+# ✅ 입력 로드 / 배치 분류
+# ==========================================================
+def load_input(source, visualize=True):
+    """
+    이미지를 열어 (PIL 이미지, 1x3x224x224 입력 텐서) 반환 (source: 경로 / 바이트 / PIL / ndarray)
+    JPEG은 필요한 만큼만 축소 디코딩: 분류만 하면 224px, 오버레이를 그리면 OVERLAY_MAX_EDGE
+    (원본 해상도 오버레이 저장이 켜져 있으면 원본 해상도)
+    """
+    if not visualize:
+        reduce_to = CLASSIFIER_SIZE
+    elif GRADCAM_FULLRES_EXPORT or not OVERLAY_MAX_EDGE:
+        reduce_to = None
+    else:
+        reduce_to = max(OVERLAY_MAX_EDGE, IMG_SIZE)
+    image = open_image(source, reduce_to)
+    input_tensor = transform(image).unsqueeze(0)
+    return image, input_tensor
+
 
-    cam = np.zeros(activation.shape[1:], dtype=np.float32)
-    for i, w in enumerate(weights):
-        cam += w * activation[i, :, :]
+def predict_batch(model, batch_tensor):
+    """Nx3x224x224 배치를 한 번의 forward로 분류해 softmax 확률 (N, 2) 반환"""
+    with torch.no_grad():
+        output = model(batch_tensor)
+        return F.softmax(output, dim=1)
 
-    cam = np.maximum(cam, 0)
-    cam -= np.min(cam)
-    cam /= np.max(cam) if np.max(cam) != 0 else 1
 
-    
-    # ✅ 원본 이미지 크기로 리사이즈
-    width, height = image.size
-    cam = cv2.resize(cam, (width, height))
-    # (jrheo 수정) cam = cv2.resize(cam, (224, 224))
-        
-    return cam
+def classify_batch(model_type, input_tensors):
+    """
+    요청별 입력 텐서(1x3x224x224) 목록을 묶어 한 번에 분류하고
+    요청 순서대로 확률 벡터 목록을 돌려준다 (Grad-CAM 불필요 시).
+    """
+    model = get_model(model_type)
+    probs = predict_batch(model, torch.cat(input_tensors, dim=0))
+    return list(probs)
+
+
+def explain_batch(model_type, input_tensors):
+    """
+    마이크로 배칭 스케줄러용 배치 함수.
+    입력 목록을 묶어 forward 1회로 분류 + Grad-CAM을 계산하고
+    요청 순서대로 (확률 벡터, CAM) 목록을 돌려준다.
+    """
+    # features[-1] 기준 고속 경로: 백본 1회 forward + head만 역전파, hook 없음
+    cam_engine = GradCAM(get_model(model_type))
+    probs, cams = cam_engine.explain(torch.cat(input_tensors, dim=0))
+    return list(zip(probs, cams))
 
 
 # ==========================================================
 # ✅ 메인 분석 함수
 # ==========================================================
-def analyze_image_with_model_type(path, model_type="korean", visualize=True):
+def analyze_image_with_model_type(path, model_type="korean", visualize=True, in_memory=False):
     """
-    이미지 경로를 받아 딥페이크 예측 + Grad-CAM 시각화 수행
+    이미지(경로 / 바이트 / PIL / ndarray)를 받아 딥페이크 예측 + Grad-CAM 시각화 수행
     visualize=True일 경우 Grad-CAM 이미지를 저장하고 경로 반환
+    (in_memory=True면 저장 없이 PNG 바이트 반환)
     """
+    image, input_tensor = load_input(path, visualize)
+    if visualize:
+        confidence, cam = explain_batch(model_type, [input_tensor])[0]
+    else:
+        confidence, cam = classify_batch(model_type, [input_tensor])[0], None
+    return analyze_loaded(image, confidence, cam, in_memory=in_memory)
 
-    model_path = f"ai/models/mobilenetv3_deepfake_final.pth"
-    model = models.mobilenet_v3_small(pretrained=False)
-    model.classifier[3] = torch.nn.Linear(1024, 2)
-    model.load_state_dict(torch.load(model_path, map_location="cpu"))
-    model.eval()
 
-    transform = transforms.Compose([
-        transforms.Resize((224, 224)),
-        transforms.ToTensor(),
-    ])
+def _bounded_size(width, height, max_edge):
+    scale = min(1.0, max_edge / max(width, height)) if max_edge else 1.0
+    return max(1, round(width * scale)), max(1, round(height * scale))
 
-    image = Image.open(path).convert("RGB")
-    input_tensor = transform(image).unsqueeze(0)
 
-    with torch.no_grad():
-        output = model(input_tensor)
-        confidence = F.softmax(output, dim=1)[0]
-        pred_label = "Fake" if torch.argmax(confidence).item() == 1 else "Real"
-        conf_value = confidence[1].item() * 100
+def render_overlay(image, cam, max_edge=OVERLAY_MAX_EDGE):
+    """
+    원본 이미지 위에 Grad-CAM 히트맵 합성 → (overlay RGB ndarray, 시각적 활성도)
+    긴 변이 max_edge를 넘으면 원본을 먼저 줄인 뒤 그 크기에서 합성 (None / 0이면 원본 해상도)
+    """
+    size = _bounded_size(image.width, image.height, max_edge)
+    if size != image.size:
+        image = image.resize(size, Image.BILINEAR, reducing_gap=2.0)
+    img = np.asarray(image)
+     # (jrheo 수정) img = np.array(image.resize((224, 224)))
+    cam = cv2.resize(cam, size)  # width, height 맞춤
+    heatmap = cv2.applyColorMap(np.uint8(255 * cam), cv2.COLORMAP_JET)
+
+    # ✅ 붉은색 퍼짐 개선 — threshold 마스크 적용 (임시 배열 없이 blend 후 마스크 위치만 복사)
+    threshold = 0.4
+    mask = cam > threshold
+    overlay = img.copy()
+    blended = cv2.addWeighted(heatmap, 0.7, img, 0.3, 0)
+    np.copyto(overlay, blended, where=mask[..., None])
+
+    # ✅ 시각적 활성도 계산 (Grad-CAM 평균 강도)
+    fake_intensity = float(np.mean(cam))
+    return overlay, fake_intensity
+
+
+def encode_png(overlay):
+    """RGB overlay → PNG 바이트 (디스크 저장 없이 메모리에서 인코딩)"""
+    ok, buffer = cv2.imencode(".png", cv2.cvtColor(overlay, cv2.COLOR_RGB2BGR))
+    if not ok:
+        raise RuntimeError("Grad-CAM PNG 인코딩 실패")
+    return buffer.tobytes()
+
+
+def render_comparison(image, overlay, height=COMPARISON_HEIGHT):
+    """원본 | Grad-CAM 가로 비교 그림 (matplotlib 없이 배열 합성, RGB ndarray)"""
+    panels = []
+    for title, panel in (("Original", np.array(image)), ("Grad-CAM", overlay)):
+        width = max(1, round(panel.shape[1] * height / panel.shape[0]))
+        panel = cv2.resize(panel, (width, height), interpolation=cv2.INTER_AREA)
+        header = np.full((32, width, 3), 255, dtype=np.uint8)
+        cv2.putText(header, title, (8, 23), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 2, cv2.LINE_AA)
+        panels.append(np.vstack([header, panel]))
+
+    gutter = np.full((height + 32, 16, 3), 255, dtype=np.uint8)
+    return np.hstack([panels[0], gutter, panels[1]])
+
+
+def save_comparison(image, overlay, path):
+    cv2.imwrite(path, cv2.cvtColor(render_comparison(image, overlay), cv2.COLOR_RGB2BGR))
+
+
+def export_full_resolution(image, cam, path):
+    """원본 해상도 Grad-CAM 오버레이 저장 (다운로드 / 보고서용)"""
+    overlay, _ = render_overlay(image, cam, max_edge=None)
+    cv2.imwrite(path, cv2.cvtColor(overlay, cv2.COLOR_RGB2BGR))
+    return path
+
+
+def save_gradcam(image, overlay, cam=None, comparison=GRADCAM_COMPARISON, full_resolution=GRADCAM_FULLRES_EXPORT):
+    """
+    overlay PNG를 ai/gradcam_results에 저장하고 경로 반환.
+    comparison=True면 비교 그림(gradcam_plot_*.png)은 응답을 막지 않도록 별도 스레드에서 나중에 저장한다.
+    full_resolution=True면 원본 해상도 오버레이(gradcam_full_*.png)도 같은 방식으로 저장한다.
+    """
+    # ✅ 저장 (동시 요청이 같은 초에 들어와도 덮어쓰지 않도록 uuid 추가)
+    timestamp = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+    save_dir = os.path.join("ai", "gradcam_results")
+    os.makedirs(save_dir, exist_ok=True)
+    gradcam_path = os.path.join(save_dir, f"gradcam_{timestamp}.png")
+    cv2.imwrite(gradcam_path, cv2.cvtColor(overlay, cv2.COLOR_RGB2BGR))
+
+    if comparison:
+        _artifact_pool.submit(save_comparison, image, overlay, os.path.join(save_dir, f"gradcam_plot_{timestamp}.png"))
+    if full_resolution and cam is not None:
+        _artifact_pool.submit(export_full_resolution, image, cam, os.path.join(save_dir, f"gradcam_full_{timestamp}.png"))
+    return gradcam_path
+
+
+def analyze_loaded(image, confidence, cam=None, in_memory=False):
+    """
+    분류 확률(confidence)과 저해상도 CAM이 이미 계산된 입력에 대해 라벨/리포트/Grad-CAM 이미지 생성
+    (단건 분석과 배치 스케줄러 경로가 공통으로 사용, cam=None이면 시각화 생략)
+    반환 4번째 값: in_memory=False면 저장된 Grad-CAM 경로, True면 PNG 바이트
+    """
+    pred_label = CLASS_NAMES[torch.argmax(confidence).item()]
+    conf_value = confidence[FAKE_INDEX].item() * 100
 
     # ✅ Grad-CAM 생성
-    gradcam_path = None
+    gradcam = None
     fake_intensity = None
-    if visualize:
-        cam = generate_gradcam(model, input_tensor, model.features[-1], image)
-        img = np.array(image)
-         # (jrheo 수정) img = np.array(image.resize((224, 224)))
-        cam = cv2.resize(cam, (img.shape[1], img.shape[0]))  # width, height 맞춤
-        heatmap = cv2.applyColorMap(np.uint8(255 * cam), cv2.COLORMAP_JET)
-       
-        
-        # ✅ 붉은색 퍼짐 개선 — threshold 마스크 적용
-        threshold = 0.4
-        mask = cam > threshold
-        overlay = img.copy()
-        overlay[mask] = np.uint8(0.7 * heatmap[mask] + 0.3 * img[mask])
-
-        # ✅ 시각적 활성도 계산 (Grad-CAM 평균 강도)
-        fake_intensity = float(np.mean(cam))
-
-        # ✅ 저장
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        save_dir = os.path.join("ai", "gradcam_results")
-        os.makedirs(save_dir, exist_ok=True)
-        gradcam_path = os.path.join(save_dir, f"gradcam_{timestamp}.png")
-        cv2.imwrite(gradcam_path, cv2.cvtColor(overlay, cv2.COLOR_RGB2BGR))
-
-        plt.figure(figsize=(8, 4))
-        plt.subplot(1, 2, 1)
-        plt.imshow(image)
-        plt.title("원본")
-
-        plt.subplot(1, 2, 2)
-        plt.imshow(overlay)
-        plt.title("Grad-CAM")
-        plt.savefig(os.path.join(save_dir, f"gradcam_plot_{timestamp}.png"))
-        plt.close()
+    if cam is not None:
+        overlay, fake_intensity = render_overlay(image, cam)
+        gradcam = encode_png(overlay) if in_memory else save_gradcam(image, overlay, cam)
 
     report = f"이 이미지는 {pred_label} ({conf_value:.2f}%)\n비정상적인 질감, 경계선 왜곡, 조명 불균형 등 딥페이크 흔적이 감지되었습니다."
 
-    return pred_label, conf_value, report, gradcam_path, fake_intensity
+    return pred_label, conf_value, report, gradcam, fake_intensity
@@ -0,0 +1,483 @@
+# Path: ai/modules/bulk_analyze.py
+# Desc: 디렉터리 단위 오프라인 대량 탐지 CLI (DataLoader 병렬 디코딩 + 배치 추론 + CSV/Parquet 누적 저장 + 재개용 해시 매니페스트)
+
+# ✅ 실행 명령 (루트에서 실행)
+# python -m ai.modules.bulk_analyze --input-dir <이미지 폴더> --output results.csv --model-type korean
+# python -m ai.modules.bulk_analyze --input-dir <이미지 폴더> --output results.parquet --cam-dir cams --num-workers 8
+# python -m ai.modules.bulk_analyze --shard-dir <샤드 폴더> --output results.csv   (ai.modules.image_shards로 만든 사전 디코딩 샤드)
+# 중단되면 같은 명령을 다시 실행 → 매니페스트에 기록된 이미지는 건너뛰고 이어서 처리
+
+import os
+import csv
+import time
+import sqlite3
+import hashlib
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+from torch.utils.data import DataLoader, Dataset
+from tqdm import tqdm
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet 출력을 쓰지 않으면 설치하지 않아도 됨
+    pa = pq = None
+
+from .gradcam import GradCAM
+from .image_io import IMG_SIZE, open_for_classifier
+from .image_shards import ShardedImageDataset, ShardTransform
+from .model_registry import (
+    BACKENDS,
+    DETECTOR_BACKEND,
+    FAKE_INDEX,
+    MODEL_PATHS,
+    checkpoint_version,
+    load_detector,
+    resolve_model_type,
+)
+from .Deepfake_Evaluation_MobileNet_v3_final_application_number_option import transform
+
+# ==========================================================
+# ✅ 설정
+# ==========================================================
+IMAGE_EXTS = (".jpg", ".jpeg", ".png")
+FLUSH_ROWS = 4096  # 이 행 수마다 결과 파일 + CAM + 매니페스트를 함께 확정
+
+COLUMNS = [
+    "path",
+    "sha256",
+    "model_type",
+    "model_version",
+    "pred_label",
+    "fake_probability",
+    "cam_file",
+    "cam_index",
+    "error",
+]
+
+
+# ==========================================================
+# 1️⃣ 입력 탐색 / 디코딩
+# ==========================================================
+def scan_images(root):
+    """root 아래 이미지 (경로, 크기, 수정 시각 ns) — 실행마다 같은 순서"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.lower().endswith(IMAGE_EXTS):
+                path = os.path.join(dirpath, name)
+                stat = os.stat(path)
+                yield path, stat.st_size, stat.st_mtime_ns
+
+
+class ImageFileDataset(Dataset):
+    """
+    DataLoader 워커에서 파일 읽기 + SHA-256 + 224px 축소 디코딩 + 텐서 변환 (서빙 경로와 같은 전처리)
+    반환: (입력 텐서, 항목 번호, sha256, 오류 메시지 — 정상이면 "")
+    """
+
+    def __init__(self, entries):
+        self.entries = entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __getitem__(self, index):
+        path = self.entries[index][0]
+        digest = ""
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            digest = hashlib.sha256(data).hexdigest()
+            return transform(open_for_classifier(data)), index, digest, ""
+        except Exception as e:
+            return torch.zeros(3, IMG_SIZE, IMG_SIZE), index, digest, f"{type(e).__name__}: {e}"
+
+
+class ShardInputDataset(Dataset):
+    """
+    사전 디코딩 샤드 입력 — JPEG 디코딩 / 해시 없이 memmap에서 바로 (ToTensor만, 서빙 경로와 같은 값)
+    반환 형식은 ImageFileDataset과 동일
+    """
+
+    def __init__(self, shards, positions):
+        self.shards = shards
+        self.positions = positions
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __getitem__(self, index):
+        position = self.positions[index]
+        image, _ = self.shards[position]
+        return image, index, self.shards.digests[position], ""
+
+
+# ==========================================================
+# 2️⃣ 재개용 매니페스트 (SQLite)
+# ==========================================================
+class RunManifest:
+    """
+    완료된 이미지 기록.
+    - files: 경로 → (크기, 수정 시각, sha256) — 다시 실행하면 바뀌지 않은 파일은 읽지도 않고 건너뜀
+    - done: (sha256, model_type, 모델 버전) → 판정 — 경로가 바뀌었거나 같은 내용의 다른 파일은 추론 없이 결과 재사용
+    - failed: (경로, model_type, 모델 버전) → 크기 / 수정 시각 / 오류 — 오류 행도 1번만 기록 (파일이 바뀌면 다시 시도)
+    결과 파일이 확정된 뒤에만 기록하므로, 중단 시 마지막 확정 이후 이미지만 다시 처리된다.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, sha256 TEXT)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS done ("
+            "sha256 TEXT, model_type TEXT, version TEXT, pred_label TEXT, fake_probability REAL, "
+            "PRIMARY KEY (sha256, model_type, version))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS failed ("
+            "path TEXT, model_type TEXT, version TEXT, size INTEGER, mtime_ns INTEGER, error TEXT, "
+            "PRIMARY KEY (path, model_type, version))"
+        )
+        self._conn.commit()
+
+    def completed_paths(self, model_type, version):
+        """이 모델 버전으로 완료(판정 또는 오류 기록)된 (경로, 크기, 수정 시각) 집합"""
+        rows = self._conn.execute(
+            "SELECT f.path, f.size, f.mtime_ns FROM files f "
+            "JOIN done d ON d.sha256 = f.sha256 WHERE d.model_type = ? AND d.version = ? "
+            "UNION SELECT path, size, mtime_ns FROM failed WHERE model_type = ? AND version = ?",
+            (model_type, version, model_type, version),
+        )
+        return set(rows)
+
+    def lookup(self, digests, model_type, version):
+        """이미 판정된 해시 → (pred_label, fake_probability)"""
+        digests = list(set(digests))
+        if not digests:
+            return {}
+        marks = ",".join("?" * len(digests))
+        rows = self._conn.execute(
+            f"SELECT sha256, pred_label, fake_probability FROM done "
+            f"WHERE model_type = ? AND version = ? AND sha256 IN ({marks})",
+            (model_type, version, *digests),
+        )
+        return {digest: (label, prob) for digest, label, prob in rows}
+
+    def mark(self, entries, model_type, version, failures=()):
+        """
+        entries: (경로, 크기, 수정 시각, sha256, pred_label, fake_probability) 목록
+        failures: (경로, 크기, 수정 시각, 오류) 목록 — 함께 1 트랜잭션
+        """
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO failed VALUES (?, ?, ?, ?, ?, ?)",
+                [(path, model_type, version, size, mtime_ns, error) for path, size, mtime_ns, error in failures],
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                [entry[:4] for entry in entries],
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO done VALUES (?, ?, ?, ?, ?)",
+                [(digest, model_type, version, label, prob) for _, _, _, digest, label, prob in entries],
+            )
+
+    def close(self):
+        self._conn.close()
+
+
+# ==========================================================
+# 3️⃣ 결과 / CAM 저장
+# ==========================================================
+class ResultWriter:
+    """
+    결과 행 누적 저장.
+    - .csv: 같은 파일에 이어쓰기 (flush마다 fsync)
+    - .parquet: output을 디렉터리로 사용, flush마다 part 파일 1개를 원자적으로 생성
+      (중단돼도 이미 확정된 part는 온전함 — pandas.read_parquet(<디렉터리>)로 한 번에 읽기)
+    """
+
+    def __init__(self, output, run_id):
+        self.output = Path(output)
+        self.run_id = run_id
+        self.format = "parquet" if self.output.suffix == ".parquet" else "csv"
+        self._rows = []
+        self._parts = 0
+
+        if self.format == "parquet":
+            if pq is None:
+                raise RuntimeError("pyarrow가 설치되어 있지 않습니다. (pip install pyarrow) — 또는 .csv로 저장")
+            self.output.mkdir(parents=True, exist_ok=True)
+            self._file = None
+        else:
+            self.output.parent.mkdir(parents=True, exist_ok=True)
+            is_new = not self.output.exists() or self.output.stat().st_size == 0
+            self._file = open(self.output, "a", newline="", encoding="utf-8")
+            self._csv = csv.DictWriter(self._file, fieldnames=COLUMNS)
+            if is_new:
+                self._csv.writeheader()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def write(self, rows):
+        self._rows.extend(rows)
+
+    def flush(self):
+        if not self._rows:
+            return
+        if self.format == "parquet":
+            table = pa.Table.from_pylist(self._rows, schema=_parquet_schema())
+            path = self.output / f"part-{self.run_id}-{self._parts:05d}.parquet"
+            tmp_path = path.with_suffix(".tmp")
+            pq.write_table(table, tmp_path)
+            os.replace(tmp_path, path)
+            self._parts += 1
+        else:
+            self._csv.writerows(self._rows)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._rows = []
+
+    def close(self):
+        # 확정(commit) 전 행은 버림 — 매니페스트에 없으므로 다시 실행하면 재처리됨
+        if self._file is not None:
+            self._file.close()
+
+
+def _parquet_schema():
+    return pa.schema([
+        ("path", pa.string()),
+        ("sha256", pa.string()),
+        ("model_type", pa.string()),
+        ("model_version", pa.string()),
+        ("pred_label", pa.string()),
+        ("fake_probability", pa.float32()),
+        ("cam_file", pa.string()),
+        ("cam_index", pa.int32()),
+        ("error", pa.string()),
+    ])
+
+
+class CamWriter:
+    """
+    Grad-CAM 배열(features[-1] 해상도, 224 입력 기준 7x7, 0~1)을 float16 npz 샤드로 저장.
+    결과 행의 cam_file / cam_index로 찾는다: np.load(cam_file)["cams"][cam_index]
+    """
+
+    def __init__(self, cam_dir, run_id):
+        self.cam_dir = Path(cam_dir)
+        self.cam_dir.mkdir(parents=True, exist_ok=True)
+        self.run_id = run_id
+        self._cams = []
+        self._digests = []
+        self._shards = 0
+
+    @property
+    def current_file(self):
+        return f"cams-{self.run_id}-{self._shards:05d}.npz"
+
+    def add(self, digest, cam):
+        """CAM 1개 추가 → (샤드 파일명, 샤드 내 번호)"""
+        self._cams.append(cam.astype(np.float16))
+        self._digests.append(digest)
+        return self.current_file, len(self._cams) - 1
+
+    def flush(self):
+        if not self._cams:
+            return
+        path = self.cam_dir / self.current_file
+        tmp_path = path.with_suffix(".tmp.npz")
+        np.savez(tmp_path, cams=np.stack(self._cams), sha256=np.array(self._digests))
+        os.replace(tmp_path, path)
+        self._cams = []
+        self._digests = []
+        self._shards += 1
+
+
+# ==========================================================
+# 4️⃣ 실행
+# ==========================================================
+def default_manifest_path(output):
+    output = Path(output)
+    return output.parent / f"{output.stem}.manifest.sqlite3"
+
+
+def _pending_files(input_dir, manifest, key, version):
+    """디렉터리 입력: 바뀌지 않은 완료 파일은 읽지 않고 건너뜀 → (전체 수, todo, Dataset)"""
+    entries = list(scan_images(input_dir))
+    completed = manifest.completed_paths(key, version)
+    todo = [entry for entry in entries if entry not in completed]
+    return len(entries), todo, ImageFileDataset(todo)
+
+
+def _pending_shards(shard_dir, manifest, key, version, chunk=500):
+    """샤드 입력: 샤드 생성 시 기록한 sha256으로 완료 여부 확인 → (전체 수, todo, Dataset)"""
+    shards = ShardedImageDataset(shard_dir, transform=ShardTransform())
+    positions = []
+    for start in range(0, len(shards), chunk):
+        digests = shards.digests[start:start + chunk]
+        done = manifest.lookup(digests, key, version)
+        positions.extend(start + i for i, digest in enumerate(digests) if digest not in done)
+    # 샤드 입력은 파일 크기 / 수정 시각 대신 0으로 기록 (디렉터리 실행 시에는 다시 해시)
+    todo = [(shards.samples[position][0], 0, 0) for position in positions]
+    return len(shards), todo, ShardInputDataset(shards, positions)
+
+
+def run(
+    input_dir,
+    output,
+    model_type="korean",
+    batch_size=64,
+    num_workers=4,
+    cam_dir=None,
+    manifest_path=None,
+    device="cpu",
+    backend=DETECTOR_BACKEND,
+    flush_rows=FLUSH_ROWS,
+    shard_dir=None,
+):
+    key = resolve_model_type(model_type)
+    model_path = MODEL_PATHS[key]
+    version = checkpoint_version(model_path, backend)
+    manifest = RunManifest(manifest_path or default_manifest_path(output))
+
+    def pending(version):
+        if shard_dir:
+            return _pending_shards(shard_dir, manifest, key, version)
+        return _pending_files(input_dir, manifest, key, version)
+
+    total, todo, dataset = pending(version)
+    print(f"📂 전체 {total}장 / 완료 {total - len(todo)}장 / 남은 {len(todo)}장 (모델: {key}, {version})")
+    if not todo:
+        manifest.close()
+        return
+
+    device = torch.device(device)
+    model = load_detector(model_path, backend, device)
+    loaded_version = checkpoint_version(model_path, backend)
+    if loaded_version != version:
+        # 로드 중 ONNX 자동 변환 등으로 파생 파일이 바뀜 → 새 지문 기준으로 다시 선별
+        version = loaded_version
+        total, todo, dataset = pending(version)
+        print(f"🔄 모델 지문 갱신: {version} (남은 {len(todo)}장)")
+    cam_engine = GradCAM(model) if cam_dir else None
+
+    run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+    writer = ResultWriter(output, run_id)
+    cam_writer = CamWriter(cam_dir, run_id) if cam_dir else None
+    loader_options = {"num_workers": num_workers, "pin_memory": device.type == "cuda"}
+    if num_workers > 0:
+        loader_options.update(prefetch_factor=4, persistent_workers=False)
+    loader = DataLoader(dataset, batch_size=batch_size, **loader_options)
+
+    def commit(marks, failures):
+        # 순서: CAM → 결과 → 매니페스트 (매니페스트에 있으면 결과가 이미 디스크에 있음)
+        if cam_writer is not None:
+            cam_writer.flush()
+        writer.flush()
+        manifest.mark(marks, key, version, failures)
+
+    counts = {"Real": 0, "Fake": 0, "reused": 0, "error": 0}
+    marks, failures = [], []
+    started = time.perf_counter()
+    try:
+        for tensors, indices, digests, errors in tqdm(loader, desc="Analyzing"):
+            ok = [j for j, error in enumerate(errors) if not error]
+            known = manifest.lookup([digests[j] for j in ok], key, version)
+            infer = [j for j in ok if digests[j] not in known]
+
+            # 배치 forward 1회 (+ Grad-CAM)
+            probs, cams = {}, {}
+            if infer:
+                batch = tensors[infer].to(device, non_blocking=True)
+                if cam_engine is not None:
+                    batch_probs, batch_cams = cam_engine.explain(batch)
+                    cams = dict(zip(infer, batch_cams))
+                else:
+                    with torch.inference_mode():
+                        batch_probs = F.softmax(model(batch), dim=1)
+                probs = dict(zip(infer, batch_probs[:, FAKE_INDEX].float().cpu().numpy()))
+
+            rows = []
+            for j, index in enumerate(indices.tolist()):
+                path, size, mtime_ns = todo[index]
+                row = dict.fromkeys(COLUMNS)
+                row.update(path=path, sha256=digests[j] or None, model_type=key, model_version=version)
+                if errors[j]:
+                    row["error"] = errors[j]
+                    counts["error"] += 1
+                    rows.append(row)
+                    failures.append((path, size, mtime_ns, errors[j]))
+                    continue
+
+                if j in probs:
+                    fake_probability = float(probs[j])
+                    pred_label = "Fake" if fake_probability > 0.5 else "Real"
+                    if j in cams:
+                        row["cam_file"], row["cam_index"] = cam_writer.add(digests[j], cams[j])
+                else:
+                    pred_label, fake_probability = known[digests[j]]
+                    counts["reused"] += 1
+                row.update(pred_label=pred_label, fake_probability=round(fake_probability, 4))
+                counts[pred_label] += 1
+                rows.append(row)
+                marks.append((path, size, mtime_ns, digests[j], pred_label, fake_probability))
+
+            writer.write(rows)
+            if len(writer) >= flush_rows:
+                commit(marks, failures)
+                marks, failures = [], []
+        commit(marks, failures)
+    finally:
+        writer.close()
+        manifest.close()
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"✅ 완료: Real {counts['Real']} / Fake {counts['Fake']} / 오류 {counts['error']} "
+        f"(해시 재사용 {counts['reused']}) — {len(todo) / elapsed:.1f} img/s"
+    )
+    print(f"💾 결과: {output} / 매니페스트: {manifest.path}" + (f" / CAM: {cam_dir}" if cam_dir else ""))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="디렉터리 단위 오프라인 대량 딥페이크 탐지")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input-dir", help="이미지 폴더 (하위 폴더 포함)")
+    source.add_argument("--shard-dir", help="사전 디코딩 샤드 폴더 (python -m ai.modules.image_shards)")
+    parser.add_argument("--output", required=True, help="결과 파일 (.csv 또는 .parquet)")
+    parser.add_argument("--model-type", default="korean")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--num-workers", type=int, default=4)
+    parser.add_argument("--cam-dir", default=None, help="지정하면 Grad-CAM 배열을 npz 샤드로 저장")
+    parser.add_argument("--manifest", default=None, help="재개용 매니페스트 (기본: <output>.manifest.sqlite3)")
+    parser.add_argument("--device", default="cuda" if torch.cuda.is_available() else "cpu")
+    parser.add_argument("--backend", default=DETECTOR_BACKEND, choices=BACKENDS)
+    parser.add_argument("--flush-rows", type=int, default=FLUSH_ROWS)
+    args = parser.parse_args()
+
+    run(
+        args.input_dir,
+        args.output,
+        model_type=args.model_type,
+        batch_size=args.batch_size,
+        num_workers=args.num_workers,
+        cam_dir=args.cam_dir,
+        manifest_path=args.manifest,
+        device=args.device,
+        backend=args.backend,
+        flush_rows=args.flush_rows,
+        shard_dir=args.shard_dir,
+    )
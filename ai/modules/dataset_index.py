@@ -0,0 +1,228 @@
+# Path: ai/modules/dataset_index.py
+# Desc: 데이터셋 인덱스 (원본 폴더 1회 스캔 + 내용 해시 기반 결정적 train/val/test 분할, SQLite 매니페스트 — 파일 복사 없음)
+
+# ✅ 실행 명령 (루트에서 실행)
+# python -m ai.modules.dataset_index --index <인덱스.sqlite3> --source Fake=<fake 폴더> --source Real=<real 폴더>
+# 다시 실행하면 새 파일 / 바뀐 파일만 해시 (크기 + 수정 시각 비교), 사라진 파일은 인덱스에서 삭제
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from torch.utils.data import Dataset
+from torchvision.datasets.folder import default_loader
+
+# ==========================================================
+# ✅ 설정
+# ==========================================================
+IMAGE_EXTS = (".jpg", ".jpeg", ".png")
+DEFAULT_RATIOS = (0.8, 0.1, 0.1)  # train / val / test
+SPLITS = ("train", "val", "test")
+HASH_CHUNK_SIZE = 1024 * 1024
+COMMIT_EVERY = 5000
+
+
+def file_sha256(path):
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def assign_split(digest, ratios=DEFAULT_RATIOS, seed=0):
+    """
+    내용 해시 → split (같은 내용이면 경로 / 실행 / 머신과 무관하게 항상 같은 split)
+    중복 이미지가 train과 test에 나뉘어 들어가는 누수도 막는다.
+    """
+    bucket = int(hashlib.sha256(f"{seed}:{digest}".encode("ascii")).hexdigest()[:8], 16) / 2**32
+    edge = 0.0
+    for split, ratio in zip(SPLITS, ratios):
+        edge += ratio
+        if bucket < edge:
+            return split
+    return SPLITS[-1]
+
+
+# ==========================================================
+# 1️⃣ 인덱스 (SQLite)
+# ==========================================================
+class DatasetIndex:
+    """
+    images: 경로 → (라벨, 크기, 수정 시각, sha256, split)
+    meta:   분할 비율 / seed — 바뀌면 저장된 해시로 split만 다시 계산 (재해시 없음)
+    """
+
+    def __init__(self, db_path, ratios=None, seed=None):
+        self.db_path = str(db_path)
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS images ("
+            "path TEXT PRIMARY KEY, label TEXT, size INTEGER, mtime_ns INTEGER, sha256 TEXT, split TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS images_split ON images (split, label)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._conn.commit()
+
+        # ratios / seed를 생략하면 저장된 정책 유지 (읽기 전용 사용 시 split이 바뀌지 않도록)
+        stored = self._conn.execute("SELECT value FROM meta WHERE key = 'split_policy'").fetchone()
+        stored = json.loads(stored[0]) if stored else {"ratios": list(DEFAULT_RATIOS), "seed": 0}
+        self.ratios = tuple(float(r) for r in (ratios if ratios is not None else stored["ratios"]))
+        self.seed = seed if seed is not None else stored["seed"]
+        if abs(sum(self.ratios) - 1.0) > 1e-6:
+            raise ValueError(f"분할 비율의 합은 1이어야 합니다: {self.ratios}")
+        self._sync_split_policy()
+
+    def _sync_split_policy(self):
+        policy = json.dumps({"ratios": list(self.ratios), "seed": self.seed})
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'split_policy'").fetchone()
+        if row is not None and row[0] == policy:
+            return
+        rows = self._conn.execute("SELECT path, sha256 FROM images").fetchall()
+        with self._conn:
+            self._conn.executemany(
+                "UPDATE images SET split = ? WHERE path = ?",
+                [(assign_split(digest, self.ratios, self.seed), path) for path, digest in rows],
+            )
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('split_policy', ?)", (policy,))
+        if rows:
+            print(f"🔀 [INDEX] 분할 정책 변경 → {len(rows)}장 split 재계산 ({policy})")
+
+    def scan(self, sources, workers=8):
+        """
+        sources: {라벨: 폴더} — 폴더를 재귀 탐색해 인덱스 갱신
+        크기 / 수정 시각이 같은 파일은 건너뛰고, 새 파일 / 바뀐 파일만 스레드 풀에서 해시
+        반환: {"added", "changed", "unchanged", "removed", "seconds"}
+        """
+        start = time.perf_counter()
+        stats = {"added": 0, "changed": 0, "unchanged": 0, "removed": 0}
+
+        for label, root in sources.items():
+            known = {
+                path: (size, mtime_ns)
+                for path, size, mtime_ns in self._conn.execute(
+                    "SELECT path, size, mtime_ns FROM images WHERE label = ?", (label,)
+                )
+            }
+
+            todo = []
+            seen = set()
+            for path, size, mtime_ns in _walk_images(root):
+                seen.add(path)
+                previous = known.get(path)
+                if previous == (size, mtime_ns):
+                    stats["unchanged"] += 1
+                    continue
+                stats["added" if previous is None else "changed"] += 1
+                todo.append((path, size, mtime_ns))
+
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                rows = []
+                for (path, size, mtime_ns), digest in zip(todo, pool.map(file_sha256, (p for p, _, _ in todo))):
+                    rows.append((path, label, size, mtime_ns, digest, assign_split(digest, self.ratios, self.seed)))
+                    if len(rows) >= COMMIT_EVERY:
+                        self._upsert(rows)
+                        rows = []
+                self._upsert(rows)
+
+            removed = [(path,) for path in known if path not in seen]
+            with self._conn:
+                self._conn.executemany("DELETE FROM images WHERE path = ?", removed)
+            stats["removed"] += len(removed)
+
+        stats["seconds"] = round(time.perf_counter() - start, 1)
+        return stats
+
+    def _upsert(self, rows):
+        if rows:
+            with self._conn:
+                self._conn.executemany("INSERT OR REPLACE INTO images VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def samples(self, split=None):
+        """[(경로, 라벨)] — 경로 순 (split=None이면 전체)"""
+        if split is None:
+            rows = self._conn.execute("SELECT path, label FROM images ORDER BY path")
+        else:
+            rows = self._conn.execute("SELECT path, label FROM images WHERE split = ? ORDER BY path", (split,))
+        return rows.fetchall()
+
+    def labels(self):
+        return [label for (label,) in self._conn.execute("SELECT DISTINCT label FROM images ORDER BY label")]
+
+    def counts(self):
+        """{split: {라벨: 개수}}"""
+        counts = {split: {} for split in SPLITS}
+        for split, label, n in self._conn.execute("SELECT split, label, COUNT(*) FROM images GROUP BY split, label"):
+            counts.setdefault(split, {})[label] = n
+        return counts
+
+    def close(self):
+        self._conn.close()
+
+
+def _walk_images(root):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.lower().endswith(IMAGE_EXTS):
+                path = os.path.abspath(os.path.join(dirpath, name))
+                stat = os.stat(path)
+                yield path, stat.st_size, stat.st_mtime_ns
+
+
+# ==========================================================
+# 2️⃣ Dataset (원본 위치에서 바로 읽기)
+# ==========================================================
+class IndexedImageDataset(Dataset):
+    """
+    인덱스의 한 split을 ImageFolder처럼 사용 (samples / targets / classes / class_to_idx 동일).
+    클래스 번호는 라벨 이름순 (Fake=0, Real=1) — ImageFolder 폴더 구조로 학습한 체크포인트와 호환
+    """
+
+    def __init__(self, index_path, split, transform=None, loader=default_loader):
+        index = DatasetIndex(index_path) if not isinstance(index_path, DatasetIndex) else index_path
+        try:
+            self.classes = index.labels()
+            self.class_to_idx = {label: i for i, label in enumerate(self.classes)}
+            self.samples = [(path, self.class_to_idx[label]) for path, label in index.samples(split)]
+        finally:
+            if index is not index_path:
+                index.close()
+        self.targets = [target for _, target in self.samples]
+        self.split = split
+        self.transform = transform
+        self.loader = loader
+
+    def __len__(self):
+        return len(self.samples)
+
+    def __getitem__(self, i):
+        path, target = self.samples[i]
+        image = self.loader(path)
+        if self.transform is not None:
+            image = self.transform(image)
+        return image, target
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="데이터셋 인덱스 생성 / 증분 갱신")
+    parser.add_argument("--index", required=True, help="인덱스 SQLite 파일")
+    parser.add_argument("--source", action="append", required=True, help="라벨=폴더 (예: Fake=E:/data/fake_images)")
+    parser.add_argument("--ratios", type=float, nargs=3, default=None, metavar=("TRAIN", "VAL", "TEST"),
+                        help="기본: 저장된 정책 (처음이면 0.8 0.1 0.1)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    sources = dict(item.split("=", 1) for item in args.source)
+    dataset_index = DatasetIndex(args.index, ratios=args.ratios, seed=args.seed)
+    print(f"📊 [INDEX] 스캔 결과: {dataset_index.scan(sources, workers=args.workers)}")
+    for split, counts in dataset_index.counts().items():
+        print(f"  {split:>5}: {counts}")
+    dataset_index.close()
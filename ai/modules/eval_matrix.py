@@ -0,0 +1,236 @@
+# Path: ai/modules/eval_matrix.py
+# Desc: 모델 x 데이터셋 평가 매트릭스 (이미지 1회 디코딩 → 같은 배치를 모든 모델에 입력, 정확도 / 클래스별 정밀도·재현율 / 모델별 지연시간)
+
+# ✅ 실행 명령 (루트에서 실행)
+# python -m ai.modules.eval_matrix --model korean --model foriegn --model korean:int8 --model korean:onnx \
+#     --dataset test=<test 폴더 (Fake/Real)> --dataset edited=<Edited 폴더> --label edited=Real --output eval_matrix.json
+#
+# --model: model_type[:backend] (backend: torch | onnx | int8, 기본 torch)
+# --dataset: 이름=폴더 — 클래스별 하위 폴더(ImageFolder) / 사전 디코딩 샤드 폴더(meta.json) / 이미지만 있는 폴더(--label 필요)
+#   make_edited_dataset.py의 Edited 폴더는 Real 원본을 변형한 이미지이므로 --label edited=Real
+# 입력 전처리 기본값은 서빙 경로와 동일 (Resize 224 + ToTensor), 학습 스크립트 전처리는 --imagenet-norm
+
+import os
+import json
+import time
+import argparse
+
+import numpy as np
+import torch
+from torch.utils.data import Dataset
+from torchvision import datasets, transforms
+from tqdm import tqdm
+
+from .eval_runner import ConfusionMatrix, make_loader
+from .image_io import IMG_SIZE, classifier_loader
+from .image_shards import IMAGENET_MEAN, IMAGENET_STD, ShardedImageDataset, to_input
+from .model_registry import BACKENDS, CLASS_NAMES, MODEL_PATHS, load_detector, resolve_model_type
+
+# ==========================================================
+# ✅ 설정
+# ==========================================================
+IMAGE_EXTS = (".jpg", ".jpeg", ".png")
+
+# 디코딩 + Resize까지만 워커에서 (uint8 → 모델마다 float 변환 없이 배치 1회 변환)
+decode_transform = transforms.Compose([
+    transforms.Resize((IMG_SIZE, IMG_SIZE)),
+    transforms.PILToTensor(),
+])
+
+
+# ==========================================================
+# 1️⃣ 데이터셋 (uint8 (3, 224, 224) + 클래스 번호)
+# ==========================================================
+class FlatImageDataset(Dataset):
+    """클래스 하위 폴더 없이 이미지만 있는 폴더 (예: Edited) — 모든 이미지가 같은 클래스"""
+
+    def __init__(self, root, label, transform=None, loader=classifier_loader):
+        if label not in CLASS_NAMES:
+            raise ValueError(f"클래스는 {', '.join(CLASS_NAMES)} 중 하나여야 합니다: {label}")
+        self.classes = list(CLASS_NAMES)
+        self.class_to_idx = {name: i for i, name in enumerate(self.classes)}
+        self.samples = [
+            (os.path.join(root, name), self.class_to_idx[label])
+            for name in sorted(os.listdir(root))
+            if name.lower().endswith(IMAGE_EXTS)
+        ]
+        self.targets = [target for _, target in self.samples]
+        self.transform = transform
+        self.loader = loader
+
+    def __len__(self):
+        return len(self.samples)
+
+    def __getitem__(self, i):
+        path, target = self.samples[i]
+        image = self.loader(path)
+        if self.transform is not None:
+            image = self.transform(image)
+        return image, target
+
+
+def open_dataset(path, label=None):
+    """폴더 종류에 맞는 uint8 Dataset (클래스 순서가 모델 출력과 다르면 ValueError)"""
+    if os.path.exists(os.path.join(path, "meta.json")):
+        dataset = ShardedImageDataset(path)
+    elif label:
+        dataset = FlatImageDataset(path, label, transform=decode_transform)
+    else:
+        dataset = datasets.ImageFolder(path, transform=decode_transform, loader=classifier_loader)
+    if list(dataset.classes) != list(CLASS_NAMES):
+        raise ValueError(f"클래스 구성이 모델과 다릅니다: {dataset.classes} (필요: {list(CLASS_NAMES)}) — {path}")
+    return dataset
+
+
+# ==========================================================
+# 2️⃣ 모델
+# ==========================================================
+def parse_model_spec(spec):
+    """'korean' / 'korean:int8' → (model_type, backend)"""
+    model_type, _, backend = spec.partition(":")
+    backend = backend or "torch"
+    if backend not in BACKENDS:
+        raise ValueError(f"지원하지 않는 백엔드입니다: {backend} (가능: {', '.join(BACKENDS)})")
+    return resolve_model_type(model_type), backend
+
+
+def load_variant(model_type, backend, device="cpu"):
+    """평가용 모델 로드 → (모델, 실행 디바이스) — onnx / int8는 CPU 전용"""
+    model_path = MODEL_PATHS[model_type]
+    if backend == "int8":
+        # 분류 정확도만 보므로 동적 양자화 결과물도 허용
+        from .quantize import load_quantized
+        return load_quantized(model_path, require_gradcam=False), torch.device("cpu")
+    device = torch.device(device if backend == "torch" else "cpu")
+    return load_detector(model_path, backend, device), device
+
+
+def _sync(device):
+    if device.type == "cuda":
+        torch.cuda.synchronize(device)
+
+
+# ==========================================================
+# 3️⃣ 매트릭스 평가
+# ==========================================================
+def run_matrix(models, datasets_, batch_size=64, num_workers=4, normalize=False, warmup_batches=1):
+    """
+    models: {이름: (모델, 디바이스)}, datasets_: {이름: Dataset}
+    데이터셋마다 배치를 1회만 디코딩 / 변환하고 디바이스별로 1회 복사해 모든 모델에 입력.
+    반환: {"results": {모델: {데이터셋: 지표}}, "latency": {모델: 지연시간}, "datasets": {데이터셋: 장수}}
+    """
+    mean, std = (IMAGENET_MEAN, IMAGENET_STD) if normalize else (None, None)
+    matrices = {m: {} for m in models}
+    timings = {m: [] for m in models}  # (배치 ms, 장수) — 워밍업 배치 제외
+    counts = {}
+
+    for model, _ in models.values():
+        model.eval()
+
+    for dataset_name, dataset in datasets_.items():
+        counts[dataset_name] = len(dataset)
+        for m in models:
+            matrices[m][dataset_name] = ConfusionMatrix(len(CLASS_NAMES))
+        pin_device = next((d for _, d in models.values() if d.type == "cuda"), "cpu")
+        loader = make_loader(dataset, batch_size, num_workers, pin_device)
+
+        with torch.inference_mode():
+            for step, (images, labels) in enumerate(tqdm(loader, desc=f"🧮 {dataset_name}")):
+                x = to_input(images.permute(0, 2, 3, 1), mean, std)  # (N, 3, H, W) uint8 → to_input의 NHWC 형식
+                on_device = {}
+                labels = labels.numpy()
+                for model_name, (model, device) in models.items():
+                    if device not in on_device:
+                        on_device[device] = x.to(device, non_blocking=True)
+                    _sync(device)
+                    start = time.perf_counter()
+                    outputs = model(on_device[device])
+                    _sync(device)
+                    elapsed = (time.perf_counter() - start) * 1000
+                    if step >= warmup_batches:
+                        timings[model_name].append((elapsed, len(labels)))
+                    matrices[model_name][dataset_name].update(labels, outputs.argmax(1).cpu().numpy())
+
+    results = {
+        m: {d: _metrics(matrix) for d, matrix in per_dataset.items()}
+        for m, per_dataset in matrices.items()
+    }
+    return {"datasets": counts, "results": results, "latency": {m: _latency(t) for m, t in timings.items()}}
+
+
+def _metrics(matrix):
+    precision, recall, _, support = matrix.per_class()
+    return {
+        "accuracy": matrix.accuracy * 100,
+        "precision": {name: float(precision[i]) for i, name in enumerate(CLASS_NAMES)},
+        "recall": {name: float(recall[i]) for i, name in enumerate(CLASS_NAMES)},
+        "support": {name: int(support[i]) for i, name in enumerate(CLASS_NAMES)},
+        "confusion_matrix": matrix.counts.tolist(),
+    }
+
+
+def _latency(timings):
+    if not timings:
+        return {}
+    batch_ms = np.array([ms for ms, _ in timings])
+    images = sum(n for _, n in timings)
+    return {
+        "ms_per_image": float(batch_ms.sum() / images),
+        "batch_p50_ms": float(np.percentile(batch_ms, 50)),
+        "batch_p95_ms": float(np.percentile(batch_ms, 95)),
+        "images_per_s": float(images / batch_ms.sum() * 1000),
+    }
+
+
+def format_table(summary):
+    """모델 x 데이터셋 표 (정확도 / Fake·Real 정밀도·재현율) + 모델별 지연시간"""
+    dataset_names = list(summary["datasets"])
+    header = f"{'model':<16}" + "".join(f"{name:>34}" for name in dataset_names) + f"{'ms/img':>10}"
+    lines = [header, f"{'':<16}" + f"{'acc  P(F)/R(F)  P(R)/R(R)':>34}" * len(dataset_names)]
+    for model_name, per_dataset in summary["results"].items():
+        cells = []
+        for name in dataset_names:
+            r = per_dataset[name]
+            cells.append(
+                f"{r['accuracy']:6.2f}%  {r['precision']['Fake']:.3f}/{r['recall']['Fake']:.3f}  "
+                f"{r['precision']['Real']:.3f}/{r['recall']['Real']:.3f}"
+            )
+        latency = summary["latency"][model_name].get("ms_per_image", float("nan"))
+        lines.append(f"{model_name:<16}" + "".join(f"{cell:>34}" for cell in cells) + f"{latency:>10.2f}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="모델 x 데이터셋 평가 매트릭스 (1회 디코딩)")
+    parser.add_argument("--model", action="append", required=True, help="model_type[:backend] (예: korean, korean:int8)")
+    parser.add_argument("--dataset", action="append", required=True, help="이름=폴더")
+    parser.add_argument("--label", action="append", default=[], help="이름=클래스 (이미지만 있는 폴더, 예: edited=Real)")
+    parser.add_argument("--imagenet-norm", action="store_true", help="ImageNet Normalize 적용 (학습 스크립트 전처리)")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--num-workers", type=int, default=4)
+    parser.add_argument("--device", default="cuda" if torch.cuda.is_available() else "cpu")
+    parser.add_argument("--output", default="eval_matrix.json")
+    args = parser.parse_args()
+
+    labels = dict(item.split("=", 1) for item in args.label)
+    datasets_ = {}
+    for item in args.dataset:
+        name, path = item.split("=", 1)
+        datasets_[name] = open_dataset(path, labels.get(name))
+        print(f"📂 [{name}] {path} ({len(datasets_[name])}장)")
+
+    models = {}
+    for spec in args.model:
+        model_type, backend = parse_model_spec(spec)
+        name = model_type if backend == "torch" else f"{model_type}:{backend}"
+        models[name] = load_variant(model_type, backend, args.device)
+        print(f"✅ 모델 로드 완료: {name} (device={models[name][1]})")
+
+    summary = run_matrix(models, datasets_, args.batch_size, args.num_workers, args.imagenet_norm)
+    summary["classes"] = list(CLASS_NAMES)
+    summary["preprocess"] = "imagenet-norm" if args.imagenet_norm else "serving"
+
+    print("\n📊 평가 매트릭스\n" + format_table(summary))
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=4, ensure_ascii=False)
+    print(f"💾 결과 저장: {args.output}")
@@ -0,0 +1,203 @@
+# Path: ai/modules/eval_runner.py
+# Desc: 배치 / 멀티 워커 평가 러너 (체크포인트 + model_type 지정, inference_mode, 혼동행렬 누적 — save_evaluation_results와 같은 JSON)
+
+# ✅ 실행 명령 (루트에서 실행)
+# python -m ai.modules.eval_runner --model-type korean --test-dir <test 폴더 (Fake/Real)> --batch-size 128 --num-workers 8
+# python -m ai.modules.eval_runner --checkpoint <다른 .pth> --shard-dir <test 샤드 폴더> --imagenet-norm --output evaluation_result.json
+#
+# 입력 전처리 기본값은 서빙 경로(/api/predict)와 동일 (Resize 224 + ToTensor)
+# --imagenet-norm: 학습 / 평가 스크립트처럼 ImageNet Normalize 적용
+
+import os
+import json
+import time
+import argparse
+
+import numpy as np
+import torch
+from torch.utils.data import DataLoader
+from torchvision import transforms
+from tqdm import tqdm
+
+try:
+    from .image_io import IMG_SIZE, classifier_loader
+    from .image_shards import IMAGENET_MEAN, IMAGENET_STD, ShardedImageDataset, ShardTransform
+except ImportError:  # 학습 스크립트처럼 ai/modules를 sys.path에 두고 직접 import할 때
+    from image_io import IMG_SIZE, classifier_loader
+    from image_shards import IMAGENET_MEAN, IMAGENET_STD, ShardedImageDataset, ShardTransform
+
+
+# ==========================================================
+# 1️⃣ 혼동행렬 누적 + 지표
+# ==========================================================
+class ConfusionMatrix:
+    """
+    counts[실제, 예측] — 배치마다 bincount로 누적 (y_true / y_pred 리스트를 만들지 않음)
+    report()는 sklearn classification_report(output_dict=True)와 같은 구조 (zero_division=0)
+    """
+
+    def __init__(self, num_classes):
+        self.num_classes = num_classes
+        self.counts = np.zeros((num_classes, num_classes), dtype=np.int64)
+
+    def update(self, targets, preds):
+        targets = np.asarray(targets, dtype=np.int64).ravel()
+        preds = np.asarray(preds, dtype=np.int64).ravel()
+        n = self.num_classes
+        self.counts += np.bincount(targets * n + preds, minlength=n * n).reshape(n, n)
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    @property
+    def accuracy(self):
+        """0~1"""
+        return float(np.trace(self.counts) / self.total) if self.total else 0.0
+
+    def per_class(self):
+        """(precision, recall, f1, support) 배열"""
+        tp = np.diag(self.counts).astype(np.float64)
+        support = self.counts.sum(axis=1).astype(np.float64)
+        predicted = self.counts.sum(axis=0).astype(np.float64)
+        precision = np.divide(tp, predicted, out=np.zeros_like(tp), where=predicted > 0)
+        recall = np.divide(tp, support, out=np.zeros_like(tp), where=support > 0)
+        denom = precision + recall
+        f1 = np.divide(2 * precision * recall, denom, out=np.zeros_like(tp), where=denom > 0)
+        return precision, recall, f1, support
+
+    def report(self, class_names):
+        precision, recall, f1, support = self.per_class()
+        report = {}
+        for i, name in enumerate(class_names):
+            report[name] = {
+                "precision": float(precision[i]),
+                "recall": float(recall[i]),
+                "f1-score": float(f1[i]),
+                "support": float(support[i]),
+            }
+        report["accuracy"] = self.accuracy
+        total = support.sum()
+        weights = support / total if total else np.zeros_like(support)
+        report["macro avg"] = {
+            "precision": float(precision.mean()),
+            "recall": float(recall.mean()),
+            "f1-score": float(f1.mean()),
+            "support": float(total),
+        }
+        report["weighted avg"] = {
+            "precision": float((precision * weights).sum()),
+            "recall": float((recall * weights).sum()),
+            "f1-score": float((f1 * weights).sum()),
+            "support": float(total),
+        }
+        return report
+
+    def result(self, class_names):
+        """save_evaluation_results와 같은 형식 (accuracy는 %)"""
+        return {
+            "accuracy": self.accuracy * 100,
+            "report": self.report(class_names),
+            "confusion_matrix": self.counts.tolist(),
+            "classes": list(class_names),
+        }
+
+
+def format_report(report, class_names, digits=2):
+    """report dict → classification_report 텍스트 형식"""
+    width = max(len(name) for name in list(class_names) + ["weighted avg"])
+    lines = [f"{'':>{width}} {'precision':>9} {'recall':>9} {'f1-score':>9} {'support':>9}", ""]
+    for name in list(class_names) + [None, "macro avg", "weighted avg"]:
+        if name is None:
+            lines += ["", f"{'accuracy':>{width}} {'':>9} {'':>9} {report['accuracy']:>9.{digits}f} "
+                          f"{int(report['macro avg']['support']):>9}"]
+            continue
+        row = report[name]
+        lines.append(f"{name:>{width}} {row['precision']:>9.{digits}f} {row['recall']:>9.{digits}f} "
+                     f"{row['f1-score']:>9.{digits}f} {int(row['support']):>9}")
+    return "\n".join(lines)
+
+
+def save_result(result, output_path="evaluation_result.json"):
+    """evaluation_summary.save_evaluation_results와 같은 JSON 파일"""
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=4, ensure_ascii=False)
+    print(f"평가 결과 저장 완료: {output_path}")
+    return result
+
+
+# ==========================================================
+# 2️⃣ 평가 루프
+# ==========================================================
+def eval_transform(normalize=False):
+    """서빙 경로와 같은 Resize 224 + ToTensor (normalize=True면 학습 스크립트의 ImageNet Normalize 추가)"""
+    steps = [transforms.Resize((IMG_SIZE, IMG_SIZE)), transforms.ToTensor()]
+    if normalize:
+        steps.append(transforms.Normalize(mean=IMAGENET_MEAN, std=IMAGENET_STD))
+    return transforms.Compose(steps)
+
+
+def make_loader(dataset, batch_size=64, num_workers=4, device="cpu"):
+    """평가용 DataLoader (순서 고정, 워커 사용 시 prefetch, CUDA면 pin_memory)"""
+    options = {"num_workers": num_workers, "pin_memory": torch.device(device).type == "cuda"}
+    if num_workers > 0:
+        options["prefetch_factor"] = 4
+    return DataLoader(dataset, batch_size=batch_size, shuffle=False, **options)
+
+
+def evaluate(model, loader, num_classes, device="cpu", desc="Evaluating"):
+    """loader 전체 평가 → (ConfusionMatrix, 초당 이미지 수)"""
+    matrix = ConfusionMatrix(num_classes)
+    model.eval()
+    start = time.perf_counter()
+    with torch.inference_mode():
+        for imgs, labels in tqdm(loader, desc=desc):
+            preds = model(imgs.to(device, non_blocking=True)).argmax(1)
+            matrix.update(labels.numpy(), preds.cpu().numpy())
+    elapsed = time.perf_counter() - start
+    return matrix, matrix.total / elapsed if elapsed > 0 else 0.0
+
+
+def load_test_dataset(test_dir=None, shard_dir=None, normalize=False):
+    """test 폴더(ImageFolder 구조) 또는 사전 디코딩 샤드 → Dataset"""
+    if shard_dir:
+        mean, std = (IMAGENET_MEAN, IMAGENET_STD) if normalize else (None, None)
+        return ShardedImageDataset(shard_dir, transform=ShardTransform(mean, std))
+    from torchvision import datasets
+    return datasets.ImageFolder(test_dir, transform=eval_transform(normalize), loader=classifier_loader)
+
+
+if __name__ == "__main__":
+    from .model_registry import BACKENDS, MODEL_PATHS, load_detector, resolve_model_type
+
+    parser = argparse.ArgumentParser(description="배치 / 멀티 워커 딥페이크 탐지 모델 평가")
+    parser.add_argument("--model-type", default="korean")
+    parser.add_argument("--checkpoint", default=None, help="기본: model_type의 서빙 체크포인트")
+    parser.add_argument("--backend", default="torch", choices=BACKENDS)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--test-dir", help="ImageFolder 구조 test 폴더 (Fake/Real)")
+    source.add_argument("--shard-dir", help="사전 디코딩 샤드 폴더 (python -m ai.modules.image_shards)")
+    parser.add_argument("--imagenet-norm", action="store_true", help="ImageNet Normalize 적용 (학습 스크립트 전처리)")
+    parser.add_argument("--batch-size", type=int, default=128)
+    parser.add_argument("--num-workers", type=int, default=4)
+    parser.add_argument("--device", default="cuda" if torch.cuda.is_available() else "cpu")
+    parser.add_argument("--output", default="evaluation_result.json")
+    args = parser.parse_args()
+
+    model_type = resolve_model_type(args.model_type)
+    checkpoint = args.checkpoint or MODEL_PATHS[model_type]
+    device = torch.device(args.device if args.backend == "torch" else "cpu")  # onnx / int8는 CPU 전용
+
+    test_ds = load_test_dataset(args.test_dir, args.shard_dir, args.imagenet_norm)
+    class_names = test_ds.classes
+    print(f"✅ 클래스 매핑: {test_ds.class_to_idx} ({len(test_ds)}장)")
+    model = load_detector(checkpoint, args.backend, device)
+    print(f"✅ 모델 로드 완료: {checkpoint} (backend={args.backend}, device={device})")
+
+    loader = make_loader(test_ds, args.batch_size, args.num_workers, device)
+    matrix, throughput = evaluate(model, loader, len(class_names), device)
+    result = matrix.result(class_names)
+
+    print("\n📊 Classification Report:\n", format_report(result["report"], class_names))
+    print(f"🎯 Test Accuracy: {result['accuracy']:.2f}% ({throughput:.1f} img/s)")
+    save_result(result, args.output)
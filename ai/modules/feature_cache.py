@@ -0,0 +1,228 @@
+# Path: ai/modules/feature_cache.py
+# Desc: 고정(frozen) 백본 특징 캐시 — MobileNetV3 features + avgpool 출력(576차원)을 float16 memmap으로 1회 저장하고 classifier만 학습
+
+# ✅ 사용 (학습 스크립트 Deepfake_Discrimination_model_MobileNet_v3_final.py에서 USE_FEATURE_CACHE=True)
+# 1) build_feature_cache({split: Dataset} 또는 데이터 폴더, FEATURE_CACHE_DIR, model, transform) → train/val/test 백본 1회 실행
+# 2) train_head(model, FEATURE_CACHE_DIR, criterion, optimizer, scheduler, ...) → 에폭당 디코딩 / 백본 연산 없음
+#
+# 캐시 파일 (<cache_dir>/<split>.*)
+# - <split>_features.npy : (N, 576) float16 memmap
+# - <split>_labels.npy   : (N,) int64
+# - <split>_index.json   : 샘플 경로 / 클래스 매핑 / 지문 (데이터나 전처리가 바뀌면 다시 생성)
+
+import os
+import json
+import time
+import hashlib
+
+import numpy as np
+import torch
+from torch.utils.data import DataLoader
+from torchvision import datasets
+from tqdm import tqdm
+
+SPLITS = ("train", "val", "test")
+
+
+# ==========================================================
+# 1️⃣ 특징 추출 (백본 1회 실행)
+# ==========================================================
+def pooled_features(model, images):
+    """MobileNetV3 features → avgpool → (N, 576) — classifier 입력과 동일"""
+    return torch.flatten(model.avgpool(model.features(images)), 1)
+
+
+def _split_files(cache_dir, split):
+    return (
+        os.path.join(cache_dir, f"{split}_features.npy"),
+        os.path.join(cache_dir, f"{split}_labels.npy"),
+        os.path.join(cache_dir, f"{split}_index.json"),
+    )
+
+
+def dataset_fingerprint(dataset, extra=""):
+    """샘플 경로 / 크기 / 수정 시각 + 전처리 설명 해시 — 하나라도 바뀌면 캐시 무효"""
+    sha1 = hashlib.sha1(extra.encode("utf-8"))
+    for path, label in dataset.samples:
+        stat = os.stat(path)
+        sha1.update(f"{path}|{label}|{stat.st_size}|{stat.st_mtime_ns}\n".encode("utf-8"))
+    return sha1.hexdigest()
+
+
+def extract_split(model, dataset, cache_dir, split, fingerprint, batch_size=64, num_workers=2, device="cpu"):
+    """데이터셋 1개를 백본에 1회 통과시켜 특징 memmap + 라벨 + 인덱스 저장"""
+    features_path, labels_path, index_path = _split_files(cache_dir, split)
+    loader = DataLoader(dataset, batch_size=batch_size, shuffle=False, num_workers=num_workers)
+
+    dim = model.classifier[0].in_features
+    tmp_path = features_path + ".tmp"
+    features = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float16, shape=(len(dataset), dim))
+    labels = np.empty(len(dataset), dtype=np.int64)
+
+    model.eval()
+    offset = 0
+    with torch.inference_mode():
+        for imgs, targets in tqdm(loader, desc=f"🧊 Backbone → {split}"):
+            batch = pooled_features(model, imgs.to(device)).float().cpu().numpy()
+            features[offset:offset + len(batch)] = batch.astype(np.float16)
+            labels[offset:offset + len(batch)] = targets.numpy()
+            offset += len(batch)
+    features.flush()
+    del features
+
+    # 특징 → 라벨 → 인덱스 순으로 확정 (인덱스가 있으면 완성된 캐시)
+    os.replace(tmp_path, features_path)
+    np.save(labels_path, labels)
+    with open(index_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "split": split,
+            "count": len(dataset),
+            "dim": dim,
+            "class_to_idx": dataset.class_to_idx,
+            "fingerprint": fingerprint,
+            "samples": [path for path, _ in dataset.samples],
+        }, f, ensure_ascii=False)
+
+
+def build_feature_cache(data, cache_dir, model, transform, batch_size=64, num_workers=2, device="cpu", splits=SPLITS):
+    """
+    split별 이미지를 백본에 1회 통과시켜 캐시 생성.
+    data: data_dir/<split>/(Fake|Real) 폴더 경로 또는 {split: Dataset} (ImageFolder / IndexedImageDataset)
+    지문(샘플 목록 + 전처리 + 백본 가중치)이 같은 split은 건너뛴다.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    model = model.to(device)
+    backbone_sig = hashlib.sha1()
+    for tensor in model.features.state_dict().values():
+        backbone_sig.update(tensor.cpu().numpy().tobytes())
+
+    for split in splits:
+        if isinstance(data, dict):
+            dataset = data[split]
+        else:
+            dataset = datasets.ImageFolder(os.path.join(data, split), transform=transform)
+        fingerprint = dataset_fingerprint(dataset, extra=f"{transform}|{backbone_sig.hexdigest()}")
+        index_path = _split_files(cache_dir, split)[2]
+        if os.path.exists(index_path):
+            with open(index_path, encoding="utf-8") as f:
+                if json.load(f).get("fingerprint") == fingerprint:
+                    print(f"✅ [FEATURE CACHE] {split}: 기존 캐시 사용 ({len(dataset)}장)")
+                    continue
+
+        start = time.perf_counter()
+        extract_split(model, dataset, cache_dir, split, fingerprint, batch_size, num_workers, device)
+        print(f"💾 [FEATURE CACHE] {split}: {len(dataset)}장 → {cache_dir} ({time.perf_counter() - start:.1f}s)")
+
+
+# ==========================================================
+# 2️⃣ 캐시 로드
+# ==========================================================
+def load_split(cache_dir, split):
+    """(features (N, 576) float16 memmap, labels (N,) int64, index dict)"""
+    features_path, labels_path, index_path = _split_files(cache_dir, split)
+    with open(index_path, encoding="utf-8") as f:
+        index = json.load(f)
+    return np.load(features_path, mmap_mode="r"), np.load(labels_path), index
+
+
+def iterate_batches(features, labels, batch_size, shuffle=False, rng=None, device="cpu"):
+    """memmap에서 배치 단위로 읽어 float32 텐서로 (셔플 시 배치 안 인덱스는 정렬해 순차 읽기)"""
+    order = rng.permutation(len(labels)) if shuffle else np.arange(len(labels))
+    for start in range(0, len(order), batch_size):
+        idx = np.sort(order[start:start + batch_size])
+        x = torch.from_numpy(np.asarray(features[idx], dtype=np.float32)).to(device)
+        y = torch.from_numpy(labels[idx]).to(device)
+        yield x, y
+
+
+# ==========================================================
+# 3️⃣ classifier 학습 / 평가
+# ==========================================================
+def evaluate_head(classifier, features, labels, criterion, batch_size=256, device="cpu"):
+    """캐시된 특징으로 classifier 평가 → (평균 loss, 정확도, y_true, y_pred)"""
+    classifier.eval()
+    total_loss, batches = 0.0, 0
+    y_pred = []
+    with torch.inference_mode():
+        for x, y in iterate_batches(features, labels, batch_size, device=device):
+            outputs = classifier(x)
+            total_loss += criterion(outputs, y).item()
+            batches += 1
+            y_pred.append(outputs.argmax(1).cpu().numpy())
+    y_pred = np.concatenate(y_pred) if y_pred else np.empty(0, dtype=np.int64)
+    acc = float((y_pred == labels).mean()) if len(labels) else 0.0
+    return total_loss / max(batches, 1), acc, labels, y_pred
+
+
+def train_head(
+    model,
+    cache_dir,
+    criterion,
+    optimizer,
+    scheduler=None,
+    epochs=100,
+    patience=10,
+    batch_size=256,
+    device="cpu",
+    model_path=None,
+    seed=0,
+):
+    """
+    캐시된 train/val 특징으로 model.classifier만 학습 (Dropout은 train 모드로 그대로 적용).
+    val 정확도가 가장 좋을 때 전체 model.state_dict()를 model_path에 저장 → 서빙 체크포인트와 같은 형식.
+    반환: 에폭별 기록 {"train_loss", "val_loss", "train_acc", "val_acc", "epoch_seconds"}
+    """
+    train_x, train_y, _ = load_split(cache_dir, "train")
+    val_x, val_y, _ = load_split(cache_dir, "val")
+    rng = np.random.default_rng(seed)
+    classifier = model.classifier.to(device)
+
+    history = {"train_loss": [], "val_loss": [], "train_acc": [], "val_acc": [], "epoch_seconds": []}
+    best_val_acc = 0
+    patience_counter = 0
+
+    for epoch in range(epochs):
+        start = time.perf_counter()
+        classifier.train()
+        running_loss, correct, total, batches = 0.0, 0, 0, 0
+        for x, y in iterate_batches(train_x, train_y, batch_size, shuffle=True, rng=rng, device=device):
+            optimizer.zero_grad()
+            outputs = classifier(x)
+            loss = criterion(outputs, y)
+            loss.backward()
+            optimizer.step()
+
+            running_loss += loss.item()
+            batches += 1
+            correct += (outputs.argmax(1) == y).sum().item()
+            total += y.size(0)
+
+        val_loss, val_acc, _, _ = evaluate_head(classifier, val_x, val_y, criterion, batch_size, device)
+        history["train_loss"].append(running_loss / max(batches, 1))
+        history["train_acc"].append(correct / max(total, 1))
+        history["val_loss"].append(val_loss)
+        history["val_acc"].append(val_acc)
+        history["epoch_seconds"].append(time.perf_counter() - start)
+
+        print(
+            f"🟢 Epoch {epoch + 1}/{epochs} ({history['epoch_seconds'][-1]:.2f}s) | "
+            f"📉 Loss: {history['train_loss'][-1]:.4f}/{val_loss:.4f} | "
+            f"🎯 Acc: {history['train_acc'][-1] * 100:.2f}%/{val_acc * 100:.2f}%"
+        )
+
+        # Early Stopping
+        if val_acc > best_val_acc:
+            best_val_acc = val_acc
+            patience_counter = 0
+            if model_path:
+                torch.save(model.state_dict(), model_path)
+        else:
+            patience_counter += 1
+            if patience_counter >= patience:
+                print("⏹️ Early stopping triggered!")
+                break
+
+        if scheduler is not None:
+            scheduler.step()
+
+    return history
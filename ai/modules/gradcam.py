@@ -0,0 +1,120 @@
+# Path: ai/modules/gradcam.py
+# Desc: 재사용 가능한 Grad-CAM 엔진 (요청 단위 hook 설치/해제 + 요청별 activation 보관, 스레드 안전)
+
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+
+class GradCAM:
+    """
+    상주(공유) 모델에서 여러 요청이 동시에 사용해도 안전한 Grad-CAM 엔진.
+
+    - target_layer=None: MobileNetV3의 model.features 출력(= features[-1])을 사용하는 고속 경로.
+      백본은 no_grad로 1회만 실행하고 head만 역전파하므로 hook이 필요 없다.
+    - target_layer 지정: 호출 1건 동안만 forward hook을 설치하고 finally에서 제거.
+      hook은 호출한 스레드의 activation만 요청별 dict에 기록한다.
+    - gradient는 torch.autograd.grad로 activation에 대해서만 구하므로
+      공유 모델의 파라미터 .grad에 아무것도 누적되지 않는다.
+    - 인스턴스에 요청 상태를 저장하지 않으므로 하나의 엔진을 여러 스레드가 공유해도 된다.
+    """
+
+    def __init__(self, model, target_layer=None):
+        self.model = model
+        self.target_layer = target_layer
+
+    # ------------------------------------------------------
+    # 공개 API
+    # ------------------------------------------------------
+    def explain(self, input_tensor, size=None):
+        """
+        예측 클래스 기준 softmax 확률과 CAM을 forward 1회로 계산.
+        반환: (probs (N, 2) tensor, cams (N, h, w) float32 ndarray, 0~1 정규화)
+        """
+        logits, cams = self._run(input_tensor, None, size)
+        return F.softmax(logits, dim=1), cams
+
+    def generate_batch(self, input_tensor, target_classes, size=None):
+        """
+        N개 이미지의 CAM을 forward 1회 + 역전파 1회로 생성.
+
+        샘플별 대상 logit의 합을 역전파한다. eval 모드에서는 샘플 간 상호작용이 없으므로
+        각 샘플의 activation gradient는 단건으로 계산한 것과 같다.
+
+        target_classes: 샘플별 대상 클래스 (길이 N의 list / ndarray / tensor)
+        size: (width, height) 지정 시 그 크기로 보간, None이면 target layer 해상도 유지
+        반환: (N, H, W) float32 ndarray
+        """
+        return self._run(input_tensor, target_classes, size)[1]
+
+    def generate(self, input_tensor, class_idx=None, size=None):
+        """단일 이미지(1xCxHxW) CAM 생성 — class_idx=None이면 예측 클래스 기준"""
+        targets = None if class_idx is None else [class_idx]
+        return self._run(input_tensor, targets, size)[1][0]
+
+    # ------------------------------------------------------
+    # 내부 구현
+    # ------------------------------------------------------
+    def _run(self, input_tensor, target_classes, size):
+        """(logits, cams) 반환 — target_classes=None이면 샘플별 예측 클래스 사용"""
+        with torch.enable_grad():
+            activations, logits = self._forward(input_tensor)
+            if target_classes is None:
+                targets = logits.argmax(dim=1, keepdim=True)
+            else:
+                targets = torch.as_tensor(target_classes, dtype=torch.long, device=logits.device).view(-1, 1)
+                if targets.shape[0] != logits.shape[0]:
+                    raise ValueError(f"target_classes 수({targets.shape[0]})와 배치 크기({logits.shape[0]})가 다릅니다.")
+            class_score = logits.gather(1, targets).sum()
+            (grads,) = torch.autograd.grad(class_score, activations)
+
+        cams = self._compute_cams(activations.detach(), grads, size)
+        return logits.detach(), cams
+
+    def _forward(self, input_tensor):
+        """(activations, logits) 반환 — activations는 logits에 대해 미분 가능"""
+        if self.target_layer is None:
+            with torch.no_grad():
+                activations = self.model.features(input_tensor)
+            activations.requires_grad_(True)
+            logits = self.model.classifier(torch.flatten(self.model.avgpool(activations), 1))
+            return activations, logits
+
+        with self._capture() as record:
+            logits = self.model(input_tensor)
+        return record["activations"], logits
+
+    @contextmanager
+    def _capture(self):
+        """이번 호출 동안만 target_layer에 hook 설치 (종료/예외 시 반드시 제거)"""
+        record = {}
+        owner = threading.get_ident()
+
+        def forward_hook(module, inputs, output):
+            # 같은 모델로 다른 스레드가 동시에 forward 해도 내 요청 값만 기록
+            if threading.get_ident() == owner and "activations" not in record:
+                record["activations"] = output
+
+        handle = self.target_layer.register_forward_hook(forward_hook)
+        try:
+            yield record
+        finally:
+            handle.remove()
+
+    @staticmethod
+    def _compute_cams(activations, grads, size=None):
+        weights = grads.mean(dim=(2, 3), keepdim=True)
+        cams = torch.relu((weights * activations).sum(dim=1))
+        cams -= cams.amin(dim=(1, 2), keepdim=True)
+        cam_max = cams.amax(dim=(1, 2), keepdim=True)
+        cams /= torch.where(cam_max != 0, cam_max, torch.ones_like(cam_max))
+
+        # 정규화 후 보간 (cv2.resize 선형 보간과 동일한 align_corners=False)
+        if size is not None:
+            width, height = size
+            cams = F.interpolate(cams.unsqueeze(1), size=(height, width),
+                                 mode="bilinear", align_corners=False).squeeze(1)
+        return cams.cpu().numpy().astype(np.float32)
@@ -0,0 +1,58 @@
+# Path: ai/modules/image_io.py
+# Desc: 공통 이미지 로더 (EXIF 방향 보정 + JPEG DCT 축소 디코딩 — 분류기 입력은 224px만큼만 디코딩)
+
+import io
+
+import numpy as np
+from PIL import Image, ImageOps
+
+IMG_SIZE = 224
+CLASSIFIER_SIZE = (IMG_SIZE, IMG_SIZE)
+
+
+def _open_raw(source):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return Image.open(io.BytesIO(source))
+    return Image.open(source)  # 경로 / 파일 객체
+
+
+def _draft(image, reduce_to):
+    """
+    JPEG은 libjpeg DCT 스케일링(1/2, 1/4, 1/8)으로 필요한 크기 이상인 가장 작은 해상도만 디코딩.
+    reduce_to: int → 긴 변이 이 값 이상 / (w, h) → 각 변이 이 값 이상
+    JPEG이 아니면 아무것도 하지 않는다 (원본 해상도 디코딩).
+    """
+    if image.format != "JPEG" or not reduce_to:
+        return
+    if isinstance(reduce_to, int):
+        scale = reduce_to / max(image.size)
+        if scale >= 1:
+            return
+        reduce_to = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    image.draft("RGB", reduce_to)
+
+
+def open_image(source, reduce_to=None):
+    """
+    경로 / 바이트 / 파일 객체 / PIL 이미지 / RGB ndarray → EXIF 방향이 보정된 RGB PIL 이미지
+    reduce_to=None이면 원본 해상도, 지정하면 JPEG은 그 크기 이상으로만 축소 디코딩한다.
+    """
+    if isinstance(source, np.ndarray):
+        return Image.fromarray(source).convert("RGB")
+    if isinstance(source, Image.Image):
+        return ImageOps.exif_transpose(source).convert("RGB")
+
+    image = _open_raw(source)
+    _draft(image, reduce_to)
+    image = ImageOps.exif_transpose(image)  # 휴대폰 사진의 회전 정보 반영 (분류 / 오버레이 공통)
+    return image.convert("RGB")
+
+
+def open_for_classifier(source):
+    """분류기 입력용 (224x224로 리사이즈될 이미지를 그 이상 크기로만 디코딩)"""
+    return open_image(source, CLASSIFIER_SIZE)
+
+
+def classifier_loader(path):
+    """torchvision ImageFolder(loader=...)용 로더"""
+    return open_for_classifier(path)
@@ -0,0 +1,277 @@
+# Path: ai/modules/image_shards.py
+# Desc: 사전 디코딩 이미지 샤드 (224x224 uint8 RGB를 큰 .npy 블록에 연속 저장 + 인덱스) 및 memmap 제로 카피 로더
+
+# ✅ 실행 명령 (루트에서 실행)
+# python -m ai.modules.image_shards --index <dataset_index.sqlite3> --out-dir <샤드 폴더> --num-workers 8
+#   → <샤드 폴더>/<split>/ (train / val / test)
+# python -m ai.modules.image_shards --image-dir <ImageFolder 폴더 (Fake/Real)> --out-dir <샤드 폴더>/test
+#
+# 샤드 폴더 구성
+# - shard-00000.npy ... : (용량, 224, 224, 3) uint8 — meta.json의 count만큼 유효
+# - samples.tsv         : 경로 \t 클래스 번호 \t sha256 (샤드 순서와 동일)
+# - meta.json           : 크기 / 클래스 / 샤드 목록 / 지문 (같은 입력이면 다시 만들지 않음)
+
+import os
+import json
+import time
+import hashlib
+import argparse
+
+import numpy as np
+import torch
+from PIL import Image
+from torch.utils.data import DataLoader, Dataset
+from tqdm import tqdm
+
+try:
+    from .image_io import open_image
+except ImportError:  # 학습 스크립트처럼 ai/modules를 sys.path에 두고 직접 import할 때
+    from image_io import open_image
+
+# ==========================================================
+# ✅ 설정
+# ==========================================================
+SHARD_IMG_SIZE = 224
+SHARD_SIZE = 4096  # 샤드당 이미지 수 (224x224x3 기준 약 600MB)
+IMAGENET_MEAN = (0.485, 0.456, 0.406)
+IMAGENET_STD = (0.229, 0.224, 0.225)
+
+
+# ==========================================================
+# 1️⃣ 샤드 생성 (1회 디코딩)
+# ==========================================================
+class _DecodeDataset(Dataset):
+    """DataLoader 워커에서 파일 읽기 + SHA-256 + 축소 디코딩 + Resize (transforms.Resize와 같은 PIL bilinear)"""
+
+    def __init__(self, samples, size):
+        self.samples = samples
+        self.size = size
+
+    def __len__(self):
+        return len(self.samples)
+
+    def __getitem__(self, i):
+        path = self.samples[i][0]
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            image = open_image(data, (self.size, self.size)).resize((self.size, self.size), Image.BILINEAR)
+            return np.asarray(image, dtype=np.uint8), i, hashlib.sha256(data).hexdigest(), True
+        except Exception as e:
+            print(f"⚠️ [SHARDS] 디코딩 실패 → 제외: {path} ({e})")
+            return np.zeros((self.size, self.size, 3), dtype=np.uint8), i, "", False
+
+
+def _fingerprint(samples, size):
+    """입력 지문 (경로 + 클래스 + 크기 + 수정 시각) — 같은 이름으로 파일이 교체돼도 값이 바뀐다"""
+    sha1 = hashlib.sha1(str(size).encode("ascii"))
+    for path, target in samples:
+        try:
+            stat = os.stat(path)
+            stamp = f"{stat.st_size}|{stat.st_mtime_ns}"
+        except OSError:
+            stamp = "missing"
+        sha1.update(f"{path}|{target}|{stamp}\n".encode("utf-8"))
+    return sha1.hexdigest()
+
+
+def write_shards(samples, classes, out_dir, size=SHARD_IMG_SIZE, shard_size=SHARD_SIZE, num_workers=4, batch_size=64):
+    """
+    samples: [(경로, 클래스 번호)] → out_dir에 샤드 생성. 같은 입력으로 이미 만든 샤드가 있으면 건너뜀.
+    디코딩 실패 이미지는 제외된다 (samples.tsv에 남은 것만 유효).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    meta_path = os.path.join(out_dir, "meta.json")
+    fingerprint = _fingerprint(samples, size)
+    if os.path.exists(meta_path):
+        with open(meta_path, encoding="utf-8") as f:
+            if json.load(f).get("fingerprint") == fingerprint:
+                print(f"✅ [SHARDS] 기존 샤드 사용: {out_dir}")
+                return
+
+    start = time.perf_counter()
+    loader = DataLoader(_DecodeDataset(samples, size), batch_size=batch_size, num_workers=num_workers)
+    shards = []
+    shard, filled = None, 0
+
+    def close_shard():
+        nonlocal shard, filled
+        if shard is None:
+            return
+        shard.flush()
+        name = f"shard-{len(shards):05d}.npy"
+        del shard
+        os.replace(os.path.join(out_dir, name + ".tmp"), os.path.join(out_dir, name))
+        shards.append({"file": name, "count": filled})
+        shard, filled = None, 0
+
+    with open(os.path.join(out_dir, "samples.tsv.tmp"), "w", encoding="utf-8") as tsv:
+        for images, indices, digests, ok in tqdm(loader, desc=f"🧱 Shards → {out_dir}"):
+            images = images.numpy()
+            for j in np.flatnonzero(ok.numpy()):
+                if shard is None:
+                    tmp_path = os.path.join(out_dir, f"shard-{len(shards):05d}.npy.tmp")
+                    shard = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.uint8, shape=(shard_size, size, size, 3))
+                shard[filled] = images[j]
+                filled += 1
+                path, target = samples[int(indices[j])]
+                tsv.write(f"{path}\t{target}\t{digests[j]}\n")
+                if filled == shard_size:
+                    close_shard()
+        close_shard()
+    os.replace(os.path.join(out_dir, "samples.tsv.tmp"), os.path.join(out_dir, "samples.tsv"))
+
+    # meta.json이 마지막 — 있으면 완성된 샤드 세트
+    count = sum(s["count"] for s in shards)
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "size": size,
+            "count": count,
+            "classes": list(classes),
+            "shards": shards,
+            "fingerprint": fingerprint,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"💾 [SHARDS] {count}/{len(samples)}장 → {out_dir} ({len(shards)}개 샤드, {time.perf_counter() - start:.1f}s)")
+
+
+# ==========================================================
+# 2️⃣ 로더 (memmap 제로 카피)
+# ==========================================================
+def read_meta(shard_dir):
+    with open(os.path.join(shard_dir, "meta.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def read_samples(shard_dir):
+    """[(경로, 클래스 번호, sha256)] — 샤드 순서"""
+    with open(os.path.join(shard_dir, "samples.tsv"), encoding="utf-8") as f:
+        return [(path, int(target), digest) for path, target, digest in (line.rstrip("\n").split("\t") for line in f)]
+
+
+def open_shards(shard_dir, meta=None):
+    """샤드별 (N, H, W, 3) uint8 memmap 목록 (copy-on-write → torch.from_numpy가 복사 없이 감쌀 수 있음)"""
+    meta = meta or read_meta(shard_dir)
+    return [
+        np.load(os.path.join(shard_dir, s["file"]), mmap_mode="c")[:s["count"]]
+        for s in meta["shards"]
+    ]
+
+
+def to_input(images, mean=None, std=None):
+    """
+    uint8 (N, H, W, 3) 또는 (3, H, W) 텐서 → float (N, 3, H, W) / (3, H, W) 0~1 (+ Normalize)
+    transforms.ToTensor(+ Normalize)와 같은 값 — 배치 단위로 한 번에 변환
+    """
+    x = images.permute(0, 3, 1, 2) if images.dim() == 4 else images
+    x = x.float().div_(255)
+    if mean is not None:
+        shape = (1, -1, 1, 1) if x.dim() == 4 else (-1, 1, 1)
+        x = x.sub_(torch.tensor(mean).view(shape)).div_(torch.tensor(std).view(shape))
+    return x
+
+
+class ShardTransform:
+    """ShardedImageDataset 항목((3, H, W) uint8) → float 입력 (ToTensor + 선택적 Normalize)"""
+
+    def __init__(self, mean=None, std=None):
+        self.mean = mean
+        self.std = std
+
+    def __call__(self, image):
+        return to_input(image, self.mean, self.std)
+
+    def __repr__(self):
+        return f"ShardTransform(mean={self.mean}, std={self.std})"
+
+
+class ShardedImageDataset(Dataset):
+    """
+    샤드 세트를 ImageFolder처럼 사용 (samples / targets / classes / class_to_idx 동일).
+    __getitem__은 memmap 페이지를 그대로 감싼 (3, H, W) uint8 텐서를 transform에 넘긴다 (디코딩 / 복사 없음).
+    memmap은 워커 프로세스에서 처음 접근할 때 연다 (DataLoader 워커로 pickle 가능).
+    """
+
+    def __init__(self, shard_dir, transform=None):
+        self.shard_dir = shard_dir
+        self.meta = read_meta(shard_dir)
+        self.classes = self.meta["classes"]
+        self.class_to_idx = {name: i for i, name in enumerate(self.classes)}
+        records = read_samples(shard_dir)
+        self.samples = [(path, target) for path, target, _ in records]
+        self.digests = [digest for _, _, digest in records]
+        self.targets = [target for _, target in self.samples]
+        self.transform = transform
+        self._offsets = np.cumsum([0] + [s["count"] for s in self.meta["shards"]])
+        self._shards = None
+
+    def __len__(self):
+        return len(self.samples)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_shards"] = None
+        return state
+
+    def locate(self, i):
+        """전역 번호 → (샤드 번호, 샤드 내 위치)"""
+        shard = int(np.searchsorted(self._offsets, i, side="right")) - 1
+        return shard, i - int(self._offsets[shard])
+
+    def __getitem__(self, i):
+        if self._shards is None:
+            self._shards = open_shards(self.shard_dir, self.meta)
+        shard, row = self.locate(i)
+        image = torch.from_numpy(self._shards[shard][row]).permute(2, 0, 1)
+        if self.transform is not None:
+            image = self.transform(image)
+        return image, self.targets[i]
+
+
+def iterate_shard_batches(shard_dir, batch_size=256, shuffle=False, seed=0):
+    """
+    DataLoader 없이 샤드에서 바로 배치 읽기 → (uint8 (N, H, W, 3) 텐서, 클래스 번호 텐서, 전역 번호 배열)
+    shuffle=False면 샤드 안 연속 구간을 그대로 감싸므로 복사 없음 (평가 / 대량 추론용).
+    shuffle=True면 샤드 순서와 샤드 안 순서를 섞는다 (배치 안 인덱스는 정렬해 순차 읽기).
+    """
+    meta = read_meta(shard_dir)
+    shards = open_shards(shard_dir, meta)
+    targets = np.array([target for _, target, _ in read_samples(shard_dir)], dtype=np.int64)
+    offsets = np.cumsum([0] + [s["count"] for s in meta["shards"]])
+    rng = np.random.default_rng(seed)
+
+    shard_order = rng.permutation(len(shards)) if shuffle else range(len(shards))
+    for s in shard_order:
+        count = len(shards[s])
+        rows = rng.permutation(count) if shuffle else None
+        for start in range(0, count, batch_size):
+            if rows is None:
+                local = np.arange(start, min(start + batch_size, count))
+                images = torch.from_numpy(shards[s][start:start + batch_size])
+            else:
+                local = np.sort(rows[start:start + batch_size])
+                images = torch.from_numpy(shards[s][local])
+            index = local + offsets[s]
+            yield images, torch.from_numpy(targets[index]), index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="사전 디코딩 이미지 샤드 생성")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--index", help="dataset_index SQLite (split별 하위 폴더 생성)")
+    source.add_argument("--image-dir", help="ImageFolder 구조 폴더 (클래스별 하위 폴더)")
+    parser.add_argument("--out-dir", required=True)
+    parser.add_argument("--size", type=int, default=SHARD_IMG_SIZE)
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE)
+    parser.add_argument("--num-workers", type=int, default=4)
+    args = parser.parse_args()
+
+    options = {"size": args.size, "shard_size": args.shard_size, "num_workers": args.num_workers}
+    if args.index:
+        from .dataset_index import SPLITS, IndexedImageDataset
+        for split in SPLITS:
+            dataset = IndexedImageDataset(args.index, split)
+            write_shards(dataset.samples, dataset.classes, os.path.join(args.out_dir, split), **options)
+    else:
+        from torchvision import datasets
+        dataset = datasets.ImageFolder(args.image_dir)
+        write_shards(dataset.samples, dataset.classes, args.out_dir, **options)
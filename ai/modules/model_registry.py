@@ -0,0 +1,173 @@
+# Path: ai/modules/model_registry.py
+# Desc: MobileNetV3 탐지 모델 상주 레지스트리 (model_type별 1회 로드 + 워밍업)
+
+import os
+import threading
+from pathlib import Path
+
+import torch
+from torchvision import models
+
+# ==========================================================
+# ✅ 경로 / 모델 설정
+# ==========================================================
+BASE_DIR = Path(__file__).resolve().parents[2]  # 프로젝트 루트
+MODEL_DIR = BASE_DIR / "ai" / "models"
+
+MODEL_PATHS = {
+    "korean": MODEL_DIR / "mobilenetv3_deepfake_final.pth",
+    "foriegn": MODEL_DIR / "mobilenetv3_deepfake_final_foriegn2.pth",
+}
+
+# 프런트엔드는 'foreign' 철자로 전송하므로 별칭으로 허용
+MODEL_ALIASES = {
+    "foreign": "foriegn",
+}
+
+IMG_SIZE = 224
+
+# 탐지 모델 출력 순서 — 학습 스크립트(ImageFolder / IndexedImageDataset 라벨 이름순)와 동일 (Fake=0, Real=1)
+# 출력 인덱스는 숫자 대신 항상 이 상수로 참조
+CLASS_NAMES = ("Fake", "Real")
+FAKE_INDEX = CLASS_NAMES.index("Fake")
+
+# 추론 백엔드: torch (기본) | onnx (onnxruntime CPU) | int8 (정적 양자화 TorchScript, CPU)
+DETECTOR_BACKEND = os.getenv("DETECTOR_BACKEND", "torch")
+BACKENDS = ("torch", "onnx", "int8")
+
+
+def resolve_model_type(model_type: str) -> str:
+    """별칭을 정규 model_type으로 변환 (지원하지 않으면 ValueError)"""
+    key = MODEL_ALIASES.get(model_type, model_type)
+    if key not in MODEL_PATHS:
+        raise ValueError("model_type은 'korean' 또는 'foriegn'만 가능합니다.")
+    return key
+
+
+def build_model(model_path, device="cpu"):
+    """MobileNetV3-Small (2-class) 구조 생성 + 가중치 로드 + eval 모드"""
+    model = models.mobilenet_v3_small(weights=None)
+    model.classifier[3] = torch.nn.Linear(model.classifier[3].in_features, 2)
+    model.load_state_dict(torch.load(str(model_path), map_location=device))
+    model.to(device)
+    model.eval()
+    return model
+
+
+def _file_stamp(path) -> str:
+    """파일 크기 + 수정 시각 (없으면 'none')"""
+    try:
+        stat = Path(path).stat()
+    except FileNotFoundError:
+        return "none"
+    return f"{stat.st_size:x}-{stat.st_mtime_ns:x}"
+
+
+def backend_artifact_path(model_path, backend=DETECTOR_BACKEND):
+    """백엔드가 실제로 읽는 파생 파일 (int8: TorchScript, onnx: 백본 ONNX, torch: None)"""
+    if backend == "int8":
+        from .quantize import int8_path_for
+        return int8_path_for(model_path)
+    if backend == "onnx":
+        from .onnx_backend import onnx_path_for
+        return onnx_path_for(model_path)
+    return None
+
+
+def checkpoint_version(model_path, backend=DETECTOR_BACKEND) -> str:
+    """
+    체크포인트 파일 지문 (백엔드 + 크기 + 수정 시각 + 클래스 순서) — 파일이 교체되면 값이 바뀐다
+    int8 / onnx는 파생 파일(양자화 / 변환 결과)의 크기 + 수정 시각도 포함 → 다시 양자화 / 변환하면 값이 바뀐다
+    클래스 순서도 포함 → 라벨 매핑이 바뀌면 결과 캐시 / pHash 인덱스 / 대량 분석 매니페스트의 이전 판정을 재사용하지 않음
+    """
+    stat = Path(model_path).stat()
+    order = "".join(name[0] for name in CLASS_NAMES)
+    version = f"{backend}-{stat.st_size:x}-{stat.st_mtime_ns:x}-{order}"
+    artifact = backend_artifact_path(model_path, backend)
+    if artifact is not None:
+        version += f"-{_file_stamp(artifact)}"
+    return version
+
+
+def load_detector(model_path, backend=DETECTOR_BACKEND, device="cpu"):
+    """설정된 백엔드로 탐지 모델 생성 (head는 항상 PyTorch — Grad-CAM 역전파용)"""
+    if backend not in BACKENDS:
+        raise ValueError(f"지원하지 않는 백엔드입니다: {backend} (가능: {', '.join(BACKENDS)})")
+
+    if backend == "int8":
+        from .quantize import load_quantized
+        return load_quantized(model_path)
+
+    model = build_model(model_path, device)
+    if backend == "onnx":
+        from .onnx_backend import attach_onnx_backbone
+        attach_onnx_backbone(model, model_path)
+    return model
+
+
+# ==========================================================
+# ✅ 상주 모델 레지스트리
+# ==========================================================
+class ModelRegistry:
+    """
+    model_type별 탐지 모델을 프로세스 전역에서 1회만 로드해 재사용.
+    최초 요청(또는 preload) 시 체크포인트를 로드하고 더미 입력으로 워밍업한다.
+    체크포인트 파일이 교체되면(version 변경) 다음 요청에서 다시 로드한다.
+    """
+
+    def __init__(self, model_paths=None, device="cpu", backend=DETECTOR_BACKEND):
+        self.model_paths = dict(model_paths or MODEL_PATHS)
+        self.device = torch.device(device)
+        self.backend = backend
+        self._models = {}
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_type: str = "korean"):
+        key = resolve_model_type(model_type)
+        version = self.version(key)
+        model = self._models.get(key)
+        if model is not None and self._versions.get(key) == version:
+            return model
+
+        # 동시 최초 요청 시 중복 로드 방지
+        with self._lock:
+            if key not in self._models or self._versions.get(key) != version:
+                self._models[key] = self._load(key)
+                # 로드 중 ONNX 자동 변환으로 파생 파일이 새로 생길 수 있으므로 로드 후 다시 계산
+                self._versions[key] = self.version(key)
+        return self._models[key]
+
+    def version(self, model_type: str = "korean") -> str:
+        """현재 체크포인트 버전 (결과 캐시 키에 포함 → 체크포인트 교체 시 캐시 자동 무효화)"""
+        key = resolve_model_type(model_type)
+        return checkpoint_version(self.model_paths[key], self.backend)
+
+    def preload(self, model_types=None):
+        """서버 시작 시 지정한 (기본: 전체) 모델을 미리 로드"""
+        for model_type in model_types or self.model_paths:
+            self.get(model_type)
+
+    def loaded(self):
+        return list(self._models)
+
+    def _load(self, key):
+        model_path = self.model_paths[key]
+        model = load_detector(model_path, self.backend, self.device)
+        self._warmup(model)
+        print(f"✅ [REGISTRY] 모델 로드 완료: {key} ({model_path}, backend={self.backend})")
+        return model
+
+    def _warmup(self, model):
+        # 첫 요청의 지연(메모리 할당, 커널 선택)을 시작 시점으로 이동
+        dummy = torch.zeros(1, 3, IMG_SIZE, IMG_SIZE, device=self.device)
+        with torch.no_grad():
+            model(dummy)
+
+
+# 프로세스 전역 레지스트리
+registry = ModelRegistry()
+
+
+def get_model(model_type: str = "korean"):
+    return registry.get(model_type)
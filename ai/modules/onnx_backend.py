@@ -0,0 +1,108 @@
+# Path: ai/modules/onnx_backend.py
+# Desc: MobileNetV3 탐지 모델 ONNX 변환 + onnxruntime(CPU) 추론 백엔드
+
+# ✅ 실행 명령 (루트에서 실행, 체크포인트 → ONNX 변환)
+# python -m ai.modules.onnx_backend korean foriegn
+
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import torch
+
+try:
+    import onnxruntime as ort
+except ImportError:  # onnx 백엔드를 쓰지 않으면 설치하지 않아도 됨
+    ort = None
+
+from .model_registry import IMG_SIZE, MODEL_DIR, MODEL_PATHS, build_model, resolve_model_type
+
+# ==========================================================
+# ✅ 설정
+# ==========================================================
+ONNX_DIR = MODEL_DIR / "onnx"
+ORT_NUM_THREADS = int(os.getenv("ORT_NUM_THREADS", "0"))  # 0 = onnxruntime 기본값(물리 코어 수)
+ONNX_OPSET = 17
+
+
+def onnx_path_for(model_path):
+    """체크포인트 경로 → ONNX 백본 파일 경로 (ai/models/onnx/<이름>_features.onnx)"""
+    return ONNX_DIR / f"{Path(model_path).stem}_features.onnx"
+
+
+# ==========================================================
+# 1️⃣ 변환
+# ==========================================================
+def export_onnx(model_path, onnx_path=None, opset=ONNX_OPSET):
+    """
+    체크포인트의 백본(model.features)을 ONNX로 변환.
+    Grad-CAM은 head(avgpool → classifier)의 역전파가 필요하므로 head는 PyTorch에 남기고,
+    연산량 대부분을 차지하는 백본만 onnxruntime으로 실행한다.
+    """
+    model = build_model(model_path)
+    onnx_path = Path(onnx_path or onnx_path_for(model_path))
+    onnx_path.parent.mkdir(parents=True, exist_ok=True)
+
+    dummy = torch.zeros(1, 3, IMG_SIZE, IMG_SIZE)
+    torch.onnx.export(
+        model.features,
+        dummy,
+        str(onnx_path),
+        input_names=["input"],
+        output_names=["activations"],
+        dynamic_axes={"input": {0: "batch"}, "activations": {0: "batch"}},
+        opset_version=opset,
+    )
+    print(f"✅ [ONNX] 변환 완료: {model_path} → {onnx_path}")
+    return onnx_path
+
+
+# ==========================================================
+# 2️⃣ onnxruntime 백본
+# ==========================================================
+def create_session(onnx_path):
+    if ort is None:
+        raise RuntimeError("onnxruntime이 설치되어 있지 않습니다. (pip install onnxruntime)")
+
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if ORT_NUM_THREADS:
+        options.intra_op_num_threads = ORT_NUM_THREADS
+    return ort.InferenceSession(str(onnx_path), sess_options=options, providers=["CPUExecutionProvider"])
+
+
+class OnnxFeatures(torch.nn.Module):
+    """
+    model.features 자리에 끼우는 onnxruntime 백본.
+    입력/출력은 torch 텐서이므로 기존 추론·Grad-CAM 코드가 그대로 동작한다.
+    (InferenceSession.run은 스레드 안전 → 상주 모델 공유 가능)
+    """
+
+    def __init__(self, session):
+        super().__init__()
+        self.session = session
+        self.input_name = session.get_inputs()[0].name
+
+    def forward(self, x):
+        inputs = np.ascontiguousarray(x.detach().cpu().numpy(), dtype=np.float32)
+        activations = self.session.run(None, {self.input_name: inputs})[0]
+        return torch.from_numpy(activations)
+
+
+def attach_onnx_backbone(model, model_path, onnx_path=None):
+    """
+    PyTorch 모델의 백본을 onnxruntime 백본으로 교체.
+    ONNX 파일이 없거나 체크포인트보다 오래되었으면 먼저 변환한다.
+    """
+    onnx_path = Path(onnx_path or onnx_path_for(model_path))
+    if not onnx_path.exists() or onnx_path.stat().st_mtime < Path(model_path).stat().st_mtime:
+        export_onnx(model_path, onnx_path)
+
+    model.features = OnnxFeatures(create_session(onnx_path))
+    return model
+
+
+if __name__ == "__main__":
+    for model_type in sys.argv[1:] or list(MODEL_PATHS):
+        export_onnx(MODEL_PATHS[resolve_model_type(model_type)])
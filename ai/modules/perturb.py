@@ -0,0 +1,137 @@
+# Path: ai/modules/perturb.py
+# Desc: 배치 단위 강건성 변형 (make_edited_dataset.py의 blur / noise / JPEG / 밝기·대비 / crop / copy-move / 좌우 반전을 텐서 연산으로, seed 고정)
+
+# ✅ 사용
+# x: (N, 3, H, W) float 0~1 (Normalize 전) → perturb(x, "jpeg", 20, seed=0, batch_index=i) → 같은 형식
+# 같은 seed / 배치 크기 / 배치 순서면 항상 같은 변형 (crop 위치, 노이즈, copy-move 위치)
+# 강도는 224x224 입력 기준 (make_edited_dataset.py는 원본 해상도에 적용 후 리사이즈)
+
+import zlib
+
+import torch
+import torch.nn.functional as F
+from torchvision.io import decode_jpeg, encode_jpeg
+from torchvision.transforms.functional import gaussian_blur as _gaussian_blur
+
+# ==========================================================
+# ✅ 기본 강도 스윕 (make_edited_dataset.py 값 포함)
+# ==========================================================
+DEFAULT_SWEEP = {
+    "gaussian_blur": (1.0, 2.0, 4.0),         # sigma (px)
+    "gaussian_noise": (3.0, 5.5, 10.0),       # 표준편차 (0~255 단위, 5.5 ≈ var 30)
+    "jpeg": (90, 50, 20),                     # quality
+    "brightness": (0.6, 0.8, 1.2, 1.4),       # 배율 (ImageEnhance.Brightness)
+    "contrast": (0.7, 1.1, 1.3),              # 배율 (ImageEnhance.Contrast)
+    "random_crop": (0.95, 0.8, 0.6),          # crop 비율 (위치는 랜덤, 다시 원래 크기로)
+    "copy_move": (1 / 6, 1 / 4),              # 패치 변 비율 (alpha 0.8 합성)
+    "flip_lr": (None,),
+}
+COPY_MOVE_ALPHA = 0.8
+
+
+# ==========================================================
+# 1️⃣ 변형 (x: (N, 3, H, W) float 0~1, g: torch.Generator)
+# ==========================================================
+def gaussian_blur(x, sigma, g=None):
+    kernel = 2 * int(round(3 * sigma)) + 1
+    return _gaussian_blur(x, [kernel, kernel], [float(sigma), float(sigma)])
+
+
+def gaussian_noise(x, std, g=None):
+    noise = torch.randn(x.shape, generator=g).to(x.device)
+    return (x + noise * (std / 255)).clamp_(0, 1)
+
+
+def jpeg(x, quality, g=None):
+    """메모리 안 JPEG 재압축 (이미지별 인코딩 / 디코딩 — 파일 없음)"""
+    images = x.mul(255).round_().clamp_(0, 255).to("cpu", torch.uint8)
+    decoded = [decode_jpeg(encode_jpeg(image, quality=int(quality))) for image in images]
+    return torch.stack(decoded).to(x.device, x.dtype).div_(255)
+
+
+def brightness(x, factor, g=None):
+    """ImageEnhance.Brightness와 같은 식 (검은 이미지와 보간)"""
+    return (x * factor).clamp_(0, 1)
+
+
+def contrast(x, factor, g=None):
+    """ImageEnhance.Contrast와 같은 식 (이미지별 회색조 평균과 보간)"""
+    gray = (0.299 * x[:, 0] + 0.587 * x[:, 1] + 0.114 * x[:, 2]).mean(dim=(1, 2)).view(-1, 1, 1, 1)
+    return (gray + factor * (x - gray)).clamp_(0, 1)
+
+
+def random_crop(x, frac, g=None):
+    """이미지별 랜덤 위치에서 frac 비율로 잘라 원래 크기로 확대 (affine grid, bilinear)"""
+    n = x.shape[0]
+    offset = torch.rand(n, 2, generator=g) * (1 - frac)  # 좌상단 위치 (0~1-frac)
+    theta = torch.zeros(n, 2, 3)
+    theta[:, 0, 0] = frac
+    theta[:, 1, 1] = frac
+    theta[:, :, 2] = -1 + frac + 2 * offset  # crop 중심 (정규화 좌표)
+    grid = F.affine_grid(theta.to(x.device, x.dtype), list(x.shape), align_corners=False)
+    return F.grid_sample(x, grid, mode="bilinear", padding_mode="border", align_corners=False)
+
+
+def copy_move(x, frac, g=None, alpha=COPY_MOVE_ALPHA):
+    """이미지별 랜덤 패치를 다른 랜덤 위치에 alpha 합성 (cv2.addWeighted(대상, alpha, 패치, 1 - alpha))"""
+    n, _, h, w = x.shape
+    ph, pw = max(1, int(h * frac)), max(1, int(w * frac))
+    sy, ty = (torch.rand(2, n, generator=g) * (h - ph + 1)).long()
+    sx, tx = (torch.rand(2, n, generator=g) * (w - pw + 1)).long()
+
+    rows = torch.arange(h).view(1, h) - ty.view(n, 1)
+    cols = torch.arange(w).view(1, w) - tx.view(n, 1)
+    mask = ((rows >= 0) & (rows < ph)).view(n, 1, h, 1) & ((cols >= 0) & (cols < pw)).view(n, 1, 1, w)
+    # 대상 위치 (ty + i, tx + j) ← 원본 (sy + i, sx + j)
+    src_rows = (rows + sy.view(n, 1)).clamp_(0, h - 1)
+    src_cols = (cols + sx.view(n, 1)).clamp_(0, w - 1)
+    batch = torch.arange(n).view(n, 1, 1)
+    shifted = x[batch, :, src_rows.view(n, h, 1).to(x.device), src_cols.view(n, 1, w).to(x.device)].permute(0, 3, 1, 2)
+    return torch.where(mask.to(x.device), alpha * x + (1 - alpha) * shifted, x)
+
+
+def flip_lr(x, strength=None, g=None):
+    return x.flip(-1)
+
+
+PERTURBATIONS = {
+    "gaussian_blur": gaussian_blur,
+    "gaussian_noise": gaussian_noise,
+    "jpeg": jpeg,
+    "brightness": brightness,
+    "contrast": contrast,
+    "random_crop": random_crop,
+    "copy_move": copy_move,
+    "flip_lr": flip_lr,
+}
+
+
+# ==========================================================
+# 2️⃣ seed 고정 적용
+# ==========================================================
+def batch_generator(seed, kind, strength, batch_index):
+    """(seed, 변형, 강도, 배치 번호)별 독립 난수 — 변형 / 강도 조합을 추가해도 다른 조합의 결과는 그대로"""
+    strength = "-" if strength is None else float(strength)  # 90 / 90.0 같은 값은 같은 난수
+    generator = torch.Generator()
+    generator.manual_seed(zlib.crc32(f"{seed}|{kind}|{strength}|{batch_index}".encode("ascii")))
+    return generator
+
+
+def perturb(x, kind, strength, seed=0, batch_index=0):
+    """x: (N, 3, H, W) float 0~1 → 변형된 새 텐서 (x는 그대로)"""
+    if kind not in PERTURBATIONS:
+        raise ValueError(f"지원하지 않는 변형입니다: {kind} (가능: {', '.join(PERTURBATIONS)})")
+    return PERTURBATIONS[kind](x, strength, batch_generator(seed, kind, strength, batch_index))
+
+
+def parse_sweep(items):
+    """['jpeg=90,50,20', 'flip_lr'] → {"jpeg": (90.0, 50.0, 20.0), "flip_lr": (None,)} (없으면 DEFAULT_SWEEP)"""
+    if not items:
+        return dict(DEFAULT_SWEEP)
+    sweep = {}
+    for item in items:
+        kind, _, values = item.partition("=")
+        if kind not in PERTURBATIONS:
+            raise ValueError(f"지원하지 않는 변형입니다: {kind} (가능: {', '.join(PERTURBATIONS)})")
+        sweep[kind] = tuple(float(v) for v in values.split(",")) if values else DEFAULT_SWEEP[kind]
+    return sweep
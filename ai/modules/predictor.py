@@ -2,29 +2,32 @@
 # Desc: MobilenetV3 기반 딥페이크 예측기
 
 import torch
-from torchvision import transforms, models
+from torchvision import transforms
 from PIL import Image
 import torch.nn.functional as F
 
-class DeepfakePredictor:
-    def __init__(self, model_path: str):
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.model = models.mobilenet_v3_small(weights=None)
+from .image_io import open_for_classifier
+from .model_registry import DETECTOR_BACKEND, FAKE_INDEX, load_detector
 
-        # ✅ 2-class 분류 (real / fake)
-        self.model.classifier[3] = torch.nn.Linear(self.model.classifier[3].in_features, 2)
+class DeepfakePredictor:
+    def __init__(self, model_path: str, backend: str = DETECTOR_BACKEND):
+        # onnx / int8 백엔드는 CPU 전용
+        use_cuda = torch.cuda.is_available() and backend == "torch"
+        self.device = torch.device("cuda" if use_cuda else "cpu")
 
-        self.model.load_state_dict(torch.load(model_path, map_location=self.device))
-        self.model.eval()
+        # ✅ 2-class 분류 (real / fake) — backend: torch | onnx | int8
+        self.model = load_detector(model_path, backend, self.device)
         self.transform = transforms.Compose([
             transforms.Resize((224, 224)),
             transforms.ToTensor(),
         ])
 
-    def predict(self, image: Image.Image):
+    def predict(self, image):
+        # image: PIL 이미지 / 경로 / 바이트 — 공통 로더로 EXIF 보정 + 224px 축소 디코딩
+        image = open_for_classifier(image)
         tensor = self.transform(image).unsqueeze(0)
         with torch.no_grad():
             output = self.model(tensor)
-            prob = F.softmax(output, dim=1)[0][1].item()  # index 1 → fake 확률
+            prob = F.softmax(output, dim=1)[0][FAKE_INDEX].item()  # fake 확률 (model_registry.CLASS_NAMES 순서)
         result = "딥페이크로 판단됨" if prob >= 0.5 else "실제 이미지로 판단됨"
         return prob, result
@@ -0,0 +1,161 @@
+# Path: ai/modules/quantize.py
+# Desc: MobileNetV3 탐지 모델 INT8 사후 양자화 (정적 양자화 + 얼굴 crop 보정, 실패 시 동적 양자화)
+
+# ✅ 실행 명령 (루트에서 실행)
+# python -m ai.modules.quantize --model-type korean --calib-dir <얼굴 crop 폴더> --num-samples 512
+
+import os
+import json
+import copy
+import random
+import argparse
+from pathlib import Path
+
+import torch
+from PIL import Image
+from torch.ao.quantization import get_default_qconfig_mapping, quantize_dynamic
+from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+
+from .model_registry import IMG_SIZE, MODEL_DIR, MODEL_PATHS, build_model, resolve_model_type
+
+# ==========================================================
+# ✅ 설정
+# ==========================================================
+INT8_DIR = MODEL_DIR / "int8"
+IMAGE_EXTS = (".jpg", ".jpeg", ".png")
+
+
+def int8_path_for(model_path):
+    """체크포인트 경로 → INT8 TorchScript 경로 (ai/models/int8/<이름>_int8.pt)"""
+    return INT8_DIR / f"{Path(model_path).stem}_int8.pt"
+
+
+def _meta_path(int8_path):
+    return Path(int8_path).with_suffix(".json")
+
+
+# ==========================================================
+# 1️⃣ 보정(calibration) 데이터
+# ==========================================================
+def sample_calibration_images(calib_dir, num_samples=512, seed=0):
+    """calib_dir 하위(Real/Fake 등 하위 폴더 포함)에서 이미지를 seed 고정으로 샘플링"""
+    files = []
+    for root, _, names in os.walk(calib_dir):
+        files.extend(os.path.join(root, n) for n in names if n.lower().endswith(IMAGE_EXTS))
+    files.sort()
+    random.Random(seed).shuffle(files)
+    return files[:num_samples]
+
+
+def _calibration_batches(files, transform, batch_size=32):
+    for start in range(0, len(files), batch_size):
+        chunk = files[start:start + batch_size]
+        yield torch.stack([transform(Image.open(f).convert("RGB")) for f in chunk])
+
+
+# ==========================================================
+# 2️⃣ 양자화
+# ==========================================================
+def quantize_static(model, calib_batches):
+    """
+    백본(model.features)만 FX 정적 양자화 (conv/bn/activation fuse + int8).
+    head는 float로 유지 — Grad-CAM이 head 역전파로 activation gradient를 구하기 때문.
+    """
+    qmodel = copy.deepcopy(model).eval()
+    qconfig_mapping = get_default_qconfig_mapping(torch.backends.quantized.engine)
+    example = torch.zeros(1, 3, IMG_SIZE, IMG_SIZE)
+
+    prepared = prepare_fx(qmodel.features, qconfig_mapping, example_inputs=(example,))
+    with torch.no_grad():
+        for batch in calib_batches:
+            prepared(batch)
+    qmodel.features = convert_fx(prepared)
+    return qmodel
+
+
+def quantize_dynamic_fallback(model):
+    """
+    정적 양자화 실패 시 대안: Linear 계층만 동적 int8 양자화.
+    동적 양자화 Linear는 역전파가 불가능하므로 이 결과물은 분류 전용 (Grad-CAM 미지원).
+    """
+    return quantize_dynamic(copy.deepcopy(model).eval(), {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def quantize_checkpoint(model_path, calib_dir=None, num_samples=512, output_path=None):
+    """
+    체크포인트 → INT8 TorchScript 저장. 보정 데이터가 있으면 정적 양자화, 없거나 실패하면 동적 양자화.
+    반환: (저장 경로, 방식 'static' | 'dynamic')
+    """
+    from .Deepfake_Evaluation_MobileNet_v3_final_application_number_option import transform
+
+    model = build_model(model_path)
+    method = "dynamic"
+    qmodel = None
+
+    files = sample_calibration_images(calib_dir, num_samples) if calib_dir else []
+    if files:
+        try:
+            qmodel = quantize_static(model, _calibration_batches(files, transform))
+            method = "static"
+        except Exception as e:
+            print(f"⚠️ [INT8] 정적 양자화 실패 → 동적 양자화로 대체: {e}")
+    else:
+        print("⚠️ [INT8] 보정 이미지 없음 → 동적 양자화로 대체")
+
+    if qmodel is None:
+        qmodel = quantize_dynamic_fallback(model)
+
+    output_path = Path(output_path or int8_path_for(model_path))
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    example = torch.zeros(1, 3, IMG_SIZE, IMG_SIZE)
+    with torch.no_grad():
+        traced = torch.jit.trace(qmodel, example)
+    torch.jit.save(traced, str(output_path))
+
+    meta = {
+        "method": method,
+        "source": str(model_path),
+        "engine": torch.backends.quantized.engine,
+        "calibration_images": len(files) if method == "static" else 0,
+    }
+    with open(_meta_path(output_path), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=4, ensure_ascii=False)
+
+    print(f"✅ [INT8] 양자화 완료 ({method}): {model_path} → {output_path}")
+    return output_path, method
+
+
+# ==========================================================
+# 3️⃣ 서빙용 로드
+# ==========================================================
+def load_quantized(model_path, require_gradcam=True):
+    """
+    INT8 TorchScript 모델 로드 (features / avgpool / classifier 하위 모듈 유지 → Grad-CAM 엔진 사용 가능)
+    require_gradcam=True면 Grad-CAM이 불가능한 동적 양자화 결과물은 거부한다.
+    """
+    int8_path = int8_path_for(model_path)
+    if not int8_path.exists():
+        raise FileNotFoundError(
+            f"INT8 모델이 없습니다: {int8_path} "
+            f"(python -m ai.modules.quantize --model-type <korean|foriegn> --calib-dir <얼굴 crop 폴더>)"
+        )
+
+    meta_path = _meta_path(int8_path)
+    meta = json.loads(meta_path.read_text(encoding="utf-8")) if meta_path.exists() else {}
+    if require_gradcam and meta.get("method") != "static":
+        raise RuntimeError(f"Grad-CAM 서빙에는 정적 양자화 모델이 필요합니다: {int8_path} ({meta.get('method')})")
+
+    model = torch.jit.load(str(int8_path), map_location="cpu")
+    model.eval()
+    return model
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="탐지 모델 INT8 양자화")
+    parser.add_argument("--model-type", nargs="+", default=list(MODEL_PATHS))
+    parser.add_argument("--calib-dir", default=None, help="보정용 얼굴 crop 이미지 폴더")
+    parser.add_argument("--num-samples", type=int, default=512)
+    args = parser.parse_args()
+
+    for model_type in args.model_type:
+        quantize_checkpoint(MODEL_PATHS[resolve_model_type(model_type)], args.calib_dir, args.num_samples)
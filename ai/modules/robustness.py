@@ -0,0 +1,149 @@
+# Path: ai/modules/robustness.py
+# Desc: 강건성 평가 (평가 로더 배치에 변형을 메모리에서 적용 → 변형 종류 x 강도별 정확도 / 재현율, Edited 이미지 파일 생성 없음)
+
+# ✅ 실행 명령 (루트에서 실행)
+# python -m ai.modules.robustness --model korean --model foriegn --dataset test=<test 폴더 (Fake/Real)> --seed 0
+# python -m ai.modules.robustness --model korean --dataset real=<Real 폴더> --label real=Real --sweep jpeg=90,70,50,30,10 --sweep gaussian_blur
+#
+# --sweep: 변형=강도1,강도2,... (강도 생략 시 기본값, --sweep 없으면 perturb.DEFAULT_SWEEP 전체)
+# 변형 없는 원본("clean")을 항상 함께 평가해 정확도 하락폭을 계산
+# make_edited_dataset.py(Real 이미지 → Edited 폴더 + metadata.csv)를 대신함 — --label real=Real로 Real 폴더만 평가하면 같은 구성
+
+import json
+import argparse
+
+import torch
+from tqdm import tqdm
+
+from .eval_matrix import load_variant, open_dataset, parse_model_spec
+from .eval_runner import ConfusionMatrix, make_loader
+from .image_shards import IMAGENET_MEAN, IMAGENET_STD
+from .model_registry import CLASS_NAMES
+from .perturb import parse_sweep, perturb
+
+CLEAN = ("clean", None)
+
+
+def conditions_for(sweep):
+    """{변형: 강도들} → [("clean", None), (변형, 강도), ...]"""
+    return [CLEAN] + [(kind, strength) for kind, strengths in sweep.items() for strength in strengths]
+
+
+def run_robustness(models, datasets_, sweep, batch_size=64, num_workers=4, normalize=False, seed=0):
+    """
+    models: {이름: (모델, 디바이스)}, datasets_: {이름: Dataset (uint8 (3, H, W))}
+    배치를 1회 디코딩하고 조건(원본 + 변형 x 강도)마다 메모리에서 변형해 모든 모델에 입력.
+    반환: {모델: {데이터셋: [{"perturbation", "strength", "accuracy", "accuracy_drop", "recall", ...}]}}
+    """
+    conditions = conditions_for(sweep)
+    mean = torch.tensor(IMAGENET_MEAN).view(1, -1, 1, 1)
+    std = torch.tensor(IMAGENET_STD).view(1, -1, 1, 1)
+    matrices = {m: {} for m in models}
+
+    for model, _ in models.values():
+        model.eval()
+
+    for dataset_name, dataset in datasets_.items():
+        for m in models:
+            matrices[m][dataset_name] = {condition: ConfusionMatrix(len(CLASS_NAMES)) for condition in conditions}
+        pin_device = next((d for _, d in models.values() if d.type == "cuda"), "cpu")
+        loader = make_loader(dataset, batch_size, num_workers, pin_device)
+
+        with torch.inference_mode():
+            for batch_index, (images, labels) in enumerate(tqdm(loader, desc=f"🧪 {dataset_name}")):
+                clean = images.float().div_(255)
+                labels = labels.numpy()
+                for kind, strength in conditions:
+                    x = clean if kind == CLEAN[0] else perturb(clean, kind, strength, seed, batch_index)
+                    if normalize:
+                        x = (x - mean) / std
+                    on_device = {}
+                    for model_name, (model, device) in models.items():
+                        if device not in on_device:
+                            on_device[device] = x.to(device, non_blocking=True)
+                        preds = model(on_device[device]).argmax(1).cpu().numpy()
+                        matrices[model_name][dataset_name][(kind, strength)].update(labels, preds)
+
+    return {
+        m: {d: _rows(per_condition) for d, per_condition in per_dataset.items()}
+        for m, per_dataset in matrices.items()
+    }
+
+
+def _rows(per_condition):
+    clean_accuracy = per_condition[CLEAN].accuracy * 100
+    rows = []
+    for (kind, strength), matrix in per_condition.items():
+        precision, recall, _, _ = matrix.per_class()
+        accuracy = matrix.accuracy * 100
+        rows.append({
+            "perturbation": kind,
+            "strength": strength,
+            "accuracy": accuracy,
+            "accuracy_drop": clean_accuracy - accuracy,
+            "precision": {name: float(precision[i]) for i, name in enumerate(CLASS_NAMES)},
+            "recall": {name: float(recall[i]) for i, name in enumerate(CLASS_NAMES)},
+            "confusion_matrix": matrix.counts.tolist(),
+        })
+    return rows
+
+
+def format_table(results):
+    lines = []
+    for model_name, per_dataset in results.items():
+        for dataset_name, rows in per_dataset.items():
+            lines.append(f"\n[{model_name} / {dataset_name}]")
+            lines.append(f"{'perturbation':<16}{'strength':>10}{'acc':>9}{'drop':>8}{'R(Fake)':>9}{'R(Real)':>9}")
+            for row in rows:
+                strength = "-" if row["strength"] is None else f"{row['strength']:g}"
+                lines.append(
+                    f"{row['perturbation']:<16}{strength:>10}{row['accuracy']:>8.2f}%{row['accuracy_drop']:>+8.2f}"
+                    f"{row['recall']['Fake']:>9.3f}{row['recall']['Real']:>9.3f}"
+                )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="변형 종류 x 강도별 강건성 평가 (메모리 변형)")
+    parser.add_argument("--model", action="append", required=True, help="model_type[:backend] (예: korean, korean:int8)")
+    parser.add_argument("--dataset", action="append", required=True, help="이름=폴더")
+    parser.add_argument("--label", action="append", default=[], help="이름=클래스 (이미지만 있는 폴더, 예: real=Real)")
+    parser.add_argument("--sweep", action="append", default=[], help="변형=강도1,강도2 (예: jpeg=90,50,20)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--imagenet-norm", action="store_true", help="ImageNet Normalize 적용 (학습 스크립트 전처리)")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--num-workers", type=int, default=4)
+    parser.add_argument("--device", default="cuda" if torch.cuda.is_available() else "cpu")
+    parser.add_argument("--output", default="robustness_report.json")
+    args = parser.parse_args()
+
+    sweep = parse_sweep(args.sweep)
+    labels = dict(item.split("=", 1) for item in args.label)
+    datasets_ = {}
+    for item in args.dataset:
+        name, path = item.split("=", 1)
+        datasets_[name] = open_dataset(path, labels.get(name))
+        print(f"📂 [{name}] {path} ({len(datasets_[name])}장)")
+
+    models = {}
+    for spec in args.model:
+        model_type, backend = parse_model_spec(spec)
+        name = model_type if backend == "torch" else f"{model_type}:{backend}"
+        models[name] = load_variant(model_type, backend, args.device)
+        print(f"✅ 모델 로드 완료: {name} (device={models[name][1]})")
+
+    print(f"🧪 조건 {len(conditions_for(sweep))}개 (seed={args.seed}): {sweep}")
+    results = run_robustness(models, datasets_, sweep, args.batch_size, args.num_workers, args.imagenet_norm, args.seed)
+
+    print(format_table(results))
+    report = {
+        "seed": args.seed,
+        "batch_size": args.batch_size,
+        "preprocess": "imagenet-norm" if args.imagenet_norm else "serving",
+        "sweep": {kind: list(strengths) for kind, strengths in sweep.items()},
+        "classes": list(CLASS_NAMES),
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4, ensure_ascii=False)
+    print(f"💾 결과 저장: {args.output}")
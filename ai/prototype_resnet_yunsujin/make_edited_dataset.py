@@ -1,5 +1,6 @@
 # Path: ai/prototype_resnet_yunsujin/make_edited_dataset.py
 # Desc: Real 이미지를 인위적으로 변형하여 Edited 데이터셋을 생성
+# ※ 평가만 할 때는 파일 생성 없이 python -m ai.modules.robustness 사용 (같은 변형을 평가 배치에 메모리에서 적용, 강도 스윕 가능)
 
 import os
 import cv2
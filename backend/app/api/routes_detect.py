@@ -7,12 +7,20 @@ import uuid
 import traceback
 from datetime import datetime
 from pathlib import Path
-from fastapi import APIRouter, UploadFile, File, HTTPException, Form, Request
-from fastapi.responses import JSONResponse, FileResponse
+from typing import List
+from fastapi import APIRouter, BackgroundTasks, UploadFile, File, HTTPException, Form, Request
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from PIL import Image
 import numpy as np
 
-from backend.app.services.detect_service import predict_fake
+from backend.app.core.database import SessionLocal
+from backend.app.core.executor import ExecutorBusyError, restore_executor
+from backend.app.models.db_models import Upload
+from backend.app.services.batch_predict import receive_batch, stream_batch
+from backend.app.services.detect_service import persist_gradcam, predict_fake_batched
+from backend.app.services.ingest import INGEST_MEMORY_LIMIT, MAX_UPLOAD_BYTES, ingest_upload
+from backend.app.services.upload_service import new_upload_name
 from backend.app.services.report_heatmap_service import generate_heatmap_report
 from ai.modules.restorer import FaceRestorer
 
@@ -29,6 +37,15 @@ MODEL_PATH = BASE_DIR / "ai" / "models" / "RealESRGAN_x4plus.pth"
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 RESTORE_DIR.mkdir(parents=True, exist_ok=True)
 
+# ======================================================
+# ✅ /api/predict 저장 정책 (환경변수)
+# ======================================================
+# 메모리 모드: 업로드 바이트를 그대로 디코딩하고 Grad-CAM PNG도 메모리에서 인코딩
+# 업로드 / Grad-CAM 파일 보관은 응답 이후 백그라운드 작업으로 수행 (요청 경로에서 디스크 I/O 제거)
+PREDICT_IN_MEMORY = os.getenv("PREDICT_IN_MEMORY", "1") == "1"
+PERSIST_UPLOADS = os.getenv("PERSIST_UPLOADS", "1") == "1"
+PERSIST_GRADCAM = os.getenv("PERSIST_GRADCAM", "0") == "1"
+
 # ======================================================
 # ✅ 복원 모델 로드
 # ======================================================
@@ -45,12 +62,14 @@ except Exception as e:
 # ======================================================
 @router.post("/predict")
 async def predict_image(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     model_type: str = Form("korean")
 ):
     """
     업로드된 이미지를 모델에 전달해 딥페이크 탐지 결과 반환
     """
+    upload = None
     try:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         unique_id = uuid.uuid4().hex[:6]
@@ -58,22 +77,140 @@ async def predict_image(
         safe_name = f"{timestamp}_{unique_id}{ext}"
         save_path = UPLOAD_DIR / safe_name
 
-        with open(save_path, "wb") as f:
-            f.write(await file.read())
+        # ✅ 청크 단위 수신 (크기 제한 / 형식 검사 / SHA-256) — 작은 파일은 메모리, 큰 파일은 save_path로
+        memory_limit = INGEST_MEMORY_LIMIT if PREDICT_IN_MEMORY else 0
+        upload = await ingest_upload(file, save_path, memory_limit=memory_limit)
 
-        print(f"📸 [PREDICT] 요청 파일: {safe_name} / 모델: {model_type}")
+        print(f"📸 [PREDICT] 요청 파일: {safe_name} ({upload.size} bytes) / 모델: {model_type}")
 
-        result = predict_fake(str(save_path), model_type=model_type)
+        # ✅ 같은 이미지 + 같은 모델 버전이면 캐시 결과 반환, 아니면 model_type별 마이크로 배치로 추론
+        result = await predict_fake_batched(
+            upload.source,
+            model_type=model_type,
+            digest=upload.digest,
+            image_path=str(save_path) if PERSIST_UPLOADS else None,
+        )
+        if PERSIST_UPLOADS:
+            background_tasks.add_task(upload.persist)
+        else:
+            background_tasks.add_task(upload.discard)
+        if PERSIST_GRADCAM and result.get("gradcam"):
+            background_tasks.add_task(persist_gradcam, result["gradcam"])
         result["model_type"] = model_type
 
         print(f"📤 [PREDICT RESULT] {result}")
         return JSONResponse(status_code=200, content=result)
 
+    except HTTPException:
+        _discard_unpersisted(upload)
+        raise
+    except ExecutorBusyError as e:
+        _discard_unpersisted(upload)
+        print(f"⚠️ [PREDICT BUSY]: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
+        _discard_unpersisted(upload)
         print(f"❌ [PREDICT ERROR]: {e}")
         raise HTTPException(status_code=500, detail=f"탐지 중 오류 발생: {str(e)}")
 
 
+def _discard_unpersisted(upload):
+    """실패한 /api/predict 요청이 수신 중 save_path로 옮겨 쓴 파일 삭제 (보관 설정이 꺼진 경우)"""
+    if upload is not None and not PERSIST_UPLOADS:
+        upload.discard()
+
+
+# ======================================================
+# 1️⃣-1 /api/analyze — 업로드 기록 + 탐지 (1회 전송)
+# ======================================================
+@router.post("/analyze")
+async def analyze_image(
+    file: UploadFile = File(...),
+    model_type: str = Form("korean")
+):
+    """
+    /api/upload + /api/predict를 한 번에 처리.
+    파일은 청크 단위로 한 번만 저장하고, 탐지 결과(판정 / 신뢰도 / 모델)를 Upload 행과 함께 한 트랜잭션으로 기록
+    """
+    safe_name, file_ext = new_upload_name(file.filename)
+    save_path = UPLOAD_DIR / safe_name
+
+    try:
+        upload = await ingest_upload(file, save_path)
+        await run_in_threadpool(upload.persist)  # 작은 파일은 메모리 → 1회 저장, 큰 파일은 수신 중 이미 저장됨
+        print(f"📸 [ANALYZE] 요청 파일: {safe_name} ({upload.size} bytes) / 모델: {model_type}")
+
+        result = await predict_fake_batched(
+            upload.source, model_type=model_type, digest=upload.digest, image_path=str(save_path)
+        )
+        if "error" in result:
+            # 탐지 실패는 기록하지 않음 (성공 응답 / result="error" 행 없이 500)
+            save_path.unlink(missing_ok=True)
+            print(f"❌ [ANALYZE ERROR]: {result['error']}")
+            raise HTTPException(status_code=500, detail=result["error"])
+        result["model_type"] = model_type
+
+        record_id = await run_in_threadpool(_record_upload, safe_name, file.filename, file_ext, model_type, result)
+        result["upload_id"] = record_id
+        result["server_filename"] = safe_name
+
+        print(f"📤 [ANALYZE RESULT] id={record_id} {result.get('pred_label')} ({result.get('confidence')})")
+        return JSONResponse(status_code=200, content=result)
+
+    except HTTPException:
+        raise
+    except ExecutorBusyError as e:
+        save_path.unlink(missing_ok=True)
+        print(f"⚠️ [ANALYZE BUSY]: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        save_path.unlink(missing_ok=True)
+        print(f"❌ [ANALYZE ERROR]: {e}")
+        raise HTTPException(status_code=500, detail=f"분석 중 오류 발생: {str(e)}")
+
+
+def _record_upload(safe_name, original_name, file_ext, model_type, result):
+    """Upload 행을 판정 결과와 함께 1회 INSERT (pending 상태 없이 한 트랜잭션)"""
+    db = SessionLocal()
+    try:
+        record = Upload(
+            filename=safe_name,
+            original_name=original_name,
+            file_ext=file_ext,
+            result=result.get("pred_label", "error"),
+            confidence=result.get("confidence"),
+            model_type=model_type,
+            uploaded_at=datetime.utcnow(),
+        )
+        db.add(record)
+        db.commit()
+        return record.id
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+# ======================================================
+# 1️⃣-2 /api/predict/batch — 다중 이미지 / zip 배치 탐지 (NDJSON 스트리밍)
+# ======================================================
+@router.post("/predict/batch")
+async def predict_batch_images(
+    files: List[UploadFile] = File(...),
+    model_type: str = Form("korean"),
+    gradcam: bool = Form(False),
+):
+    """
+    여러 이미지(또는 zip 1개)를 한 요청으로 받아 미니 배치 단위로 판정.
+    미니 배치가 끝날 때마다 파일당 1줄의 NDJSON을 내보내고, 마지막 줄은 {"summary": ...}.
+    gradcam=true일 때만 Grad-CAM 오버레이(base64 PNG)를 포함 (false면 분류 forward만 수행)
+    """
+    job = await receive_batch(files, model_type)
+    print(f"📸 [BATCH] {len(job.items)}개 / 모델: {job.model_type} / Grad-CAM: {gradcam}")
+    return StreamingResponse(stream_batch(job, gradcam=gradcam), media_type="application/x-ndjson")
+
+
 # ======================================================
 # 2️⃣ /api/restore — 얼굴 복원
 # ======================================================
@@ -86,25 +223,37 @@ async def restore_image(file: UploadFile = File(...)):
         if restorer is None:
             raise HTTPException(status_code=500, detail="복원 모델이 로드되지 않았습니다.")
 
-        image_bytes = await file.read()
-        image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
-        restored = restorer.restore(np.array(image))
-
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         unique_id = uuid.uuid4().hex[:6]
         ext = os.path.splitext(file.filename)[1]
         safe_name = f"{timestamp}_{unique_id}_restored{ext}"
         save_path = RESTORE_DIR / safe_name
-        Image.fromarray(restored).save(save_path)
+
+        # 크기 제한 / 형식 검사 / 압축 폭탄 검사 후 메모리로 수신 (복원 입력은 어차피 전체 디코딩)
+        upload = await ingest_upload(file, save_path, memory_limit=MAX_UPLOAD_BYTES)
+
+        # 디코딩 + RealESRGAN + 저장은 추론 실행기에서 (이벤트 루프 차단 방지)
+        await restore_executor.run(_restore_and_save, upload.data, save_path)
 
         print(f"💾 [RESTORE] 복원 완료 → {save_path}")
         return {"restored_image_url": f"http://127.0.0.1:8001/data/restored/{safe_name}"}
 
+    except HTTPException:
+        raise
+    except ExecutorBusyError as e:
+        print(f"⚠️ [RESTORE BUSY]: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         print(f"❌ [RESTORE ERROR]: {e}")
         raise HTTPException(status_code=500, detail=f"복원 중 오류 발생: {str(e)}")
 
 
+def _restore_and_save(image_bytes, save_path):
+    image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
+    restored = restorer.restore(np.array(image))
+    Image.fromarray(restored).save(save_path)
+
+
 # ======================================================
 # 3️⃣ /api/report — PDF 보고서 생성 (LangChain 연동)
 # ======================================================
@@ -123,8 +272,8 @@ async def generate_report(request: Request):
         if missing:
             raise ValueError(f"필수 키 누락: {missing}")
 
-        # ✅ 보고서 생성
-        pdf_path = generate_heatmap_report(result)
+        # ✅ 보고서 생성 (LLM 호출 + PDF 작성은 블로킹 작업이므로 스레드에서 실행)
+        pdf_path = await run_in_threadpool(generate_heatmap_report, result)
 
         if not os.path.exists(pdf_path):
             raise FileNotFoundError(f"PDF 파일 생성 실패: {pdf_path}")
@@ -0,0 +1,23 @@
+# Path: backend/app/api/routes_metrics.py
+# Desc: 서버 내부 지표 조회 (추론 실행기 대기열, 결과 캐시 적중률 등)
+
+from fastapi import APIRouter
+
+from backend.app.core.executor import executor_stats
+from backend.app.services.result_cache import result_cache
+from backend.app.services.phash_index import get_phash_index
+
+router = APIRouter()
+
+
+# ==========================================================
+# 1️⃣ 작업 클래스별 실행기 상태 (대기/실행/완료/거절 수 + 대기 시간)
+# ==========================================================
+@router.get("/metrics")
+def get_metrics():
+    phash_index = get_phash_index()
+    return {
+        "executors": executor_stats(),
+        "result_cache": result_cache.stats(),
+        "phash_index": phash_index.stats() if phash_index is not None else None,
+    }
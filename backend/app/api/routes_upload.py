@@ -4,8 +4,9 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException
 from backend.app.core.database import SessionLocal
 from backend.app.models.db_models import Upload
+from backend.app.services.ingest import ingest_upload
 from datetime import datetime
-import os, shutil, uuid
+import os, uuid
 
 router = APIRouter()
 
@@ -29,9 +30,8 @@ async def upload_image(file: UploadFile = File(...)):
         safe_name = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}.{file_ext}"
         save_path = os.path.join(UPLOAD_DIR, safe_name)
 
-        # 파일 저장
-        with open(save_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # 파일 저장 (청크 단위 수신 — 크기 제한 / 형식 / 압축 폭탄 검사 후 디스크로)
+        await ingest_upload(file, save_path, memory_limit=0)
 
         # DB 기록
         record = Upload(
@@ -50,6 +50,9 @@ async def upload_image(file: UploadFile = File(...)):
             "user_filename": original_name
         }
 
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,59 @@
+# Path: backend/app/core/body_limit.py
+# Desc: 요청 본문 크기 제한 ASGI 미들웨어 (UploadFile 파싱 전에 Content-Length / 수신 누적 크기로 413)
+
+# ✅ 사용 (backend/main.py)
+# app.add_middleware(BodySizeLimitMiddleware, limits={"/api/predict": MAX_UPLOAD_BYTES, ...})
+#
+# FastAPI는 UploadFile 인자를 핸들러 호출 전에 multipart 전체를 파싱(SpooledTemporaryFile)하므로
+# ingest_upload의 크기 검사만으로는 본문을 끝까지 받은 뒤에야 413이 나간다 → 라우팅 전에 여기서 차단
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+# multipart 경계 / 파트 헤더 / 폼 필드(model_type 등) 여유분
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+def _too_large(limit):
+    return f"요청 본문이 너무 큽니다. (최대 {limit // (1024 * 1024)}MB)"
+
+
+class BodySizeLimitMiddleware:
+    """
+    limits: {경로: 파일 최대 바이트} — 본문 한도는 여기에 MULTIPART_OVERHEAD를 더한 값
+      - Content-Length가 한도를 넘으면 본문을 읽지 않고 즉시 413
+      - Content-Length가 없거나(chunked) 거짓이면 수신 누적 크기가 한도를 넘는 순간 413
+    파일별 한도 / 형식 검사는 그대로 ingest_upload가 담당
+    """
+
+    def __init__(self, app, limits, overhead=MULTIPART_OVERHEAD):
+        self.app = app
+        self.limits = {path.rstrip("/"): limit for path, limit in limits.items()}
+        self.overhead = overhead
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("POST", "PUT", "PATCH"):
+            return await self.app(scope, receive, send)
+        limit = self.limits.get(scope["path"].rstrip("/"))
+        if limit is None:
+            return await self.app(scope, receive, send)
+
+        max_body = limit + self.overhead
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > max_body:
+            response = JSONResponse(status_code=413, content={"detail": _too_large(limit)}, headers={"Connection": "close"})
+            return await response(scope, receive, send)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_body:
+                    # 라우트의 multipart 파싱 도중 발생 → ExceptionMiddleware가 413 응답으로 변환
+                    raise HTTPException(status_code=413, detail=_too_large(limit))
+            return message
+
+        await self.app(scope, limited_receive, send)
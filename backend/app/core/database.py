@@ -1,7 +1,7 @@
 # Path: backend/app/core/database.py
 # Desc: MySQL 연결 설정 (SQLAlchemy + pymysql 사용)
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker, declarative_base
 import os
 
@@ -18,3 +18,18 @@ DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASS}@{DB_HOST}/{DB_NAME}"
 engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 Base = declarative_base()
+
+
+def add_missing_columns(table):
+    """
+    create_all은 이미 있는 테이블에 컬럼을 추가하지 않으므로
+    모델에 새로 생긴 컬럼을 NULL 허용으로 ALTER TABLE 추가 (기존 데이터 유지)
+    """
+    existing = {column["name"] for column in inspect(engine).get_columns(table.name)}
+    with engine.begin() as conn:
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            column_type = column.type.compile(dialect=engine.dialect)
+            conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type} NULL"))
+            print(f"✅ [DB] 컬럼 추가: {table.name}.{column.name} ({column_type})")
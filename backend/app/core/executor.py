@@ -0,0 +1,168 @@
+# Path: backend/app/core/executor.py
+# Desc: 작업 클래스별 추론 스레드 풀 (탐지 / 복원 분리 + 동시 실행 제한 + 우선순위 + 대기 시간 지표)
+
+import os
+import time
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# ==========================================================
+# ✅ 작업 클래스 설정 (환경변수로 조정 가능)
+# ==========================================================
+# - workers     : 클래스별 동시 실행 작업 수 (= 전용 스레드 수)
+# - queue_limit : 실행 + 대기 작업 상한 (초과 시 503)
+# - nice        : 스레드 우선순위 (Linux nice 값, 클수록 낮은 우선순위)
+#   → RealESRGAN 복원이 몰려도 탐지(SLO 대상)는 자기 풀에서 바로 실행되고 CPU도 우선 배정됨
+WORKER_CLASSES = {
+    "detect": {
+        "workers": int(os.getenv("DETECT_WORKERS", "2")),
+        "queue_limit": int(os.getenv("DETECT_QUEUE_LIMIT", "64")),
+        "nice": int(os.getenv("DETECT_NICE", "0")),
+    },
+    "restore": {
+        "workers": int(os.getenv("RESTORE_WORKERS", "1")),
+        "queue_limit": int(os.getenv("RESTORE_QUEUE_LIMIT", "8")),
+        "nice": int(os.getenv("RESTORE_NICE", "10")),
+    },
+}
+
+WAIT_SAMPLES = 1000  # 대기 시간 백분위 계산용 최근 샘플 수
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q / 100))]
+
+
+class ExecutorBusyError(RuntimeError):
+    """대기열이 가득 차 작업을 받을 수 없을 때 발생 (API에서는 503으로 응답)"""
+
+
+def _set_thread_nice(nice):
+    """현재 스레드의 nice 값 설정 (Linux 전용, 실패 시 무시)"""
+    if not nice or not hasattr(os, "setpriority"):
+        return
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), nice)
+    except OSError as e:
+        print(f"⚠️ [EXECUTOR] 스레드 우선순위 설정 실패 (nice={nice}): {e}")
+
+
+class InferenceExecutor:
+    """
+    PyTorch / RealESRGAN / cv2 같은 CPU 작업을 이벤트 루프 밖의 고정 크기 스레드 풀에서 실행.
+
+    - PyTorch 연산은 GIL을 해제하므로 상주 모델을 공유하는 스레드 풀로 충분하다
+    - 작업 클래스마다 별도 인스턴스(전용 스레드)를 두어 서로의 대기열에 갇히지 않는다
+    - 실행 + 대기 작업 수가 queue_limit을 넘으면 즉시 ExecutorBusyError (무한 대기열 방지)
+    - stats()로 대기/실행/완료/거절 수와 대기 시간(제출 → 실행 시작)을 노출
+    """
+
+    def __init__(self, max_workers=2, queue_limit=64, name="inference", nice=0):
+        self.name = name
+        self.nice = nice
+        self.max_workers = max(1, int(max_workers))
+        self.queue_limit = max(self.max_workers, int(queue_limit))
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix=name,
+            initializer=_set_thread_nice,
+            initargs=(nice,),
+        )
+        self._lock = threading.Lock()
+        self._waits_ms = deque(maxlen=WAIT_SAMPLES)
+        self._wait_total_ms = 0.0
+        self._wait_max_ms = 0.0
+        self._pending = 0
+        self._active = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._max_depth = 0
+
+    async def run(self, fn, *args, **kwargs):
+        """fn(*args, **kwargs)를 풀에서 실행하고 결과를 await"""
+        with self._lock:
+            depth = self._pending + self._active
+            if depth >= self.queue_limit:
+                self._rejected += 1
+                raise ExecutorBusyError(f"{self.name} 작업 대기열이 가득 찼습니다. ({depth}/{self.queue_limit})")
+            self._pending += 1
+            self._max_depth = max(self._max_depth, depth + 1)
+
+        loop = asyncio.get_running_loop()
+        job = {"submitted": time.perf_counter(), "started": False, "abandoned": False}
+        try:
+            return await loop.run_in_executor(self._pool, self._execute, job, fn, args, kwargs)
+        finally:
+            # 대기 중에 호출자가 취소되면(클라이언트 연결 끊김 등) _execute가 실행되지 않으므로 여기서 슬롯 반환
+            with self._lock:
+                if not job["started"]:
+                    job["abandoned"] = True
+                    self._pending -= 1
+
+    def _execute(self, job, fn, args, kwargs):
+        wait_ms = (time.perf_counter() - job["submitted"]) * 1000
+        with self._lock:
+            if job["abandoned"]:  # 취소된 호출 — 슬롯은 이미 반환됨, 실행하지 않음
+                return None
+            job["started"] = True
+            self._pending -= 1
+            self._active += 1
+            self._waits_ms.append(wait_ms)
+            self._wait_total_ms += wait_ms
+            self._wait_max_ms = max(self._wait_max_ms, wait_ms)
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException:
+            with self._lock:
+                self._active -= 1
+                self._failed += 1
+            raise
+        with self._lock:
+            self._active -= 1
+            self._completed += 1
+        return result
+
+    def stats(self):
+        with self._lock:
+            waits = sorted(self._waits_ms)
+            started = self._completed + self._failed + self._active
+            return {
+                "workers": self.max_workers,
+                "nice": self.nice,
+                "queue_limit": self.queue_limit,
+                "pending": self._pending,
+                "active": self._active,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "max_depth": self._max_depth,
+                "wait_ms": {
+                    "mean": self._wait_total_ms / started if started else 0.0,
+                    "p50": _percentile(waits, 50),
+                    "p95": _percentile(waits, 95),
+                    "max": self._wait_max_ms,
+                },
+            }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
+
+
+# ==========================================================
+# ✅ 프로세스 전역 실행기 (작업 클래스별)
+# ==========================================================
+executors = {
+    name: InferenceExecutor(cfg["workers"], cfg["queue_limit"], name=name, nice=cfg["nice"])
+    for name, cfg in WORKER_CLASSES.items()
+}
+detect_executor = executors["detect"]
+restore_executor = executors["restore"]
+
+
+def executor_stats():
+    return {name: executor.stats() for name, executor in executors.items()}
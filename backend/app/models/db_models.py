@@ -1,7 +1,7 @@
 # Path: backend/app/models/db_models.py
-# Desc: 업로드 이미지 정보 저장 (파일명, 결과, 업로드 시각, 삭제 로그 포함)
+# Desc: 업로드 이미지 정보 저장 (파일명, 결과 + 신뢰도 + 모델, 업로드 시각, 삭제 로그 포함)
 
-from sqlalchemy import Column, Integer, String, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Float
 from datetime import datetime
 from backend.app.core.database import Base
 
@@ -13,6 +13,8 @@ class Upload(Base):
     original_name = Column(String(255))                    # 사용자가 업로드한 원본 파일명
     file_ext = Column(String(10))                          # 파일 확장자 (jpg, png 등)
     result = Column(String(50))                            # 딥페이크 탐지 결과
+    confidence = Column(Float, nullable=True)              # 🆕 Fake 신뢰도 (%)
+    model_type = Column(String(20), nullable=True)         # 🆕 분석에 사용한 모델 (korean / foriegn)
     uploaded_at = Column(DateTime, default=datetime.utcnow)
 
     # 🆕 삭제 관련 필드 (soft delete)
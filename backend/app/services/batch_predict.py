@@ -0,0 +1,222 @@
+# Path: backend/app/services/batch_predict.py
+# Desc: /api/predict/batch 다중 이미지 / zip 수신 + 미니 배치 탐지 + NDJSON 스트리밍
+
+import io
+import os
+import json
+import time
+import shutil
+import zipfile
+import tempfile
+from pathlib import Path
+
+from fastapi import HTTPException
+
+from backend.app.services.detect_service import predict_chunk, resolve_model_type, run_batch_job
+from backend.app.services.ingest import (
+    ARCHIVE_MAGIC_BYTES,
+    INGEST_MEMORY_LIMIT,
+    MAGIC_BYTES,
+    MAX_UPLOAD_BYTES,
+    check_image_header,
+    ingest_upload,
+    sniff_image_type,
+)
+from backend.app.services.result_cache import content_hash
+
+# ==========================================================
+# ✅ 설정 (환경변수로 조정 가능)
+# ==========================================================
+BASE_DIR = Path(__file__).resolve().parents[3]  # 프로젝트 루트
+BATCH_SPOOL_DIR = BASE_DIR / "data" / "cache" / "batch"
+
+BATCH_PREDICT_SIZE = int(os.getenv("BATCH_PREDICT_SIZE", "16"))                              # 미니 배치 크기 (forward 1회)
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "500"))                                   # 요청당 최대 이미지 수
+BATCH_MAX_ARCHIVE_BYTES = int(os.getenv("BATCH_MAX_ARCHIVE_BYTES", str(200 * 1024 * 1024)))  # zip 최대 크기
+BATCH_MAX_REQUEST_BYTES = int(os.getenv("BATCH_MAX_REQUEST_BYTES", str(BATCH_MAX_ARCHIVE_BYTES)))  # 요청 본문 최대 크기 (파일 합계)
+BATCH_MEMORY_BUDGET = int(os.getenv("BATCH_MEMORY_BUDGET", str(64 * 1024 * 1024)))           # 요청당 메모리 보관 총량, 초과분은 디스크로
+
+
+class BatchJob:
+    """
+    수신이 끝난 배치 요청.
+    items: (파일명, 로더) 목록 — 로더는 실행기 스레드에서 (바이트 또는 경로, SHA-256)을 반환
+    업로드 원본은 응답 스트림이 끝나면 close()로 정리 (보관하지 않음)
+    """
+
+    def __init__(self, model_type, spool_dir):
+        self.model_type = model_type
+        self.spool_dir = Path(spool_dir)
+        self.items = []
+        self.archive = None
+
+    def close(self):
+        if self.archive is not None:
+            self.archive.close()
+            self.archive = None
+        shutil.rmtree(self.spool_dir, ignore_errors=True)
+
+
+async def receive_batch(files, model_type: str) -> BatchJob:
+    """
+    여러 이미지 또는 zip 1개를 수신해 BatchJob 생성 (형식 / 크기 / 개수 검사는 스트리밍 전에 끝냄)
+    - 이미지: 파일마다 ingest_upload (BATCH_MEMORY_BUDGET까지 메모리, 이후 디스크)
+    - zip: 파일 1개일 때만 허용, 멤버는 스트리밍 중 미니 배치 단위로 압축 해제
+    """
+    try:
+        model_type = resolve_model_type(model_type)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not files:
+        raise HTTPException(status_code=400, detail="파일이 없습니다.")
+    if len(files) > BATCH_MAX_FILES:
+        raise HTTPException(status_code=413, detail=f"한 번에 최대 {BATCH_MAX_FILES}개까지 가능합니다.")
+
+    BATCH_SPOOL_DIR.mkdir(parents=True, exist_ok=True)
+    job = BatchJob(model_type, tempfile.mkdtemp(prefix="batch_", dir=BATCH_SPOOL_DIR))
+    try:
+        if len(files) == 1:
+            upload = await ingest_upload(
+                files[0],
+                job.spool_dir / "0",
+                max_bytes=BATCH_MAX_ARCHIVE_BYTES,
+                magic_bytes={**MAGIC_BYTES, **ARCHIVE_MAGIC_BYTES},
+            )
+            if upload.kind == "zip":
+                _open_archive(job, upload)
+                return job
+            if upload.size > MAX_UPLOAD_BYTES:
+                raise HTTPException(status_code=413, detail=f"파일이 너무 큽니다. (최대 {MAX_UPLOAD_BYTES // (1024 * 1024)}MB)")
+            job.items.append((files[0].filename, _uploaded(upload)))
+            return job
+
+        in_memory = 0
+        for index, file in enumerate(files):
+            memory_limit = INGEST_MEMORY_LIMIT if in_memory < BATCH_MEMORY_BUDGET else 0
+            upload = await ingest_upload(file, job.spool_dir / str(index), memory_limit=memory_limit)
+            if not upload.on_disk:
+                in_memory += upload.size
+            job.items.append((file.filename, _uploaded(upload)))
+        return job
+    except BaseException:
+        job.close()
+        raise
+
+
+def _uploaded(upload):
+    return lambda: (upload.source, upload.digest)
+
+
+def _open_archive(job, upload):
+    """zip 멤버 목록 작성 (디렉터리 / macOS 메타데이터 / 숨김 파일 제외)"""
+    try:
+        job.archive = zipfile.ZipFile(upload.path if upload.on_disk else io.BytesIO(upload.data))
+    except zipfile.BadZipFile:
+        raise HTTPException(status_code=400, detail="zip 파일을 읽을 수 없습니다.")
+
+    members = [
+        info for info in job.archive.infolist()
+        if not info.is_dir()
+        and not info.filename.startswith("__MACOSX/")
+        and not os.path.basename(info.filename).startswith(".")
+    ]
+    if not members:
+        raise HTTPException(status_code=400, detail="zip 안에 이미지가 없습니다.")
+    if len(members) > BATCH_MAX_FILES:
+        raise HTTPException(status_code=413, detail=f"한 번에 최대 {BATCH_MAX_FILES}개까지 가능합니다.")
+    for info in members:
+        job.items.append((info.filename, _member_loader(job.archive, info)))
+
+
+def _member_loader(archive, info):
+    def load():
+        # 헤더의 크기를 믿지 않고 한도 + 1바이트까지만 읽어 압축 폭탄 차단
+        if info.file_size > MAX_UPLOAD_BYTES:
+            raise ValueError(f"파일이 너무 큽니다. (최대 {MAX_UPLOAD_BYTES // (1024 * 1024)}MB)")
+        with archive.open(info) as member:
+            data = member.read(MAX_UPLOAD_BYTES + 1)
+        if len(data) > MAX_UPLOAD_BYTES:
+            raise ValueError(f"파일이 너무 큽니다. (최대 {MAX_UPLOAD_BYTES // (1024 * 1024)}MB)")
+        if sniff_image_type(data) is None:
+            raise ValueError("지원하지 않는 파일 형식입니다. (JPEG / PNG만 가능)")
+        check_image_header(data)
+        return data, content_hash(data)
+    return load
+
+
+def _load_chunk(loaders):
+    """미니 배치의 입력 준비 (zip 압축 해제 + 해시) — 실패한 항목은 오류 메시지 문자열"""
+    loaded = []
+    for load in loaders:
+        try:
+            loaded.append(load())
+        except HTTPException as e:
+            loaded.append(str(e.detail))
+        except Exception as e:
+            loaded.append(str(e))
+    return loaded
+
+
+def _line(index, filename, result, gradcam):
+    if "error" in result:
+        return {"index": index, "filename": filename, "error": result["error"]}
+    line = {
+        "index": index,
+        "filename": filename,
+        "pred_label": result["pred_label"],
+        "confidence": result["confidence"],
+        "fake_probability": result["fake_probability"],
+    }
+    if gradcam:
+        line["gradcam"] = result["gradcam"]
+    return line
+
+
+async def stream_batch(job: BatchJob, gradcam: bool = False):
+    """
+    BATCH_PREDICT_SIZE개씩 판정하며 미니 배치가 끝날 때마다 NDJSON 줄(파일당 1줄)을 내보낸다.
+    마지막 줄은 {"summary": {...}}. 스트림이 끝나거나 끊기면 업로드 원본 정리.
+    """
+    started = time.perf_counter()
+    counts = {"Real": 0, "Fake": 0, "error": 0}
+    try:
+        for start in range(0, len(job.items), BATCH_PREDICT_SIZE):
+            chunk = job.items[start:start + BATCH_PREDICT_SIZE]
+            try:
+                loaded = await run_batch_job(_load_chunk, [load for _, load in chunk])
+            except Exception as e:
+                loaded = [str(e)] * len(chunk)
+
+            results = [{"error": item} if isinstance(item, str) else None for item in loaded]
+            ready = [i for i, item in enumerate(loaded) if not isinstance(item, str)]
+            if ready:
+                try:
+                    predicted = await predict_chunk(
+                        [loaded[i][0] for i in ready],
+                        job.model_type,
+                        digests=[loaded[i][1] for i in ready],
+                        gradcam=gradcam,
+                    )
+                except Exception as e:
+                    print(f"❌ [BATCH PREDICT ERROR] {start}~{start + len(chunk) - 1}: {e}")
+                    predicted = [{"error": f"예측 중 오류 발생: {str(e)}"}] * len(ready)
+                for i, result in zip(ready, predicted):
+                    results[i] = result
+
+            lines = []
+            for offset, ((filename, _), result) in enumerate(zip(chunk, results)):
+                counts[result.get("pred_label", "error")] += 1
+                lines.append(json.dumps(_line(start + offset, filename, result, gradcam), ensure_ascii=False))
+            yield "\n".join(lines) + "\n"
+
+        summary = {
+            "total": len(job.items),
+            "real": counts["Real"],
+            "fake": counts["Fake"],
+            "errors": counts["error"],
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+        print(f"📤 [BATCH RESULT] {summary}")
+        yield json.dumps({"summary": summary}) + "\n"
+    finally:
+        job.close()
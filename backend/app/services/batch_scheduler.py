@@ -0,0 +1,90 @@
+# Path: backend/app/services/batch_scheduler.py
+# Desc: /api/predict 동적 마이크로 배칭 스케줄러 (model_type별 요청 수집 → 1회 배치 forward → 결과 분배)
+
+import os
+import asyncio
+
+# ==========================================================
+# ✅ 배칭 설정 (환경변수로 조정 가능)
+# ==========================================================
+PREDICT_MAX_BATCH = int(os.getenv("PREDICT_MAX_BATCH", "8"))          # 배치 최대 이미지 수
+PREDICT_MAX_WAIT_MS = float(os.getenv("PREDICT_MAX_WAIT_MS", "5"))    # 첫 요청 후 최대 대기 시간(ms)
+
+
+class MicroBatchScheduler:
+    """
+    동시에 들어온 요청을 키(model_type)별로 모아 한 번에 처리하는 스케줄러.
+
+    - 키별 asyncio.Queue + 워커 태스크 1개
+    - 첫 요청 도착 후 max_wait_ms 동안(또는 max_batch_size가 찰 때까지) 요청을 모은다
+    - batch_fn(key, items) -> results 는 runner(추론 실행기)에서 실행되어 이벤트 루프를 막지 않으며,
+      결과는 items 순서대로 각 요청의 future에 전달된다
+    """
+
+    def __init__(self, batch_fn, max_batch_size=PREDICT_MAX_BATCH, max_wait_ms=PREDICT_MAX_WAIT_MS, runner=None):
+        self.batch_fn = batch_fn
+        self.runner = runner  # async runner(fn, *args) — None이면 asyncio 기본 스레드 풀
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000
+        self._queues = {}
+        self._workers = {}
+
+    async def submit(self, key, item):
+        """item을 key의 배치 큐에 넣고 해당 결과가 나올 때까지 대기"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        await self._queue_for(key).put((item, future))
+        return await future
+
+    def _queue_for(self, key):
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = asyncio.Queue()
+            self._workers[key] = asyncio.create_task(self._worker(key, queue))
+        return queue
+
+    async def _collect(self, queue):
+        loop = asyncio.get_running_loop()
+        batch = [await queue.get()]
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        # 대기 중 취소된 요청(클라이언트 연결 끊김 등)은 제외
+        return [(item, future) for item, future in batch if not future.cancelled()]
+
+    async def _run_batch(self, key, items):
+        if self.runner is not None:
+            return await self.runner(self.batch_fn, key, items)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.batch_fn, key, items)
+
+    async def _worker(self, key, queue):
+        while True:
+            batch = await self._collect(queue)
+            if not batch:
+                continue
+
+            items = [item for item, _ in batch]
+            try:
+                results = list(await self._run_batch(key, items))
+                if len(results) != len(batch):
+                    # zip으로 잘리면 남은 요청이 영원히 대기 → 배치 전체를 실패 처리
+                    raise RuntimeError(f"배치 결과 수가 요청 수와 다릅니다. (요청 {len(batch)}개, 결과 {len(results)}개)")
+            except Exception as e:
+                print(f"❌ [BATCH ERROR] {key} (batch={len(items)}): {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
@@ -4,6 +4,10 @@
 import base64
 import sys
 import os
+import time
+import uuid
+import asyncio
+from datetime import datetime
 from pathlib import Path
 from PIL import Image
 
@@ -12,36 +16,270 @@ AI_DIR = BASE_DIR / "ai"
 if str(AI_DIR) not in sys.path:
     sys.path.append(str(AI_DIR))
 
-from modules.Deepfake_Evaluation_MobileNet_v3_final_application_number_option import analyze_image_with_model_type
+from modules.Deepfake_Evaluation_MobileNet_v3_final_application_number_option import (
+    analyze_image_with_model_type,
+    analyze_loaded,
+    classify_batch,
+    explain_batch,
+    load_input,
+)
+from modules.model_registry import CLASS_NAMES, registry as model_registry, resolve_model_type
+from backend.app.core.executor import ExecutorBusyError, detect_executor
+from backend.app.services.batch_scheduler import MicroBatchScheduler
+from backend.app.services.result_cache import result_cache
+from backend.app.services.phash_index import PHASH_REUSE_DISTANCE, get_phash_index, phash
 
+# ✅ /api/predict 동시 요청을 model_type별로 묶어 1회 forward(+ Grad-CAM)로 처리
+#    배치 추론은 추론 실행기(스레드 풀)에서 실행되어 이벤트 루프를 막지 않음
+batch_scheduler = MicroBatchScheduler(explain_batch, runner=detect_executor.run)
 
-def predict_fake(image_path: str, model_type: str = "korean") -> dict:
+# ✅ 근사 중복 확인용 분류 전용 배치 (forward 1회, Grad-CAM / 오버레이 없음)
+confirm_scheduler = MicroBatchScheduler(classify_batch, runner=detect_executor.run)
+
+# ✅ /api/predict/batch 작업은 대기열이 차면 거절 대신 잠시 양보 후 재시도 (단건 요청 우선)
+BATCH_BUSY_RETRY_MS = float(os.getenv("BATCH_BUSY_RETRY_MS", "50"))
+BATCH_BUSY_TIMEOUT_S = float(os.getenv("BATCH_BUSY_TIMEOUT_S", "30"))
+
+
+def predict_fake(image, model_type: str = "korean") -> dict:
     """
     Grad-CAM 기반 딥페이크 예측 함수 (시각화 이미지 + 활성도 반환)
+    image: 이미지 경로 또는 업로드 바이트 / 디코딩된 RGB 배열
+           (메모리 입력이면 업로드·Grad-CAM 파일을 쓰거나 다시 읽지 않음)
     """
     try:
-        pred_label, confidence, report, gradcam_path, fake_intensity = analyze_image_with_model_type(
-            path=image_path,
+        in_memory = not _is_path(image)
+        analysis = analyze_image_with_model_type(
+            path=image,
             model_type=model_type,
             visualize=True,
+            in_memory=in_memory,
         )
+        return _build_result(None if in_memory else str(image), analysis)
+
+    except Exception as e:
+        print(f"❌ [PREDICT ERROR]: {e}")
+        return {"error": f"예측 중 오류 발생: {str(e)}"}
+
+
+async def predict_fake_batched(image, model_type: str = "korean", digest: str = None, image_path: str = None) -> dict:
+    """
+    predict_fake의 마이크로 배칭 버전 (/api/predict 용)
+    분류 + Grad-CAM forward는 같은 model_type의 동시 요청과 묶여 한 번에 실행된다.
+    image가 바이트 / 배열이면 메모리 모드 (image_path는 결과에 기록할 저장 예정 경로).
+    digest(업로드 바이트 SHA-256)가 주어지면
+      1) 결과 캐시(같은 바이트)를 먼저 조회하고
+      2) 디코딩 후 pHash 인덱스로 리사이즈/재압축된 근사 중복을 찾아 이전 결과를 재사용한다.
+    """
+    try:
+        model_type = resolve_model_type(model_type)
+        in_memory = not _is_path(image)
+        if image_path is None and not in_memory:
+            image_path = str(image)
+
+        cache_key = None
+        version = None
+        if digest:
+            version = model_registry.version(model_type)
+            cache_key = result_cache.make_key(digest, model_type, version)
+            cached = result_cache.get_memory(cache_key) or await detect_executor.run(result_cache.get_disk, cache_key)
+            if cached is not None:
+                cached["image_path"] = image_path
+                return cached
 
-        # ✅ Grad-CAM 이미지 base64 변환
-        gradcam_b64 = None
-        if gradcam_path and os.path.exists(gradcam_path):
-            with open(gradcam_path, "rb") as f:
-                gradcam_b64 = base64.b64encode(f.read()).decode("utf-8")
-
-        # ✅ 결과 반환
-        return {
-            "pred_label": pred_label,
-            "confidence": round(confidence, 2),
-            "report": report,
-            "gradcam": gradcam_b64,
-            "image_path": image_path,
-            "fake_probability": round(fake_intensity, 3) if fake_intensity else None,
-        }
+        pil_image, input_tensor = await detect_executor.run(load_input, image)
 
+        image_hash = None
+        if cache_key is not None and get_phash_index() is not None:
+            image_hash = await detect_executor.run(phash, pil_image)
+            reused = await _reuse_near_duplicate(image_hash, image_path, input_tensor, model_type, version)
+            if reused is not None:
+                return reused
+
+        confidence, cam = await batch_scheduler.submit(model_type, input_tensor)
+
+        # 오버레이 합성 / PNG 인코딩(또는 저장) / base64 / 캐시·인덱스 저장도 이벤트 루프 밖에서 수행
+        return await detect_executor.run(
+            _finish, image_path, pil_image, confidence, cam, cache_key, image_hash, in_memory
+        )
+
+    except ExecutorBusyError:
+        raise
     except Exception as e:
         print(f"❌ [PREDICT ERROR]: {e}")
         return {"error": f"예측 중 오류 발생: {str(e)}"}
+
+
+async def _reuse_near_duplicate(image_hash, image_path, input_tensor, model_type, version):
+    """
+    pHash 근사 중복이면 이전 판정 반환 (없거나 확인 실패 시 None → 전체 파이프라인 실행)
+    - 거리 <= PHASH_REUSE_DISTANCE: 이전 판정 그대로 재사용
+    - 그보다 멀면 분류 forward 1회로 판정이 같은지 확인한 뒤 재사용
+    - 판정(라벨 / 신뢰도 / 리포트)만 재사용: 이전 업로드의 Grad-CAM과 CAM 강도는 crop / 리사이즈된
+      이번 이미지와 위치가 맞지 않으므로 제외 (gradcam=None, near_duplicate.verdict_only=True)
+    """
+    match = get_phash_index().lookup(image_hash, model_type, version)
+    if match is None:
+        return None
+
+    prior_key = result_cache.make_key(match.digest, model_type, version)
+    prior = result_cache.get_memory(prior_key) or await detect_executor.run(result_cache.get_disk, prior_key)
+    if prior is None:
+        return None
+
+    confirmed = False
+    if match.distance > PHASH_REUSE_DISTANCE:
+        probs = await confirm_scheduler.submit(model_type, input_tensor)
+        pred_label = CLASS_NAMES[int(probs.argmax())]
+        if pred_label != match.pred_label:
+            return None
+        confirmed = True
+
+    print(f"♻️ [PREDICT] 근사 중복 재사용 (거리 {match.distance}, 확인 {confirmed})")
+    prior["image_path"] = image_path
+    prior["gradcam"] = None
+    prior["fake_probability"] = None
+    prior["near_duplicate"] = {"distance": match.distance, "confirmed": confirmed, "verdict_only": True}
+    return prior
+
+
+async def run_batch_job(fn, *args):
+    """
+    배치 작업을 추론 실행기에서 실행.
+    대기열이 가득 차 있으면 BATCH_BUSY_RETRY_MS 간격으로 재시도하고, BATCH_BUSY_TIMEOUT_S를 넘기면 ExecutorBusyError
+    """
+    deadline = time.monotonic() + BATCH_BUSY_TIMEOUT_S
+    while True:
+        try:
+            return await detect_executor.run(fn, *args)
+        except ExecutorBusyError:
+            if time.monotonic() >= deadline:
+                raise
+            await asyncio.sleep(BATCH_BUSY_RETRY_MS / 1000)
+
+
+async def predict_chunk(images, model_type: str = "korean", digests=None, gradcam: bool = False) -> list:
+    """
+    /api/predict/batch 미니 배치 1개 처리 — 이미지 목록(바이트 / 경로)을 forward 1회로 판정.
+    - digests가 주어지면 결과 캐시를 먼저 조회하고, 적중한 항목은 forward에서 제외
+    - gradcam=False면 분류만 수행 (CAM / 오버레이 / PNG 인코딩 생략, 결과의 gradcam은 None)
+    - 디코딩 실패는 해당 항목만 {"error": ...}
+    반환: 입력 순서대로 결과 dict 목록 (image_path는 None — 배치 입력은 보관하지 않음)
+    """
+    model_type = resolve_model_type(model_type)
+    digests = digests or [None] * len(images)
+    version = model_registry.version(model_type)
+    keys = [result_cache.make_key(digest, model_type, version) if digest else None for digest in digests]
+    results = [None] * len(images)
+
+    # 1) 결과 캐시 (메모리 → 디스크는 한 번의 작업으로)
+    missed = []
+    for i, key in enumerate(keys):
+        cached = result_cache.get_memory(key) if key is not None else None
+        if cached is not None:
+            results[i] = cached
+        elif key is not None:
+            missed.append(i)
+    if missed:
+        for i, cached in zip(missed, await run_batch_job(_get_disk_many, [keys[i] for i in missed])):
+            results[i] = cached
+    for result in results:
+        if result is not None:
+            result["image_path"] = None
+            if not gradcam:
+                result["gradcam"] = None
+
+    # 2) 디코딩 (분류만 하면 224px 축소 디코딩)
+    pending = [i for i, result in enumerate(results) if result is None]
+    if not pending:
+        return results
+    decoded = await run_batch_job(_decode_many, [images[i] for i in pending], gradcam)
+    for i, item in zip(pending, decoded):
+        if isinstance(item, str):
+            results[i] = {"error": f"이미지 디코딩 실패: {item}"}
+    pending = [(i, item) for i, item in zip(pending, decoded) if not isinstance(item, str)]
+    if not pending:
+        return results
+
+    # 3) 미니 배치 forward 1회 (+ Grad-CAM)
+    tensors = [input_tensor for _, (_, input_tensor) in pending]
+    if gradcam:
+        outputs = await run_batch_job(explain_batch, model_type, tensors)
+    else:
+        outputs = [(probs, None) for probs in await run_batch_job(classify_batch, model_type, tensors)]
+
+    # 4) 라벨 / 오버레이 / PNG 인코딩 — Grad-CAM 결과만 캐시 (캐시는 /api/predict와 공유)
+    entries = [
+        (image, confidence, cam, keys[i] if gradcam else None)
+        for (i, (image, _)), (confidence, cam) in zip(pending, outputs)
+    ]
+    for (i, _), result in zip(pending, await run_batch_job(_finish_many, entries)):
+        results[i] = result
+    return results
+
+
+def _get_disk_many(keys):
+    return [result_cache.get_disk(key) for key in keys]
+
+
+def _decode_many(images, visualize):
+    decoded = []
+    for image in images:
+        try:
+            decoded.append(load_input(image, visualize))
+        except Exception as e:
+            decoded.append(str(e))
+    return decoded
+
+
+def _finish_many(entries):
+    return [
+        _finish(None, image, confidence, cam, cache_key, in_memory=True)
+        for image, confidence, cam, cache_key in entries
+    ]
+
+
+def _finish(image_path, image, confidence, cam, cache_key=None, image_hash=None, in_memory=False):
+    result = _build_result(image_path, analyze_loaded(image, confidence, cam, in_memory=in_memory))
+    if cache_key is not None and "error" not in result:
+        result_cache.put(cache_key, result)
+        if image_hash is not None:
+            digest, model_type, version = cache_key
+            get_phash_index().add(image_hash, model_type, version, digest, result["pred_label"])
+    return result
+
+
+def _is_path(image):
+    return isinstance(image, (str, Path))
+
+
+def _build_result(image_path, analysis):
+    pred_label, confidence, report, gradcam, fake_intensity = analysis
+
+    # ✅ Grad-CAM 이미지 base64 변환 (메모리 모드는 PNG 바이트를 바로 인코딩)
+    gradcam_b64 = None
+    if isinstance(gradcam, bytes):
+        gradcam_b64 = base64.b64encode(gradcam).decode("utf-8")
+    elif gradcam and os.path.exists(gradcam):
+        with open(gradcam, "rb") as f:
+            gradcam_b64 = base64.b64encode(f.read()).decode("utf-8")
+
+    # ✅ 결과 반환
+    return {
+        "pred_label": pred_label,
+        "confidence": round(confidence, 2),
+        "report": report,
+        "gradcam": gradcam_b64,
+        "image_path": image_path,
+        "fake_probability": round(fake_intensity, 3) if fake_intensity else None,
+    }
+
+
+def persist_gradcam(gradcam_b64: str, save_dir: str = os.path.join("ai", "gradcam_results")) -> str:
+    """메모리 모드 결과의 Grad-CAM PNG를 파일로 보관 (응답 이후 백그라운드 작업으로 실행)"""
+    os.makedirs(save_dir, exist_ok=True)
+    timestamp = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+    gradcam_path = os.path.join(save_dir, f"gradcam_{timestamp}.png")
+    with open(gradcam_path, "wb") as f:
+        f.write(base64.b64decode(gradcam_b64))
+    return gradcam_path
@@ -0,0 +1,183 @@
+# Path: backend/app/services/ingest.py
+# Desc: 업로드 스트리밍 수신 계층 (청크 단위 수신 + SHA-256 + 크기 제한 + 매직 바이트 검사 + 압축 폭탄 방지)
+
+import os
+import io
+import hashlib
+import warnings
+from pathlib import Path
+
+from fastapi import UploadFile, HTTPException
+from PIL import Image
+from starlette.concurrency import run_in_threadpool
+
+# ==========================================================
+# ✅ 설정 (환경변수로 조정 가능)
+# ==========================================================
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))       # 파일당 최대 크기 (요청 본문은 BodySizeLimitMiddleware가 먼저 제한)
+INGEST_MEMORY_LIMIT = int(os.getenv("INGEST_MEMORY_LIMIT", str(4 * 1024 * 1024)))  # 이 크기까지는 메모리, 넘으면 디스크로
+MAX_IMAGE_PIXELS = int(os.getenv("MAX_IMAGE_PIXELS", str(64_000_000)))             # 디코딩 허용 최대 픽셀 수
+INGEST_CHUNK_SIZE = 256 * 1024
+
+# PIL 전역 한도도 같은 값으로 (다른 경로에서 디코딩해도 2배 초과 시 DecompressionBombError)
+Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+
+# 파일 시그니처 → 형식 (허용 형식: JPEG / PNG)
+MAGIC_BYTES = {
+    b"\xff\xd8\xff": "jpeg",
+    b"\x89PNG\r\n\x1a\n": "png",
+}
+IMAGE_KINDS = set(MAGIC_BYTES.values())
+
+# 배치 업로드용 압축 파일 시그니처 (/api/predict/batch)
+ARCHIVE_MAGIC_BYTES = {
+    b"PK\x03\x04": "zip",
+}
+
+
+def sniff_image_type(head: bytes, magic_bytes=MAGIC_BYTES):
+    """파일 앞부분의 매직 바이트로 형식 판별 (허용 형식이 아니면 None)"""
+    for magic, kind in magic_bytes.items():
+        if head.startswith(magic):
+            return kind
+    return None
+
+
+class IngestedUpload:
+    """
+    수신이 끝난 업로드.
+    - 작은 파일은 data(bytes)로 메모리에 보관하고 path는 None
+    - memory_limit을 넘은 파일은 수신 중에 spill_path로 옮겨 쓰고 data는 None
+    source는 탐지 함수에 바로 넘길 수 있는 값 (바이트 또는 경로)
+    """
+
+    def __init__(self, spill_path, data, path, digest, size, kind):
+        self.spill_path = Path(spill_path)
+        self.data = data
+        self.path = path
+        self.digest = digest
+        self.size = size
+        self.kind = kind
+
+    @property
+    def source(self):
+        return self.data if self.data is not None else str(self.path)
+
+    @property
+    def on_disk(self):
+        return self.path is not None
+
+    def persist(self):
+        """메모리에만 있는 업로드를 spill_path에 저장 (백그라운드 작업 / 스레드에서 호출)"""
+        if self.path is None:
+            self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+            self.spill_path.write_bytes(self.data)
+            self.path = self.spill_path
+        return self.path
+
+    def discard(self):
+        """디스크로 옮겨 쓴 파일 삭제 (보관하지 않는 경우)"""
+        if self.path is not None:
+            Path(self.path).unlink(missing_ok=True)
+
+
+def check_image_header(source):
+    """
+    픽셀 디코딩 없이 헤더만 읽어 해상도 확인 — 압축 폭탄(작은 파일, 거대한 해상도) 차단.
+    source: 바이트 또는 경로
+    """
+    fp = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", Image.DecompressionBombWarning)
+            with Image.open(fp) as image:
+                width, height = image.size
+    except (Image.DecompressionBombWarning, Image.DecompressionBombError):
+        raise HTTPException(status_code=413, detail=f"이미지 해상도가 너무 큽니다. (최대 {MAX_IMAGE_PIXELS} 픽셀)")
+    except Exception:
+        raise HTTPException(status_code=415, detail="이미지 파일을 읽을 수 없습니다.")
+    if width * height > MAX_IMAGE_PIXELS:
+        raise HTTPException(status_code=413, detail=f"이미지 해상도가 너무 큽니다. ({width}x{height})")
+    return width, height
+
+
+async def ingest_upload(
+    file: UploadFile,
+    spill_path,
+    max_bytes: int = MAX_UPLOAD_BYTES,
+    memory_limit: int = INGEST_MEMORY_LIMIT,
+    magic_bytes=MAGIC_BYTES,
+) -> IngestedUpload:
+    """
+    UploadFile을 청크 단위로 수신하면서
+      - 첫 청크의 매직 바이트로 JPEG / PNG가 아니면 즉시 415
+      - SHA-256을 함께 계산
+      - 누적 크기가 max_bytes를 넘는 순간 413 (이미 쓴 파일 삭제)
+      - memory_limit을 넘으면 그때부터 spill_path로 이어 쓰기 (디스크 쓰기는 스레드에서)
+    수신 후 헤더로 해상도를 확인해 압축 폭탄을 차단한다. (이미지 형식일 때만)
+    magic_bytes: 허용할 시그니처 → 형식 (기본: JPEG / PNG, 배치 업로드는 zip 추가)
+    ※ UploadFile은 핸들러 호출 전에 Starlette가 본문 전체를 SpooledTemporaryFile로 받아 둔 상태
+      → 여기서의 413은 파일별 검사이고, 본문 크기 초과는 BodySizeLimitMiddleware가 수신 전 / 수신 중에 차단
+      → 스풀 파일에서 청크로 옮기므로 파일 바이트 전체를 다시 메모리에 올리지는 않음
+    """
+    spill_path = Path(spill_path)
+    sha256 = hashlib.sha256()
+    buffer = bytearray()
+    out = None
+    size = 0
+    kind = None
+
+    try:
+        while True:
+            chunk = await file.read(INGEST_CHUNK_SIZE)
+            if not chunk:
+                break
+
+            if kind is None:
+                kind = sniff_image_type(chunk, magic_bytes)
+                if kind is None:
+                    allowed = " / ".join(sorted(set(magic_bytes.values()))).upper()
+                    raise HTTPException(status_code=415, detail=f"지원하지 않는 파일 형식입니다. ({allowed}만 가능)")
+
+            size += len(chunk)
+            if size > max_bytes:
+                raise HTTPException(status_code=413, detail=f"파일이 너무 큽니다. (최대 {max_bytes // (1024 * 1024)}MB)")
+            sha256.update(chunk)
+
+            if out is None and size > memory_limit:
+                spill_path.parent.mkdir(parents=True, exist_ok=True)
+                out = open(spill_path, "wb")
+                await run_in_threadpool(out.write, bytes(buffer))
+                buffer = None
+            if out is not None:
+                await run_in_threadpool(out.write, chunk)
+            else:
+                buffer.extend(chunk)
+
+        if kind is None:
+            raise HTTPException(status_code=400, detail="빈 파일입니다.")
+    except BaseException:
+        if out is not None:
+            out.close()
+            spill_path.unlink(missing_ok=True)
+        raise
+
+    if out is not None:
+        out.close()
+
+    upload = IngestedUpload(
+        spill_path,
+        data=bytes(buffer) if out is None else None,
+        path=spill_path if out is not None else None,
+        digest=sha256.hexdigest(),
+        size=size,
+        kind=kind,
+    )
+    if kind not in IMAGE_KINDS:
+        return upload
+    try:
+        await run_in_threadpool(check_image_header, upload.source)
+    except HTTPException:
+        upload.discard()
+        raise
+    return upload
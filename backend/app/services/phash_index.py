@@ -0,0 +1,372 @@
+# Path: backend/app/services/phash_index.py
+# Desc: 지각 해시(pHash) 근사 중복 인덱스 (리사이즈/재압축/약한 crop 재업로드 → 이전 탐지 결과 재사용)
+
+# ✅ 1M 항목 조회 속도 확인 (루트에서 실행)
+# python -m backend.app.services.phash_index --entries 1000000
+
+import os
+import time
+import queue
+import random
+import sqlite3
+import argparse
+import threading
+from pathlib import Path
+from datetime import datetime
+from functools import lru_cache
+from itertools import combinations
+from collections import defaultdict, namedtuple
+
+import numpy as np
+
+# ==========================================================
+# ✅ 설정 (환경변수로 조정 가능)
+# ==========================================================
+BASE_DIR = Path(__file__).resolve().parents[3]  # 프로젝트 루트
+INDEX_PATH = BASE_DIR / "data" / "cache" / "phash_index.sqlite3"
+
+PHASH_INDEX = os.getenv("PHASH_INDEX", "1") == "1"                       # 근사 중복 인덱스 사용 여부
+PHASH_MAX_DISTANCE = int(os.getenv("PHASH_MAX_DISTANCE", "8"))          # 이 거리 이내면 근사 중복 후보
+PHASH_REUSE_DISTANCE = int(os.getenv("PHASH_REUSE_DISTANCE", "4"))      # 이 거리 이내면 확인 없이 결과 재사용
+
+HASH_BITS = 64
+CHUNKS = 4                      # multi-index hashing: 64비트 → 16비트 조각 4개
+CHUNK_BITS = HASH_BITS // CHUNKS
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+
+Match = namedtuple("Match", ["distance", "digest", "pred_label"])
+
+
+# ==========================================================
+# 1️⃣ pHash 계산
+# ==========================================================
+def phash(image) -> int:
+    """
+    PIL 이미지 → 64비트 pHash.
+    32x32 그레이스케일의 2D DCT 저주파 8x8(DC 제외 기준 중앙값)을 비트로 만든다.
+    리사이즈 / JPEG 재압축 / 약한 crop에는 거의 변하지 않는다.
+    """
+    import cv2
+
+    gray = np.asarray(image.convert("L").resize((32, 32)), dtype=np.float32)
+    low = cv2.dct(gray)[:8, :8].flatten()
+    bits = low > np.median(low[1:])
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+@lru_cache(maxsize=None)
+def _flip_masks(radius):
+    """CHUNK_BITS 비트 안에서 해밍 거리 radius 이하가 되는 XOR 마스크 배열"""
+    masks = [0]
+    for r in range(1, radius + 1):
+        for bits in combinations(range(CHUNK_BITS), r):
+            masks.append(sum(1 << b for b in bits))
+    return np.array(masks, dtype=np.uint16)
+
+
+_POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _popcount64(values):
+    if hasattr(np, "bitwise_count"):  # numpy >= 2.0
+        return np.bitwise_count(values)
+    return _POPCOUNT8[values.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+
+def _to_signed(value):
+    # SQLite INTEGER는 부호 있는 64비트
+    return value - (1 << HASH_BITS) if value >= 1 << (HASH_BITS - 1) else value
+
+
+def _to_unsigned(value):
+    return value + (1 << HASH_BITS) if value < 0 else value
+
+
+def _build_chunk_index(hashes):
+    """
+    조각별 (버킷 시작 오프셋, 원래 위치) 배열.
+    조각 값 v의 항목들은 order[offsets[v]:offsets[v + 1]] — 조회 시 탐색 없이 인덱싱만 한다.
+    """
+    index = []
+    for i in range(CHUNKS):
+        chunk = ((hashes >> np.uint64(i * CHUNK_BITS)) & np.uint64(CHUNK_MASK)).astype(np.uint16)
+        order = np.argsort(chunk, kind="stable")
+        offsets = np.zeros(CHUNK_MASK + 2, dtype=np.int64)
+        np.cumsum(np.bincount(chunk, minlength=CHUNK_MASK + 1), out=offsets[1:])
+        index.append((offsets, order.astype(np.int64)))
+    return index
+
+
+# ==========================================================
+# 2️⃣ multi-index hashing 테이블 (model_type + 모델 버전별 1개)
+# ==========================================================
+class _MultiIndexTable:
+    """
+    64비트 해시를 16비트 조각 4개로 나눠 조각 값별 버킷(정렬 + 오프셋)으로 둔다.
+    거리 d 이내의 해시는 비둘기집 원리로 최소 한 조각이 d // 4 이내 → 그 조각 값들의 범위만 후보로 모으면 누락 없음.
+    후보 거리 계산은 numpy로 한 번에 수행한다.
+
+    새 항목은 tail(리스트)에 쌓였다가 MERGE_THRESHOLD개가 되면 정렬 배열로 병합된다
+    (병합 배열은 락 밖에서 만들고 교체만 락 안에서 — 조회가 병합을 기다리지 않음).
+    """
+
+    MERGE_THRESHOLD = 1024
+
+    def __init__(self):
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.chunk_index = _build_chunk_index(self.hashes)
+        self.tail = []
+        self.entries = []
+        self.digests = set()
+        self.merging = False
+
+    def add(self, value, digest, pred_label):
+        if digest in self.digests:
+            return False
+        self.tail.append(value)
+        self.entries.append((digest, pred_label))
+        self.digests.add(digest)
+        return True
+
+    def merge_snapshot(self, force=False):
+        """병합이 필요하면 (기존 배열, 병합할 tail) 스냅샷 반환 — 락 안에서 호출"""
+        if self.merging or not self.tail or (len(self.tail) < self.MERGE_THRESHOLD and not force):
+            return None
+        self.merging = True
+        return self.hashes, list(self.tail)
+
+    def install(self, hashes, chunk_index, merged_count):
+        """락 밖에서 만든 병합 배열로 교체 — 락 안에서 호출"""
+        self.hashes = hashes
+        self.chunk_index = chunk_index
+        del self.tail[:merged_count]
+        self.merging = False
+
+    def nearest(self, value, max_distance):
+        best_distance, best_idx = max_distance + 1, None
+
+        if len(self.hashes):
+            masks = _flip_masks(max_distance // CHUNKS)
+            candidates = []
+            for i, (offsets, order) in enumerate(self.chunk_index):
+                probes = (np.uint16((value >> (i * CHUNK_BITS)) & CHUNK_MASK) ^ masks).astype(np.int64)
+                lo, hi = offsets[probes], offsets[probes + 1]
+                lengths = hi - lo
+                total = int(lengths.sum())
+                if total:
+                    # 여러 [lo, hi) 구간을 파이썬 루프 없이 이어 붙임
+                    starts = np.repeat(lo - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+                    candidates.append(order[starts + np.arange(total)])
+            if candidates:
+                idx = np.concatenate(candidates)
+                distances = _popcount64(self.hashes[idx] ^ np.uint64(value))
+                k = int(distances.argmin())
+                if distances[k] < best_distance:
+                    best_distance, best_idx = int(distances[k]), int(idx[k])
+
+        # 아직 병합되지 않은 최근 항목은 직접 비교
+        offset = len(self.hashes)
+        for j, tail_value in enumerate(self.tail):
+            distance = (tail_value ^ value).bit_count()
+            if distance < best_distance:
+                best_distance, best_idx = distance, offset + j
+
+        if best_idx is None:
+            return None
+        return Match(best_distance, *self.entries[best_idx])
+
+    def __len__(self):
+        return len(self.hashes) + len(self.tail)
+
+
+# ==========================================================
+# 3️⃣ 영속 인덱스 (SQLite + 메모리 테이블)
+# ==========================================================
+class PerceptualHashIndex:
+    """
+    업로드별 pHash → (원본 SHA-256, 판정) 인덱스.
+
+    - 조회는 메모리의 multi-index 테이블에서 수행 (1M 항목에서도 1ms 미만)
+    - 추가 항목은 전용 writer 스레드가 SQLite에 기록 → 재시작 시 다시 적재된다
+      (락 안에서는 메모리 테이블만 변경 — 이벤트 루프의 조회가 디스크 쓰기를 기다리지 않음)
+    - 키에 모델 버전이 포함되어 체크포인트 교체 후에는 이전 판정을 재사용하지 않음
+    - 전체 결과(Grad-CAM 포함)는 결과 캐시에 있고, 인덱스는 digest로 그 항목을 가리킨다
+    """
+
+    def __init__(self, db_path=INDEX_PATH, max_distance=PHASH_MAX_DISTANCE):
+        self.db_path = str(db_path)
+        self.max_distance = max_distance
+        self._tables = defaultdict(_MultiIndexTable)
+        self._lock = threading.Lock()
+        self._lookups = 0
+        self._matches = 0
+
+        if self.db_path != ":memory:":
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS phash_index ("
+            " phash INTEGER NOT NULL, model_type TEXT NOT NULL, version TEXT NOT NULL,"
+            " digest TEXT NOT NULL, pred_label TEXT, created_at TEXT,"
+            " UNIQUE (digest, model_type, version))"
+        )
+        self._conn.commit()
+        self._load()
+
+        # 적재 이후 연결은 writer 스레드만 사용
+        self._writes = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="phash-writer", daemon=True)
+        self._writer.start()
+
+    def _load(self):
+        start = time.perf_counter()
+        rows = self._conn.execute("SELECT phash, model_type, version, digest, pred_label FROM phash_index")
+        count = 0
+        for value, model_type, version, digest, pred_label in rows:
+            self._tables[(model_type, version)].add(_to_unsigned(value), digest, pred_label)
+            count += 1
+        for table in self._tables.values():
+            self._merge(table, force=True)
+        if count:
+            print(f"✅ [PHASH] 인덱스 적재: {count}건 ({(time.perf_counter() - start):.1f}s)")
+
+    def lookup(self, value, model_type, version, max_distance=None):
+        """가장 가까운 이전 업로드 Match(distance, digest, pred_label) 또는 None"""
+        max_distance = self.max_distance if max_distance is None else max_distance
+        with self._lock:
+            self._lookups += 1
+            table = self._tables.get((model_type, version))
+            match = table.nearest(value, max_distance) if table is not None else None
+            if match is not None:
+                self._matches += 1
+        return match
+
+    def add(self, value, model_type, version, digest, pred_label):
+        """새 업로드 등록 (메모리 테이블 즉시 반영, SQLite 기록은 writer 스레드에 위임)"""
+        with self._lock:
+            table = self._tables[(model_type, version)]
+            if not table.add(value, digest, pred_label):
+                return
+            stale = self._prune_old_versions(model_type, version)
+        for key in stale:
+            self._writes.put(("DELETE FROM phash_index WHERE model_type = ? AND version = ?", key))
+        self._writes.put((
+            "INSERT OR IGNORE INTO phash_index VALUES (?, ?, ?, ?, ?, ?)",
+            (_to_signed(value), model_type, version, digest, pred_label, datetime.now().isoformat()),
+        ))
+        self._merge(table)
+
+    def _merge(self, table, force=False):
+        with self._lock:
+            snapshot = table.merge_snapshot(force)
+        if snapshot is None:
+            return
+        hashes, tail = snapshot
+        merged = np.concatenate([hashes, np.array(tail, dtype=np.uint64)])
+        chunk_index = _build_chunk_index(merged)
+        with self._lock:
+            table.install(merged, chunk_index, len(tail))
+
+    def _prune_old_versions(self, model_type, version):
+        """이전 모델 버전 테이블을 메모리에서 제거 — 락 안에서 호출, 삭제할 (model_type, version) 목록 반환"""
+        stale = [key for key in self._tables if key[0] == model_type and key[1] != version]
+        for key in stale:
+            del self._tables[key]
+            print(f"🧹 [PHASH] 이전 모델 버전 인덱스 삭제: {model_type}/{key[1]}")
+        return stale
+
+    def _write_loop(self):
+        """대기 중인 쓰기를 모아 1 트랜잭션으로 기록 (None이면 종료)"""
+        while True:
+            ops = [self._writes.get()]
+            while True:
+                try:
+                    ops.append(self._writes.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in ops
+            try:
+                with self._conn:
+                    for op in ops:
+                        if op is not None:
+                            self._conn.execute(*op)
+            except sqlite3.Error as e:
+                print(f"⚠️ [PHASH] 인덱스 기록 실패 ({len(ops)}건): {e}")
+            finally:
+                for _ in ops:
+                    self._writes.task_done()
+            if stop:
+                return
+
+    def flush(self):
+        """대기 중인 SQLite 쓰기가 모두 기록될 때까지 대기"""
+        self._writes.join()
+
+    def close(self):
+        self._writes.put(None)
+        self._writer.join()
+        self._conn.close()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": sum(len(t) for t in self._tables.values()),
+                "max_distance": self.max_distance,
+                "reuse_distance": PHASH_REUSE_DISTANCE,
+                "lookups": self._lookups,
+                "matches": self._matches,
+                "pending_writes": self._writes.qsize(),
+            }
+
+
+# ==========================================================
+# ✅ 프로세스 전역 인덱스 (import 시점이 아니라 첫 사용 / 서버 startup 훅에서 생성)
+# ==========================================================
+_phash_index = None
+_phash_index_lock = threading.Lock()
+
+
+def get_phash_index():
+    """전역 인덱스 (PHASH_INDEX=0이면 None) — 처음 호출할 때 SQLite 적재"""
+    global _phash_index
+    if not PHASH_INDEX:
+        return None
+    if _phash_index is None:
+        with _phash_index_lock:
+            if _phash_index is None:
+                _phash_index = PerceptualHashIndex()
+    return _phash_index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="pHash 인덱스 조회 속도 측정")
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--max-distance", type=int, default=PHASH_MAX_DISTANCE)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    index = PerceptualHashIndex(":memory:", args.max_distance)
+    table = index._tables[("korean", "bench")]
+    start = time.perf_counter()
+    values = [rng.getrandbits(HASH_BITS) for _ in range(args.entries)]
+    for i, value in enumerate(values):
+        table.add(value, f"{i:064x}", "Fake")
+    index._merge(table, force=True)
+    print(f"📦 {args.entries}건 등록: {time.perf_counter() - start:.1f}s")
+
+    # 절반은 등록된 해시를 몇 비트 뒤집은 근사 중복, 절반은 무작위(미스)
+    timings, hits = [], 0
+    for q in range(args.queries):
+        if q % 2 == 0:
+            value = values[rng.randrange(len(values))]
+            for bit in rng.sample(range(HASH_BITS), rng.randint(0, args.max_distance)):
+                value ^= 1 << bit
+        else:
+            value = rng.getrandbits(HASH_BITS)
+        start = time.perf_counter()
+        hits += index.lookup(value, "korean", "bench") is not None
+        timings.append((time.perf_counter() - start) * 1000)
+
+    print(f"⏱️ 조회 {args.queries}건 (max_distance={args.max_distance}): "
+          f"p50 {np.percentile(timings, 50):.3f} ms | p95 {np.percentile(timings, 95):.3f} ms | 적중 {hits}")
@@ -0,0 +1,159 @@
+# Path: backend/app/services/result_cache.py
+# Desc: /api/predict 결과 캐시 (업로드 바이트 SHA-256 + model_type + 모델 버전 → 결과 dict, 메모리 LRU + 디스크 2단)
+
+import os
+import json
+import shutil
+import hashlib
+import threading
+from pathlib import Path
+from collections import OrderedDict
+
+# ==========================================================
+# ✅ 설정 (환경변수로 조정 가능)
+# ==========================================================
+BASE_DIR = Path(__file__).resolve().parents[3]  # 프로젝트 루트
+CACHE_DIR = BASE_DIR / "data" / "cache" / "predict"
+
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "256"))          # 메모리 LRU 항목 수 (0이면 비활성)
+RESULT_CACHE_DISK = os.getenv("RESULT_CACHE_DISK", "1") == "1"          # 디스크 캐시 사용 여부
+
+
+def content_hash(data: bytes) -> str:
+    """업로드 원본 바이트의 SHA-256 (hex)"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class ResultCache:
+    """
+    동일 이미지 재업로드 시 디코딩 / forward / Grad-CAM / PNG 인코딩을 건너뛰기 위한 결과 캐시.
+
+    - 키: (SHA-256, model_type, 모델 버전) → 체크포인트가 바뀌면 버전이 달라져 기존 항목은 더 이상 조회되지 않음
+    - 1단: 메모리 LRU (dict 조회 + 얕은 복사 → 마이크로초 단위)
+    - 2단: 디스크 JSON (data/cache/predict/<model_type>/<version>/) — 재시작 후에도 유지,
+      새 버전 저장 시 같은 model_type의 이전 버전 디렉터리는 삭제
+    - stats()로 메모리/디스크 적중, 미스, 저장 수 노출
+    """
+
+    def __init__(self, max_entries=RESULT_CACHE_SIZE, cache_dir=CACHE_DIR, use_disk=RESULT_CACHE_DISK):
+        self.max_entries = max(0, int(max_entries))
+        self.cache_dir = Path(cache_dir)
+        self.use_disk = use_disk
+        self._entries = OrderedDict()
+        self._known_versions = set()
+        self._lock = threading.Lock()
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._stores = 0
+
+    @staticmethod
+    def make_key(digest, model_type, version):
+        return (digest, model_type, version)
+
+    # ------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------
+    def get_memory(self, key):
+        """메모리 LRU 조회 (이벤트 루프에서 바로 호출 가능). 미스면 None"""
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                return None
+            self._entries.move_to_end(key)
+            self._memory_hits += 1
+        return dict(result)
+
+    def get_disk(self, key):
+        """디스크 조회 (파일 I/O — 실행기 스레드에서 호출). 적중 시 메모리로 승격"""
+        path = self._path_for(key)
+        if not self.use_disk or not path.exists():
+            with self._lock:
+                self._misses += 1
+            return None
+
+        try:
+            result = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            print(f"⚠️ [CACHE] 디스크 항목 손상 → 무시: {path} ({e})")
+            with self._lock:
+                self._misses += 1
+            return None
+
+        with self._lock:
+            self._disk_hits += 1
+        self._remember(key, result)
+        return dict(result)
+
+    # ------------------------------------------------------
+    # 저장
+    # ------------------------------------------------------
+    def put(self, key, result):
+        """결과 저장 (디스크 쓰기 포함 — 실행기 스레드에서 호출). 오류 결과는 저장하지 않음"""
+        if "error" in result:
+            return
+        result = {k: v for k, v in result.items() if k != "image_path"}
+        self._remember(key, result)
+        with self._lock:
+            self._stores += 1
+
+        if not self.use_disk:
+            return
+        try:
+            self._prune_old_versions(key)
+            path = self._path_for(key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(result, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp_path, path)  # 동시 조회 시 반쯤 쓰인 파일을 읽지 않도록 원자적 교체
+        except OSError as e:
+            print(f"⚠️ [CACHE] 디스크 저장 실패: {e}")
+
+    def _remember(self, key, result):
+        if self.max_entries == 0:
+            return
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _path_for(self, key):
+        digest, model_type, version = key
+        return self.cache_dir / model_type / version / digest[:2] / f"{digest}.json"
+
+    def _prune_old_versions(self, key):
+        """체크포인트 교체 후 처음 저장할 때 같은 model_type의 이전 버전 디스크 항목 삭제"""
+        _, model_type, version = key
+        if (model_type, version) in self._known_versions:
+            return
+        self._known_versions.add((model_type, version))
+        model_dir = self.cache_dir / model_type
+        if not model_dir.exists():
+            return
+        for old in model_dir.iterdir():
+            if old.is_dir() and old.name != version:
+                shutil.rmtree(old, ignore_errors=True)
+                print(f"🧹 [CACHE] 이전 모델 버전 캐시 삭제: {model_type}/{old.name}")
+
+    # ------------------------------------------------------
+    # 지표
+    # ------------------------------------------------------
+    def stats(self):
+        with self._lock:
+            hits = self._memory_hits + self._disk_hits
+            lookups = hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "disk": self.use_disk,
+                "memory_hits": self._memory_hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "stores": self._stores,
+                "hit_rate": hits / lookups if lookups else 0.0,
+            }
+
+
+# 프로세스 전역 결과 캐시
+result_cache = ResultCache()
@@ -6,37 +6,46 @@ import uuid
 import datetime
 from fastapi import UploadFile, HTTPException
 
+from backend.app.services.ingest import ingest_upload
+
 # 상대경로 (backend 기준)
 UPLOAD_DIR = "data/uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+ALLOWED_EXTS = ["jpg", "jpeg", "png"]
+
 async def save_file(file: UploadFile):
     """
     업로드된 파일을 data/uploads에 저장.
     파일명은 [날짜_시간_마이크로초_UUID6자리.확장자] 형식으로 생성되어 충돌 방지.
     예: 20251027_143512_123456_ab12f3.jpg
     """
-    # 파일명 유효성 검사
-    if not file.filename:
-        raise HTTPException(status_code=400, detail="파일 이름이 비어 있습니다.")
-
-    # 확장자 확인
-    ext = file.filename.split(".")[-1].lower()
-    if ext not in ["jpg", "jpeg", "png"]:
-        raise HTTPException(status_code=415, detail="지원하지 않는 파일 형식입니다.")
-
-    # 고유 파일명 생성 (날짜 + 시간 + 마이크로초 + uuid 일부)
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-    short_uid = str(uuid.uuid4())[:6]
-    new_filename = f"{timestamp}_{short_uid}.{ext}"
+    # 파일명 / 확장자 검증 + 고유 파일명 생성 (날짜 + 시간 + 마이크로초 + uuid 일부)
+    new_filename, _ = new_upload_name(file.filename)
 
     # 실제 저장 경로
     file_path = os.path.join(UPLOAD_DIR, new_filename)
 
-    # 파일 저장
-    content = await file.read()
-    with open(file_path, "wb") as buffer:
-        buffer.write(content)
+    # 파일 저장 (청크 단위로 바로 디스크에 — 크기 제한 / 형식 검사 포함)
+    await ingest_upload(file, file_path, memory_limit=0)
 
     # 파일명, 경로 반환
     return new_filename, file_path
+
+
+def new_upload_name(original_name: str):
+    """
+    원본 파일명 검증 후 서버 저장용 (파일명, 확장자) 반환.
+    파일명 규칙은 save_file과 동일 [날짜_시간_마이크로초_UUID6자리.확장자]
+    """
+    if not original_name:
+        raise HTTPException(status_code=400, detail="파일 이름이 비어 있습니다.")
+
+    ext = original_name.split(".")[-1].lower()
+    if ext not in ALLOWED_EXTS:
+        raise HTTPException(status_code=415, detail="지원하지 않는 파일 형식입니다.")
+
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    short_uid = str(uuid.uuid4())[:6]
+    return f"{timestamp}_{short_uid}.{ext}", ext
+
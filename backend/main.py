@@ -33,17 +33,23 @@ print("✅ OPENAI_API_KEY 감지됨" if openai_key else "⚠️ OPENAI_API_KEY 
 # ------------------------------------------------------
 # 1️⃣ 내부 모듈 임포트
 # ------------------------------------------------------
-from backend.app.core.database import Base, engine, SessionLocal
+from backend.app.core.database import Base, engine, SessionLocal, add_missing_columns
+from backend.app.core.body_limit import BodySizeLimitMiddleware
 from backend.app.models.db_models import Upload
-from ai.modules.predictor import DeepfakePredictor
+from backend.app.services.detect_service import model_registry
+from backend.app.services.phash_index import get_phash_index
+from backend.app.services.ingest import MAX_UPLOAD_BYTES
+from backend.app.services.batch_predict import BATCH_MAX_REQUEST_BYTES
 from ai.modules.restorer import FaceRestorer
 from backend.app.api.routes_upload import router as upload_router
 from backend.app.api.routes_detect import router as detect_router
+from backend.app.api.routes_metrics import router as metrics_router
 
 # ------------------------------------------------------
 # 2️⃣ DB 초기화
 # ------------------------------------------------------
 Base.metadata.create_all(bind=engine)
+add_missing_columns(Upload.__table__)  # 기존 uploads 테이블에 confidence / model_type 추가
 
 # ------------------------------------------------------
 # 3️⃣ FastAPI 인스턴스
@@ -51,8 +57,19 @@ Base.metadata.create_all(bind=engine)
 app = FastAPI(title="Deepfake Detection & Restoration API")
 
 # ------------------------------------------------------
-# 4️⃣ CORS 설정
+# 4️⃣ 업로드 본문 크기 제한 + CORS 설정
 # ------------------------------------------------------
+# 본문 한도 초과는 multipart 파싱 전에 413 (CORS보다 먼저 등록 → 413 응답에도 CORS 헤더 포함)
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    limits={
+        "/api/upload": MAX_UPLOAD_BYTES,
+        "/api/predict": MAX_UPLOAD_BYTES,
+        "/api/analyze": MAX_UPLOAD_BYTES,
+        "/api/restore": MAX_UPLOAD_BYTES,
+        "/api/predict/batch": BATCH_MAX_REQUEST_BYTES,
+    },
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # 필요 시 도메인 지정 가능
@@ -66,6 +83,7 @@ app.add_middleware(
 # ------------------------------------------------------
 app.include_router(upload_router, prefix="/api")
 app.include_router(detect_router, prefix="/api")
+app.include_router(metrics_router, prefix="/api")
 
 # ------------------------------------------------------
 # 6️⃣ 정적 파일 제공 (복원 결과 이미지 접근 허용)
@@ -76,8 +94,8 @@ app.mount("/data", StaticFiles(directory="data"), name="data")
 # 7️⃣ 모델 로드 (탐지 + 복원)
 # ------------------------------------------------------
 try:
-    predictor_kr = DeepfakePredictor("ai/models/mobilenetv3_deepfake_final.pth")
-    predictor_foreign = DeepfakePredictor("ai/models/mobilenetv3_deepfake_final_foriegn2.pth")
+    # 탐지 모델은 레지스트리에 상주 (/api/predict가 같은 인스턴스를 사용)
+    model_registry.preload(["korean", "foriegn"])
     restorer = FaceRestorer("ai/models/RealESRGAN_x4plus.pth")
 
     print("✅ [INFO] 한국인 탐지 모델 로드 완료")
@@ -85,7 +103,7 @@ try:
     print("✅ [INFO] 복원 모델 로드 완료")
     print("✅ [INFO] 모든 모델 초기화 성공 (탐지 + 복원)")
 except Exception as e:
-    predictor_kr = predictor_foreign = restorer = None
+    restorer = None
     print(f"❌ [MODEL LOAD ERROR]: {e}")
 
 # ------------------------------------------------------
@@ -132,3 +150,9 @@ async def cleanup_deleted_uploads():
 @app.on_event("startup")
 async def start_cleanup_task():
     asyncio.create_task(cleanup_deleted_uploads())
+
+
+@app.on_event("startup")
+async def load_phash_index():
+    # pHash 인덱스(SQLite) 적재는 import 시점이 아니라 서버 시작 시 1회 (이벤트 루프 밖에서)
+    await asyncio.to_thread(get_phash_index)
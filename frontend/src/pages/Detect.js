@@ -89,14 +89,8 @@ export default function Detect() {
     formData.append('model_type', modelType);
 
     try {
-      // ✅ 업로드
-      await fetch(`${process.env.REACT_APP_API_URL}/api/upload`, {
-        method: 'POST',
-        body: formData,
-      });
-
-      // ✅ 예측 요청
-      const res = await fetch(`${process.env.REACT_APP_API_URL}/api/predict`, {
+      // ✅ 업로드 기록 + 예측을 한 번의 요청으로 (파일 1회 전송)
+      const res = await fetch(`${process.env.REACT_APP_API_URL}/api/analyze`, {
         method: 'POST',
         body: formData,
       });